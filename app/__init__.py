@@ -3,7 +3,7 @@ from flask_login import LoginManager
 from .web import web
 from .auth import get_user
 from .logging_config import setup_logging
-from .ec25_monitor import start_monitor, set_monitor_enabled
+from .ec25_monitor import start_monitor, start_mirror, set_monitor_enabled
 from .web import get_ec25_enabled
 import os
 
@@ -36,8 +36,14 @@ def create_app() -> Flask:
 
     app.register_blueprint(web)
     
-    # Iniciar monitor EC25 en hilo separado
-    ec25_enabled = get_ec25_enabled()
-    start_monitor(update_interval=5.0, enabled=ec25_enabled)
+    # Con gunicorn el monitor corre una sola vez en su propio proceso (gunicorn.conf.py)
+    # y cada worker solo lee sus snapshots del buffer compartido
+    shared_path = os.environ.get("EC25_SHARED_SNAPSHOT")
+    if shared_path:
+        start_mirror(shared_path)
+    else:
+        # Iniciar monitor EC25 en hilo separado
+        ec25_enabled = get_ec25_enabled()
+        start_monitor(update_interval=5.0, enabled=ec25_enabled)
     
     return app
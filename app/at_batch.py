@@ -0,0 +1,70 @@
+"""
+Encadenado de comandos AT (AT+COPS?;+QNWINFO;+CEREG?) y separación de la
+respuesta combinada en respuestas individuales para los parse_* de modem.py.
+"""
+import re
+
+from .at_session import is_final_result
+
+MAX_CHAIN_COMMANDS = 4  # comandos por escritura física
+
+_PREFIX_SPLIT = re.compile(r"[?=]")
+
+
+def response_prefix(cmd):
+    """Prefijo de la respuesta de un comando: AT+COPS? -> +COPS:"""
+    body = cmd[2:] if cmd[:2].upper() == "AT" else cmd
+    return _PREFIX_SPLIT.split(body, 1)[0].upper() + ":"
+
+
+def chain_commands(cmds):
+    """Une comandos en una sola línea: AT+COPS?;+QNWINFO;+CEREG?"""
+    return cmds[0] + "".join(";" + (c[2:] if c[:2].upper() == "AT" else c) for c in cmds[1:])
+
+
+def chunk_commands(cmds, size=MAX_CHAIN_COMMANDS):
+    """Divide la lista de comandos en grupos encadenables"""
+    return [cmds[i:i + size] for i in range(0, len(cmds), size)]
+
+
+def split_chained_response(cmds, response):
+    """
+    Separa la respuesta de un comando encadenado.
+    Retorna {cmd: respuesta} con "OK" al final de cada una; None para los
+    comandos que no llegaron a ejecutarse (cadena abortada por ERROR).
+    """
+    results = dict.fromkeys(cmds)
+    if not response:
+        return results
+
+    prefixes = [response_prefix(c) for c in cmds]
+    body = [[] for _ in cmds]
+    final = None
+    current = -1
+    last_with_output = -1
+
+    for line in response.splitlines():
+        line = line.strip()
+        if not line or line[:2].upper() == "AT":  # vacías y eco
+            continue
+        if is_final_result(line):
+            final = line
+            break
+        # Las respuestas llegan en el orden de los comandos
+        for i in range(max(current, 0), len(cmds)):
+            if line.upper().startswith(prefixes[i]):
+                current = i
+                break
+        if current < 0:
+            continue
+        body[current].append(line)
+        last_with_output = current
+
+    if final is None:
+        return results
+
+    # Con ERROR solo se conservan los comandos que alcanzaron a responder
+    completed = len(cmds) if final == "OK" else last_with_output + 1
+    for i in range(completed):
+        results[cmds[i]] = "\r\n".join(body[i] + ["OK"]) + "\r\n"
+    return results
@@ -0,0 +1,124 @@
+"""
+Caché de respuestas AT por comando.
+Datos estáticos (IMEI, firmware, APN, SIM lista) o lentos (operador, registro)
+se sirven desde memoria; los comandos de escritura invalidan sus consultas.
+"""
+import logging
+import threading
+import time
+
+from .at_batch import response_prefix
+
+logger = logging.getLogger(__name__)
+
+# Segundos de validez; None = hasta que se invalide
+CACHE_TTLS = {
+    "AT+GSN": None,
+    "AT+CGSN": None,
+    "AT+QGMR": None,
+    "AT+CGMR": None,
+    "AT+CIMI": None,
+    "AT+QCCID": None,
+    "AT+CGDCONT?": 300.0,
+    "AT+CPIN?": 300.0,
+    "AT+COPS?": 30.0,
+    "AT+QNWINFO": 10.0,
+    "AT+CREG?": 5.0,
+    "AT+CEREG?": 5.0,
+}
+
+# Solo se guarda la respuesta si cumple la condición (SIM lista, no PIN pendiente)
+CACHE_CONDITIONS = {
+    "AT+CPIN?": lambda response: "READY" in response,
+}
+
+_REGISTRATION = ("AT+CREG?", "AT+CEREG?", "AT+COPS?", "AT+QNWINFO")
+
+# Prefijo de respuesta del comando de escritura -> consultas afectadas
+SET_INVALIDATIONS = {
+    "+CFUN:": tuple(CACHE_TTLS),
+    "+COPS:": _REGISTRATION,
+    "+CGDCONT:": ("AT+CGDCONT?",),
+    "+QCFG:": _REGISTRATION,
+}
+
+
+def is_set_command(cmd):
+    """True para AT+XXX=..., False para consultas y AT+XXX=?"""
+    return "=" in cmd and not cmd.rstrip().endswith("=?")
+
+
+class ATResponseCache:
+    """Caché thread-safe con TTL por comando y contadores de aciertos/fallos"""
+
+    def __init__(self, ttls=None, clock=time.monotonic):
+        self._ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}  # cmd -> (respuesta, expira | None)
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+    def is_cacheable(self, cmd):
+        return self._ttls.get(cmd.upper(), 0) != 0
+
+    def get(self, cmd):
+        """Respuesta vigente o None (cuenta acierto/fallo solo si es cacheable)"""
+        key = cmd.upper()
+        if not self.is_cacheable(key):
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > self._clock()):
+                self._counters["hits"] += 1
+                return entry[0]
+            self._entries.pop(key, None)
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, cmd, response):
+        """Guarda una respuesta OK o, si es un comando de escritura, invalida lo afectado"""
+        key = cmd.upper()
+        if is_set_command(key):
+            if response is not None and response.rstrip().endswith("OK"):
+                self._invalidate_for_set(key)
+            return
+        if not response or not response.rstrip().endswith("OK") or not self.is_cacheable(key):
+            return
+        condition = CACHE_CONDITIONS.get(key)
+        if condition is not None and not condition(response):
+            return
+        ttl = self._ttls.get(key)
+        with self._lock:
+            self._entries[key] = (response, None if ttl is None else self._clock() + ttl)
+            self._counters["stores"] += 1
+
+    def invalidate(self, *cmds):
+        with self._lock:
+            removed = [c for c in (cmd.upper() for cmd in cmds) if self._entries.pop(c, None)]
+            self._counters["invalidations"] += len(removed)
+        if removed:
+            logger.debug(f"Caché AT invalidada: {', '.join(removed)}")
+
+    def clear(self):
+        with self._lock:
+            self._counters["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores, tasa de aciertos y segundos restantes por entrada"""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            now = self._clock()
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": {
+                    cmd: None if expires is None else round(max(0.0, expires - now), 1)
+                    for cmd, (_, expires) in self._entries.items()
+                },
+            }
+
+    def _invalidate_for_set(self, cmd):
+        prefix = response_prefix(cmd)
+        query = cmd.split("=", 1)[0] + "?"
+        self.invalidate(query, *SET_INVALIDATIONS.get(prefix, ()))
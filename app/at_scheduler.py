@@ -0,0 +1,203 @@
+"""
+Planificador de comandos AT con cola de prioridad.
+Un único hilo es dueño de la sesión AT: el monitor, las rutas web y los
+comandos manuales encolan sus peticiones y reciben un Future con la respuesta.
+"""
+import fcntl
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from .at_session import command_timeout
+
+logger = logging.getLogger(__name__)
+
+# Lock compartido con watchdog.sh (flock) para no mezclar escrituras al puerto
+AT_LOCK_FILE = "/run/lock/ec25-at.lock"
+MAX_QUEUE_DEPTH = 32
+QUEUE_TIMEOUT = 10.0  # segundos máximos esperando en cola
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # Peticiones del usuario (APN, reset, info)
+    NORMAL = 1
+    BACKGROUND = 2   # Polling del monitor
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    cmd: str = field(compare=False)
+    timeout: float = field(compare=False)
+    deadline: float = field(compare=False)
+    enqueued: float = field(compare=False)
+    future: Future = field(compare=False)
+
+
+def _open_lock_file(path):
+    """
+    Abre el lock en solo lectura (flock no necesita escritura): watchdog.sh
+    corre como root y puede haberlo creado con modo 0644 en /run/lock, que
+    es sticky y con fs.protected_regular rechaza O_CREAT sobre archivos ajenos.
+    """
+    try:
+        return os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return os.open(path, os.O_RDONLY | os.O_CREAT, 0o666)
+
+
+class _PortLock:
+    """flock inter-proceso sobre AT_LOCK_FILE (no-op si no se puede crear)"""
+
+    def __init__(self, path):
+        self._path = path
+        self._fd = None
+        self._warned = False
+
+    def __enter__(self):
+        if self._fd is None:
+            if self._path is None:
+                return self
+            try:
+                self._fd = _open_lock_file(self._path)
+            except OSError as e:
+                if not self._warned:
+                    logger.warning(f"⚠️ Sin lock inter-proceso para el puerto AT ({self._path}): {e}")
+                    self._warned = True
+                return self
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class ATScheduler:
+    """Serializa los comandos AT por prioridad con timeouts y métricas de cola"""
+
+    def __init__(self, session, max_depth=MAX_QUEUE_DEPTH, queue_timeout=QUEUE_TIMEOUT,
+                 lock_file=AT_LOCK_FILE):
+        self._session = session
+        self._max_depth = max_depth
+        self._queue_timeout = queue_timeout
+        self._port_lock = _PortLock(lock_file)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._current = None
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "expired": 0,
+            "rejected": 0,
+        }
+        self._max_depth_seen = 0
+        self._wait = {p: {"count": 0, "total": 0.0, "max": 0.0} for p in Priority}
+
+    def submit(self, cmd, priority=Priority.NORMAL, timeout=None):
+        """Encola un comando y retorna un Future con la respuesta (str o None)"""
+        future = Future()
+        now = time.monotonic()
+        with self._lock:
+            depth = self._queue.qsize()
+            if depth >= self._max_depth:
+                self._counters["rejected"] += 1
+                logger.warning(f"⚠️ Cola AT llena ({depth}), rechazando {cmd}")
+                future.set_result(None)
+                return future
+            self._counters["submitted"] += 1
+            self._max_depth_seen = max(self._max_depth_seen, depth + 1)
+            self._ensure_worker()
+        self._queue.put(_Job(
+            priority=int(priority),
+            seq=next(self._seq),
+            cmd=cmd,
+            timeout=timeout if timeout is not None else command_timeout(cmd),
+            deadline=now + self._queue_timeout,
+            enqueued=now,
+            future=future,
+        ))
+        return future
+
+    def execute(self, cmd, priority=Priority.NORMAL, timeout=None):
+        """Encola un comando y espera su respuesta (None si falla o expira)"""
+        future = self.submit(cmd, priority=priority, timeout=timeout)
+        limit = self._queue_timeout + (timeout if timeout is not None else command_timeout(cmd)) + 1.0
+        try:
+            return future.result(timeout=limit)
+        except Exception as e:
+            future.cancel()
+            logger.warning(f"Comando AT {cmd} sin respuesta: {e or type(e).__name__}")
+            return None
+
+    def stats(self):
+        """Métricas de la cola: profundidad, contadores y espera por prioridad"""
+        with self._lock:
+            by_priority = {}
+            for p, w in self._wait.items():
+                by_priority[p.name.lower()] = {
+                    "executed": w["count"],
+                    "wait_avg_ms": round(w["total"] / w["count"] * 1000, 1) if w["count"] else 0.0,
+                    "wait_max_ms": round(w["max"] * 1000, 1),
+                }
+            return {
+                **self._counters,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_depth_seen,
+                "queue_limit": self._max_depth,
+                "current_command": self._current,
+                "by_priority": by_priority,
+            }
+
+    def _ensure_worker(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._worker, daemon=True, name="ATScheduler")
+        self._thread.start()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            started = time.monotonic()
+            waited = started - job.enqueued
+            if started > job.deadline:
+                with self._lock:
+                    self._counters["expired"] += 1
+                job.future.set_exception(TimeoutError(f"{job.cmd} expiró en cola ({waited:.1f}s)"))
+                continue
+
+            with self._lock:
+                self._current = job.cmd
+                w = self._wait[Priority(job.priority)]
+                w["count"] += 1
+                w["total"] += waited
+                w["max"] = max(w["max"], waited)
+
+            try:
+                with self._port_lock:
+                    result = self._session.command(job.cmd, timeout=job.timeout)
+            except Exception as e:
+                logger.error(f"❌ Error ejecutando {job.cmd}: {e}", exc_info=True)
+                with self._lock:
+                    self._counters["failed"] += 1
+                    self._current = None
+                job.future.set_exception(e)
+                continue
+
+            with self._lock:
+                self._counters["completed" if result is not None else "failed"] += 1
+                self._current = None
+            job.future.set_result(result)
@@ -0,0 +1,145 @@
+"""
+Sesión AT persistente para el módem EC25.
+Mantiene el puerto serie abierto entre comandos y lee hasta el código de
+resultado final en lugar de esperar un tiempo fijo.
+"""
+import threading
+import time
+import logging
+import serial
+
+BAUDRATE = 115200
+DEFAULT_TIMEOUT = 5.0
+logger = logging.getLogger(__name__)
+
+# Comandos lentos (segundos según el manual AT de Quectel)
+COMMAND_TIMEOUTS = {
+    "AT+COPS=?": 180.0,
+    "AT+QSCAN": 180.0,
+    "AT+COPS=": 180.0,
+    "AT+CGATT": 140.0,
+    "AT+CGACT": 150.0,
+    "AT+QNETDEVCTL": 30.0,
+    "AT+CFUN": 15.0,
+}
+
+FINAL_RESULT_CODES = ("OK", "ERROR", "NO CARRIER", "BUSY", "NO ANSWER", "NO DIALTONE")
+FINAL_ERROR_PREFIXES = ("+CME ERROR:", "+CMS ERROR:")
+
+
+def command_timeout(cmd):
+    """Timeout máximo de un comando según la tabla COMMAND_TIMEOUTS"""
+    upper = cmd.upper()
+    for prefix, timeout in COMMAND_TIMEOUTS.items():
+        if upper.startswith(prefix):
+            return timeout
+    return DEFAULT_TIMEOUT
+
+
+def is_final_result(line):
+    """True si la línea es un código de resultado final (OK, ERROR, +CME ERROR...)"""
+    return line in FINAL_RESULT_CODES or line.startswith(FINAL_ERROR_PREFIXES)
+
+
+class ATSession:
+    """Sesión AT de larga duración con reconexión transparente"""
+
+    def __init__(self, port_resolver, baudrate=BAUDRATE, serial_factory=serial.Serial):
+        self._port_resolver = port_resolver
+        self._baudrate = baudrate
+        self._serial_factory = serial_factory
+        self._serial = None
+        self._port = None
+        self._lock = threading.RLock()
+
+    @property
+    def port(self):
+        return self._port
+
+    @property
+    def is_open(self):
+        return self._serial is not None and self._serial.is_open
+
+    def open(self, force_refresh=False):
+        """Abre el puerto AT (si no está abierto ya)"""
+        with self._lock:
+            if self.is_open and not force_refresh:
+                return True
+            self.close()
+            port = self._port_resolver(force_refresh)
+            if not port:
+                return False
+            try:
+                self._serial = self._serial_factory(
+                    port, self._baudrate, timeout=0.1, write_timeout=2, rtscts=False, dsrdtr=False
+                )
+            except (serial.SerialException, OSError) as e:
+                logger.warning(f"⚠️ No se pudo abrir puerto AT {port}: {e}")
+                self._serial = None
+                return False
+            self._port = port
+            self._serial.reset_input_buffer()
+            logger.info(f"🔌 Sesión AT abierta en {port}")
+            return True
+
+    def close(self):
+        """Cierra el puerto AT"""
+        with self._lock:
+            if self._serial is not None:
+                try:
+                    self._serial.close()
+                except (serial.SerialException, OSError):
+                    pass
+                logger.info(f"🔌 Sesión AT cerrada en {self._port}")
+            self._serial = None
+            self._port = None
+
+    def command(self, cmd, timeout=None):
+        """Envía un comando y retorna la respuesta completa (o None)"""
+        if timeout is None:
+            timeout = command_timeout(cmd)
+        with self._lock:
+            for attempt in range(2):
+                if not self.open(force_refresh=attempt > 0):
+                    return None
+                try:
+                    return self._transact(cmd, timeout)
+                except (serial.SerialException, OSError) as e:
+                    # El dispositivo desapareció: reabrir y reintentar una vez
+                    logger.warning(f"⚠️ Puerto AT {self._port} perdido ({e}), reconectando")
+                    self.close()
+            logger.error(f"Error enviando comando AT {cmd}: puerto no disponible")
+            return None
+
+    def _transact(self, cmd, timeout):
+        s = self._serial
+
+        # Descartar restos de respuestas anteriores
+        if s.in_waiting:
+            stale = s.read(s.in_waiting)
+            logger.debug(f"Descartando datos pendientes: {stale[:80]!r}")
+
+        s.write((cmd + "\r").encode())
+
+        lines = []
+        buffer = b""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            # read() vuelve en cuanto llega el primer byte (timeout 0.1s)
+            chunk = s.read(max(1, s.in_waiting))
+            if not chunk:
+                continue
+            buffer += chunk
+            while b"\n" in buffer:
+                raw, buffer = buffer.split(b"\n", 1)
+                line = raw.decode(errors="ignore").strip()
+                if not line:
+                    continue
+                lines.append(line)
+                if is_final_result(line):
+                    response = "\r\n".join(lines) + "\r\n"
+                    logger.debug(f"AT {cmd}: {response[:80]}...")
+                    return response
+
+        logger.warning(f"⏱️ Timeout ({timeout:.1f}s) esperando respuesta a {cmd}")
+        return "\r\n".join(lines) + "\r\n" if lines else None
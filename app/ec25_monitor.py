@@ -1,21 +1,266 @@
 """
-Monitor asíncrono del módem EC25 usando hilos y cola.
-Obtiene datos del módem continuamente y los envía a una cola para consumo web.
+Monitor asíncrono del módem EC25 usando hilos y difusión pub/sub.
+Obtiene datos del módem continuamente y los reparte a cada suscriptor web.
 """
+import gzip
+import hashlib
+import json
 import threading
-import queue
+import itertools
 import time
 import logging
-from typing import Dict, Any
-from .modem import get_signal, get_network_info, is_ec25_detected
+from collections import deque
+from collections.abc import Mapping
+from .modem import get_modem_status, is_ec25_detected, parse_signal_metrics
+from .shared_snapshot import SharedSnapshot, default_path
+from .signal_history import SignalHistory
 
 logger = logging.getLogger(__name__)
 
-# Cola global para datos del EC25
-ec25_data_queue = queue.Queue(maxsize=10)
+# Actualizaciones que cada suscriptor puede acumular antes de perder las más viejas
+SUBSCRIBER_BUFFER = 16
+# Actualizaciones guardadas para retomar un stream con Last-Event-ID
+RESUME_HISTORY = 64
 
-# Última actualización de datos (cache)
-_last_data: Dict[str, Any] = {
+_MISSING = object()
+
+
+def merge_patch(old, new):
+    """
+    Diferencia entre dos snapshots como JSON merge patch (RFC 7386):
+    solo las claves que cambiaron, las eliminadas como null.
+    """
+    patch = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = merge_patch(previous, value)
+            if nested:
+                patch[key] = nested
+        elif previous is _MISSING or previous != value:
+            patch[key] = value
+    for key in old.keys() - new.keys():
+        patch[key] = None
+    return patch
+
+
+def new_epoch(stamp=None):
+    """
+    Época de un difusor: los ids de evento son "<época>-<seq>", así un id de
+    antes de reiniciar el proceso nunca se confunde con un seq nuevo.
+    """
+    return format(stamp if stamp is not None else time.time_ns(), "x")
+
+
+def parse_event_id(value):
+    """(época, seq) de un Last-Event-ID, o None si no tiene ese formato"""
+    epoch, _, seq = (value or "").rpartition("-")
+    return (epoch, int(seq)) if epoch and seq.isdigit() else None
+
+
+class Snapshot(Mapping):
+    """
+    Actualización publicada, serializada una sola vez: /api/ec25/data y
+    cada cliente SSE sirven los mismos bytes sin volver a llamar json.dumps.
+    Se lee como un dict pero no se puede modificar.
+    """
+
+    __slots__ = ("seq", "_data", "body", "etag", "event", "patch_base", "patch_event", "_gzipped")
+
+    def __init__(self, seq, data, previous=None, body=None, epoch="0"):
+        self.seq = seq
+        self._data = data
+        # body viene ya serializado cuando el snapshot llega de otro proceso
+        payload = body.decode() if body is not None else _dumps(data)
+        self.body = body if body is not None else payload.encode()
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=8).hexdigest()}"'
+        self.event = _sse(epoch, seq, "snapshot", payload)
+        # Parche contra el snapshot anterior: lo que necesita todo cliente al día
+        self.patch_base = previous.seq if previous is not None else None
+        self.patch_event = (
+            _sse(epoch, seq, "patch", _dumps(merge_patch(previous, data))) if previous is not None else None
+        )
+        self._gzipped = None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def gzipped(self):
+        """Variante gzip, comprimida la primera vez que un cliente la pide"""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, mtime=0)
+        return self._gzipped
+
+
+class DeltaEncoder:
+    """Convierte actualizaciones en eventos SSE: snapshot completo la primera vez, luego parches"""
+
+    def __init__(self, base=None, epoch="0"):
+        self.seq, self._state = base if base is not None else (0, None)
+        self._state_seq = self.seq
+        self.epoch = epoch
+
+    def encode(self, seq, data):
+        """Devuelve el evento SSE con su id, o None si el cliente ya lo tiene"""
+        if seq <= self.seq:
+            return None
+        self.seq = seq
+        snapshot = data if isinstance(data, Snapshot) else None
+        previous, previous_seq = self._state, self._state_seq
+        self._state, self._state_seq = data, seq
+        if previous is None:
+            return snapshot.event if snapshot is not None else _sse(self.epoch, seq, "snapshot", _dumps(data))
+        # Cliente al día: el parche ya viene serializado en el snapshot
+        if snapshot is not None and snapshot.patch_base == previous_seq:
+            return snapshot.patch_event
+        # Un parche vacío igual avanza el id para que el cliente retome desde aquí
+        return _sse(self.epoch, seq, "patch", _dumps(merge_patch(previous, data)))
+
+
+def _dumps(data):
+    return json.dumps(dict(data), separators=(',', ':'))
+
+
+def _sse(epoch, seq, event, payload):
+    return f"id: {epoch}-{seq}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """Buffer circular propio de un suscriptor (una pestaña del navegador)"""
+
+    def __init__(self, broadcaster, id, maxlen):
+        self.id = id
+        self._broadcaster = broadcaster
+        self._buffer = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self.delivered = 0
+        self.dropped = 0
+        self.last_seq = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def push(self, seq, data):
+        """Encola una actualización; si el lector va lento se pisa la más vieja"""
+        with self._cond:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append((seq, data))
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Devuelve (seq, datos) o None si vence el timeout"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or self.closed, timeout)
+            if not self._buffer:
+                return None
+            seq, data = self._buffer.popleft()
+            self.delivered += 1
+            self.last_seq = seq
+            return seq, data
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._broadcaster.unsubscribe(self)
+
+    def stats(self):
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "id": self.id,
+            "buffered": buffered,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "last_seq": self.last_seq
+        }
+
+
+class Broadcaster:
+    """Reparte cada actualización a todos los suscriptores (fan-out)"""
+
+    def __init__(self, maxlen=SUBSCRIBER_BUFFER, history=RESUME_HISTORY):
+        self._maxlen = maxlen
+        self._history = deque(maxlen=history)
+        self.current = None
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+        self._dropped_closed = 0
+        self.seq = 0
+        # La fija el proceso del monitor cuando los workers espejan su buffer
+        self.epoch = new_epoch()
+
+    def publish(self, data, seq=None, body=None):
+        """Reparte una actualización; seq y body los fija el espejo de un monitor en otro proceso"""
+        with self._lock:
+            self.seq = seq if seq is not None else self.seq + 1
+            seq = self.seq
+            snapshot = self.current = Snapshot(seq, data, self.current, body, self.epoch)
+            self._history.append((seq, snapshot))
+            subscribers = list(self._subscribers.values())
+        for sub in subscribers:
+            sub.push(seq, snapshot)
+        return seq
+
+    def subscribe(self, maxlen=None):
+        with self._lock:
+            sub = Subscription(self, next(self._ids), maxlen or self._maxlen)
+            self._subscribers[sub.id] = sub
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            if self._subscribers.pop(sub.id, None) is not None:
+                self._dropped_closed += sub.dropped
+
+    def snapshot_at(self, seq):
+        """(seq, datos) que tenía un cliente cuyo último id fue seq; None si ya salió del historial"""
+        with self._lock:
+            if not self._history or self._history[0][0] > seq or seq > self.seq:
+                return None
+            for item in reversed(self._history):
+                if item[0] <= seq:
+                    return item
+        return None
+
+    def resume(self, last_event_id):
+        """Codificador para un cliente que reconecta: retoma su id o, de otra época, manda snapshot completo"""
+        parsed = parse_event_id(last_event_id)
+        base = self.snapshot_at(parsed[1]) if parsed is not None and parsed[0] == self.epoch else None
+        return DeltaEncoder(base, self.epoch)
+
+    def stats(self):
+        """Suscriptores activos y actualizaciones perdidas por lectores lentos"""
+        with self._lock:
+            subscribers = [sub.stats() for sub in self._subscribers.values()]
+            dropped_closed = self._dropped_closed
+            seq = self.seq
+        return {
+            "seq": seq,
+            "subscribers": len(subscribers),
+            "dropped": dropped_closed + sum(s["dropped"] for s in subscribers),
+            "per_subscriber": subscribers
+        }
+
+
+# Difusor global de datos del EC25
+broadcaster = Broadcaster()
+
+# Estado inicial hasta la primera publicación del monitor
+_initial_data = Snapshot(0, {
     "signal": {"csq": "N/A", "qcsq": "N/A"},
     "network": {
         "operator": "N/A",
@@ -26,30 +271,45 @@ _last_data: Dict[str, Any] = {
     "timestamp": time.time(),
     "enabled": False,
     "detected": False
-}
-_data_lock = threading.Lock()
+}, epoch=broadcaster.epoch)
 
 # Control del hilo monitor
 _monitor_thread = None
 _monitor_running = False
 _monitor_enabled = False
 
+# Buffer compartido cuando el monitor corre en otro proceso (gunicorn master)
+_shared = None
+# Historial de RSRP/RSRQ/SINR/CSQ; en un worker, el del proceso del monitor
+_history = None
+# Cada cuánto un worker revisa si hay un snapshot nuevo en el buffer
+MIRROR_INTERVAL = 0.2
+
 
-def get_latest_data() -> Dict[str, Any]:
-    """Obtiene los últimos datos del EC25 (thread-safe)"""
-    with _data_lock:
-        return _last_data.copy()
+def _is_enabled():
+    """Con buffer compartido la bandera vive ahí para que la vean todos los procesos"""
+    return _shared.enabled if _shared is not None else _monitor_enabled
+
+
+def get_history():
+    """Historial de métricas de señal, o None si el monitor no arrancó"""
+    return _history
+
+
+def get_latest_data() -> Snapshot:
+    """Obtiene el último snapshot del EC25 (compartido y de solo lectura, sin copiar)"""
+    return broadcaster.current or _initial_data
 
 
 def _monitor_worker(update_interval: float = 5.0):
     """Hilo worker que obtiene datos del EC25 continuamente"""
-    global _last_data, _monitor_running
+    global _monitor_running
     
     logger.info("🚀 EC25 monitor thread iniciado (intervalo: %.1fs)", update_interval)
     
     while _monitor_running:
         try:
-            if not _monitor_enabled:
+            if not _is_enabled():
                 # Si está deshabilitado, dormir y continuar
                 time.sleep(1)
                 continue
@@ -73,8 +333,7 @@ def _monitor_worker(update_interval: float = 5.0):
                 }
             else:
                 # Obtener datos del módem
-                signal_data = get_signal()
-                network_data = get_network_info()
+                signal_data, network_data = get_modem_status()
                 
                 data = {
                     "signal": signal_data,
@@ -83,21 +342,17 @@ def _monitor_worker(update_interval: float = 5.0):
                     "enabled": True,
                     "detected": True
                 }
+                if _history is not None:
+                    _history.append(
+                        data["timestamp"],
+                        parse_signal_metrics(signal_data.get("csq_raw"), signal_data.get("qcsq_raw"))
+                    )
             
-            # Actualizar cache thread-safe
-            with _data_lock:
-                _last_data = data
-            
-            # Enviar a cola (no bloqueante)
-            try:
-                ec25_data_queue.put_nowait(data)
-            except queue.Full:
-                # Cola llena, descartar dato más antiguo
-                try:
-                    ec25_data_queue.get_nowait()
-                    ec25_data_queue.put_nowait(data)
-                except queue.Empty:
-                    pass
+            # Serializar una vez y repartir a todos los suscriptores (no bloqueante)
+            seq = broadcaster.publish(data)
+            if _shared is not None:
+                # Workers de gunicorn: leen estos mismos bytes del buffer compartido
+                _shared.write(seq, broadcaster.current.body)
             
             logger.debug("📊 Datos EC25 actualizados: CSQ=%s, Op=%s", 
                         data['signal']['csq'], data['network']['operator'])
@@ -111,15 +366,18 @@ def _monitor_worker(update_interval: float = 5.0):
     logger.info("🛑 EC25 monitor thread detenido")
 
 
-def start_monitor(update_interval: float = 5.0, enabled: bool = True):
+def start_monitor(update_interval: float = 5.0, enabled: bool = True, shared: SharedSnapshot = None,
+                  history: SignalHistory = None):
     """
     Inicia el hilo de monitoreo del EC25
     
     Args:
         update_interval: Intervalo de actualización en segundos (default: 5s)
         enabled: Si el monitor debe estar activo al iniciar
+        shared: Buffer donde publicar cada snapshot para los workers de gunicorn
+        history: Historial de señal a alimentar (por defecto uno en memoria del proceso)
     """
-    global _monitor_thread, _monitor_running, _monitor_enabled
+    global _monitor_thread, _monitor_running, _monitor_enabled, _shared, _history
     
     if _monitor_thread and _monitor_thread.is_alive():
         logger.warning("⚠️ Monitor EC25 ya está corriendo")
@@ -127,6 +385,11 @@ def start_monitor(update_interval: float = 5.0, enabled: bool = True):
     
     _monitor_running = True
     _monitor_enabled = enabled
+    _shared = shared
+    _history = history if history is not None else SignalHistory()
+    if shared is not None:
+        shared.enabled = enabled
+        broadcaster.epoch = new_epoch(shared.epoch)
     _monitor_thread = threading.Thread(
         target=_monitor_worker,
         args=(update_interval,),
@@ -137,9 +400,67 @@ def start_monitor(update_interval: float = 5.0, enabled: bool = True):
     logger.info("✅ Monitor EC25 iniciado (enabled=%s)", enabled)
 
 
+def history_path(path):
+    """Archivo del historial de señal compartido, junto al buffer de snapshots"""
+    return f"{path}-history"
+
+
+def _mirror_worker(path, poll_interval):
+    """Hilo de un worker: copia al difusor local cada snapshot nuevo del buffer compartido"""
+    global _shared, _history
+
+    logger.info("🚀 EC25 espejo iniciado (%s)", path or "buffer por defecto")
+    last_seq = None
+
+    while _monitor_running:
+        try:
+            if _shared is None:
+                # El master crea el buffer al arrancar; esperar si todavía no existe
+                _shared = SharedSnapshot.open(path)
+                if _shared is not None:
+                    # Ids de evento iguales en todos los workers: los del proceso del monitor
+                    broadcaster.epoch = new_epoch(_shared.epoch)
+            if _history is None:
+                _history = SignalHistory.open(history_path(path))
+            if _shared is not None:
+                item = _shared.read(last_seq)
+                if item is not None:
+                    last_seq, body = item
+                    # json.loads una vez por actualización y worker; los bytes se reusan tal cual
+                    broadcaster.publish(json.loads(body), seq=last_seq, body=body)
+        except Exception as e:
+            logger.error("❌ Error en espejo EC25: %s", e, exc_info=True)
+        time.sleep(poll_interval)
+
+    logger.info("🛑 EC25 espejo detenido")
+
+
+def start_mirror(path=None, poll_interval: float = MIRROR_INTERVAL):
+    """
+    Modo worker de gunicorn: no abre el puerto serie, solo lee los snapshots
+    que el monitor (en el master) publica en el buffer compartido.
+    """
+    global _monitor_thread, _monitor_running
+
+    if _monitor_thread and _monitor_thread.is_alive():
+        logger.warning("⚠️ Monitor EC25 ya está corriendo")
+        return
+
+    path = path or default_path()
+    _monitor_running = True
+    _monitor_thread = threading.Thread(
+        target=_mirror_worker,
+        args=(path, poll_interval),
+        daemon=True,
+        name="EC25Mirror"
+    )
+    _monitor_thread.start()
+    logger.info("✅ Espejo EC25 iniciado (monitor en otro proceso)")
+
+
 def stop_monitor():
     """Detiene el hilo de monitoreo del EC25"""
-    global _monitor_running, _monitor_thread
+    global _monitor_running, _monitor_thread, _shared, _history
     
     if not _monitor_thread or not _monitor_thread.is_alive():
         logger.warning("⚠️ Monitor EC25 no está corriendo")
@@ -157,12 +478,16 @@ def stop_monitor():
         logger.info("✅ Monitor EC25 detenido")
     
     _monitor_thread = None
+    _shared = None
+    _history = None
 
 
 def set_monitor_enabled(enabled: bool):
     """Habilita o deshabilita el monitoreo (sin detener el hilo)"""
     global _monitor_enabled
     _monitor_enabled = enabled
+    if _shared is not None:
+        _shared.enabled = enabled
     logger.info("🔄 Monitor EC25 %s", "habilitado" if enabled else "deshabilitado")
 
 
@@ -173,4 +498,4 @@ def is_monitor_running() -> bool:
 
 def is_monitor_enabled() -> bool:
     """Verifica si el monitor está habilitado"""
-    return _monitor_enabled
+    return _is_enabled()
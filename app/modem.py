@@ -1,7 +1,11 @@
-import serial, glob, time
+import serial, glob, time, re
 import logging
+from .at_session import ATSession, BAUDRATE, command_timeout
+from .at_scheduler import ATScheduler, Priority
+from .at_batch import chain_commands, chunk_commands, split_chained_response
+from .at_cache import ATResponseCache
+from .modem_discovery import find_sysfs_at_ports
 
-BAUDRATE = 115200
 logger = logging.getLogger(__name__)
 
 # Cache del puerto AT (evita búsquedas constantes)
@@ -9,14 +13,53 @@ _cached_port = None
 _cache_time = 0
 CACHE_DURATION = 30  # segundos
 
+# Comandos de cada ciclo del monitor (CPIN al final: con SIM ausente da ERROR)
+SIGNAL_COMMANDS = ["AT+CSQ", "AT+QCSQ", "AT+QCAINFO"]
+NETWORK_COMMANDS = ["AT+COPS?", "AT+QNWINFO", "AT+CREG?", "AT+CEREG?", "AT+CPIN?"]
+
+# Ancho de banda LTE: bloques de recursos -> MHz
+LTE_BANDWIDTH_MHZ = {6: 1.4, 15: 3.0, 25: 5.0, 50: 10.0, 75: 15.0, 100: 20.0}
+
+# Tablas de los parsers (compiladas una sola vez, no en cada llamada)
+_CSQ_RE = re.compile(r'\+CSQ:\s*(\d+),(\d+)')
+_QCSQ_RE = re.compile(r'\+QCSQ:\s*"([^"]+)",(-?\d+),(-?\d+),(-?\d+),(-?\d+)')
+_QCAINFO_RE = re.compile(
+    r'\+QCAINFO:\s*"(pcc|scc)",(\d+),(\d+),"([^"]*)",(\d+),(\d+)(?:,(-?\d+),(-?\d+),(-?\d+),(-?\d+))?'
+)
+_COPS_RE = re.compile(r'\+COPS:\s*\d+,\d+,"([^"]+)",(\d+)')
+_QNWINFO_RE = re.compile(r'\+QNWINFO:\s*"([^"]+)","([^"]+)","([^"]+)",(\d+)')
+_REG_RE = re.compile(r'\+(CE?REG|CGREG):\s*\d+,(\d+)')
+_CPIN_RE = re.compile(r'\+CPIN:\s*([^\r\n]*\S)')
+COPS_TECH_MAP = {"0": "GSM", "2": "UTRAN", "7": "LTE", "9": "NB-IoT"}
+REG_STATUS_MAP = {"0": "No registrado", "1": "Registrado", "2": "Buscando", "3": "Denegado", "5": "Roaming"}
+SIM_STATUS_MAP = {"READY": "Lista", "SIM PIN": "PIN requerido", "SIM PUK": "PUK requerido"}
+
 def find_at_port(force_refresh=False):
     """Busca puerto AT del módem EC25 automáticamente"""
     global _cached_port, _cache_time
     
+    # Si la sesión AT tiene el puerto abierto, ese es el puerto válido
+    if _session.is_open and not force_refresh:
+        return _session.port
+    
     # Usar cache si existe y es reciente
     if not force_refresh and _cached_port and (time.time() - _cache_time < CACHE_DURATION):
         return _cached_port
     
+    # sysfs: VID:PID + interfaz USB -> ttyUSB, sin abrir ningún puerto
+    sysfs_ports = find_sysfs_at_ports()
+    if sysfs_ports:
+        if sysfs_ports[0] != _cached_port:
+            logger.info(f"✅ Puerto AT detectado vía sysfs: {sysfs_ports[0]}")
+        _cached_port = sysfs_ports[0]
+        _cache_time = time.time()
+        return _cached_port
+    
+    # No sondear el puerto que la sesión AT tiene abierto
+    if _session.is_open:
+        return _session.port
+    
+    # Fallback: probar cada ttyUSB con "AT"
     # Prioridad de puertos: ttyUSB2 primero (típico del EC25), luego el resto
     all_ports = glob.glob("/dev/ttyUSB*")
     priority_ports = ["/dev/ttyUSB2", "/dev/ttyUSB3"]
@@ -57,43 +100,76 @@ def find_at_port(force_refresh=False):
     _cached_port = None
     return None
 
-def send_at(cmd: str) -> str | None:
-    """Envía comando AT y retorna respuesta"""
-    port = find_at_port()
-    if not port:
-        logger.error("No hay puerto AT disponible")
-        return None
-    try:
-        with serial.Serial(port, BAUDRATE, timeout=2, rtscts=False, dsrdtr=False) as s:
-            # Limpiar buffers
-            s.reset_input_buffer()
-            s.reset_output_buffer()
-            
-            # Enviar comando
-            s.write((cmd + "\r\n").encode())
-            time.sleep(0.5)
-            
-            # Leer respuesta completa
-            response = ""
-            for _ in range(5):
-                chunk = s.read(s.in_waiting or 128).decode(errors="ignore")
-                response += chunk
-                if "OK" in response or "ERROR" in response:
-                    break
-                time.sleep(0.1)
-            
-            logger.debug(f"AT {cmd}: {response[:80]}...")
-            return response if response else None
-    except Exception as e:
-        logger.error(f"Error enviando comando AT {cmd}: {e}")
-        return None
+# Sesión AT compartida (mantiene el puerto abierto entre comandos)
+_session = ATSession(find_at_port)
+# Todos los comandos pasan por el planificador (un solo hilo usa el puerto)
+_scheduler = ATScheduler(_session)
+
+# Respuestas AT estáticas o lentas servidas desde memoria
+_cache = ATResponseCache()
+
+def send_at(cmd: str, timeout=None, priority=Priority.NORMAL, cached=True) -> str | None:
+    """Envía comando AT (vía planificador) y retorna respuesta; cached=False ignora la caché"""
+    if cached:
+        hit = _cache.get(cmd)
+        if hit is not None:
+            return hit
+    result = _scheduler.execute(cmd, priority=priority, timeout=timeout)
+    _cache.put(cmd, result)
+    return result
+
+def submit_at(cmd: str, timeout=None, priority=Priority.NORMAL):
+    """Encola comando AT y retorna un Future con la respuesta"""
+    return _scheduler.submit(cmd, priority=priority, timeout=timeout)
+
+def send_at_batch(cmds, priority=Priority.NORMAL, cached=True):
+    """
+    Envía varios comandos encadenados (AT+A;+B;+C) en el mínimo de escrituras.
+    Retorna {cmd: respuesta}. Si la cadena da ERROR, los comandos que no
+    respondieron se reintentan individualmente. cached=False no lee la caché
+    (el sondeo periódico siempre consulta al módem) pero sí la actualiza.
+    """
+    results = {}
+    for cmd in cmds if cached else ():
+        hit = _cache.get(cmd)
+        if hit is not None:
+            results[cmd] = hit
+    for chunk in chunk_commands([c for c in cmds if c not in results]):
+        if len(chunk) == 1:
+            results[chunk[0]] = send_at(chunk[0], priority=priority, cached=cached)
+            continue
+
+        timeout = max(command_timeout(c) for c in chunk)
+        raw = send_at(chain_commands(chunk), timeout=timeout, priority=priority, cached=cached)
+        if raw is None:
+            # Sin respuesta: el módem no está disponible, no reintentar
+            results.update(dict.fromkeys(chunk))
+            continue
+
+        split = split_chained_response(chunk, raw)
+        for cmd in chunk:
+            if split[cmd] is None:
+                logger.debug(f"Comando encadenado falló, reintentando {cmd} individualmente")
+                # send_at ya guarda la respuesta en la caché
+                split[cmd] = send_at(cmd, priority=priority, cached=cached)
+            else:
+                _cache.put(cmd, split[cmd])
+        results.update(split)
+    return results
+
+def get_at_stats():
+    """Métricas del planificador AT (profundidad de cola, esperas, rechazos)"""
+    return _scheduler.stats()
+
+def get_cache_stats():
+    """Aciertos/fallos de la caché de respuestas AT"""
+    return _cache.stats()
 
 def parse_csq(response):
     """Parsea +CSQ: rssi,ber"""
     if not response:
         return None
-    import re
-    match = re.search(r'\+CSQ:\s*(\d+),(\d+)', response)
+    match = _CSQ_RE.search(response)
     if match:
         rssi, ber = int(match.group(1)), int(match.group(2))
         # Convertir a dBm: -113 + (rssi * 2)
@@ -105,31 +181,67 @@ def parse_qcsq(response):
     """Parsea +QCSQ: type,rssi,rsrp,sinr,rsrq"""
     if not response:
         return None
-    import re
-    match = re.search(r'\+QCSQ:\s*"([^"]+)",(-?\d+),(-?\d+),(-?\d+),(-?\d+)', response)
+    match = _QCSQ_RE.search(response)
     if match:
         tech, rssi, rsrp, sinr, rsrq = match.groups()
         return f"{tech}: RSRP {rsrp}dBm, RSRQ {rsrq}dB, SINR {sinr}dB"
     return None
 
+def parse_signal_metrics(csq_raw, qcsq_raw):
+    """Valores numéricos de señal para el historial (None si no hay medición)"""
+    metrics = {"rsrp": None, "rsrq": None, "sinr": None, "csq": None}
+    match = _CSQ_RE.search(csq_raw or "")
+    if match and int(match.group(1)) != 99:
+        metrics["csq"] = int(match.group(1))
+    match = _QCSQ_RE.search(qcsq_raw or "")
+    if match:
+        _, _, rsrp, sinr, rsrq = match.groups()
+        metrics.update(rsrp=int(rsrp), rsrq=int(rsrq), sinr=int(sinr))
+    return metrics
+
+def parse_qcainfo(response):
+    """Parsea +QCAINFO: "pcc"|"scc",earfcn,rb,banda,estado,pci[,rsrp,rsrq,rssi,sinr] (agregación de portadoras)"""
+    if not response:
+        return None
+    carriers = []
+    for m in _QCAINFO_RE.finditer(response):
+        role, earfcn, rbs, band, state, pci, rsrp, rsrq, rssi, sinr = m.groups()
+        carriers.append({
+            "role": role,
+            "earfcn": int(earfcn),
+            "bandwidth_mhz": LTE_BANDWIDTH_MHZ.get(int(rbs)),
+            "band": band,
+            "state": int(state),
+            "pci": int(pci),
+            "rsrp": int(rsrp) if rsrp is not None else None,
+            "rsrq": int(rsrq) if rsrq is not None else None,
+            "rssi": int(rssi) if rssi is not None else None,
+            "sinr": int(sinr) if sinr is not None else None,
+        })
+    if not carriers:
+        return None
+    return {
+        "active": any(c["role"] == "scc" for c in carriers),
+        "carriers": carriers,
+        "bands": [c["band"] for c in carriers],
+        "bandwidth_mhz": sum(c["bandwidth_mhz"] or 0 for c in carriers),
+    }
+
 def parse_cops(response):
     """Parsea +COPS: mode,format,operator,act"""
     if not response:
         return None
-    import re
-    match = re.search(r'\+COPS:\s*\d+,\d+,"([^"]+)",(\d+)', response)
+    match = _COPS_RE.search(response)
     if match:
         operator, act = match.groups()
-        tech_map = {"0": "GSM", "2": "UTRAN", "7": "LTE", "9": "NB-IoT"}
-        return f"{operator} ({tech_map.get(act, 'Unknown')})"
+        return f"{operator} ({COPS_TECH_MAP.get(act, 'Unknown')})"
     return None
 
 def parse_qnwinfo(response):
     """Parsea +QNWINFO: act,mcc-mnc,band,channel"""
     if not response:
         return None
-    import re
-    match = re.search(r'\+QNWINFO:\s*"([^"]+)","([^"]+)","([^"]+)",(\d+)', response)
+    match = _QNWINFO_RE.search(response)
     if match:
         act, mcc_mnc, band, channel = match.groups()
         return f"{act} - {band} @ {channel} MHz"
@@ -139,44 +251,41 @@ def parse_reg_status(response):
     """Parsea +CREG/+CEREG: n,stat"""
     if not response:
         return None
-    import re
-    match = re.search(r'\+(C?[ER]REG):\s*\d+,(\d+)', response)
+    match = _REG_RE.search(response)
     if match:
         reg_type, stat = match.groups()
-        status_map = {"0": "No registrado", "1": "Registrado", "2": "Buscando", "3": "Denegado", "5": "Roaming"}
-        return status_map.get(stat, f"Estado {stat}")
+        return REG_STATUS_MAP.get(stat, f"Estado {stat}")
     return None
 
 def parse_cpin(response):
     """Parsea +CPIN: status"""
     if not response:
         return None
-    import re
-    match = re.search(r'\+CPIN:\s*(\w+)', response)
+    match = _CPIN_RE.search(response)
     if match:
         status = match.group(1)
-        status_map = {"READY": "Lista", "SIM PIN": "PIN requerido", "SIM PUK": "PUK requerido"}
-        return status_map.get(status, status)
+        return SIM_STATUS_MAP.get(status, status)
     return None
 
-def get_signal():
-    """Obtiene señal CSQ y QCSQ parseada"""
-    csq_raw = send_at("AT+CSQ")
-    qcsq_raw = send_at("AT+QCSQ")
+def _signal_from(raw):
+    """Arma el dict de señal a partir de las respuestas crudas"""
+    csq_raw = raw.get("AT+CSQ")
+    qcsq_raw = raw.get("AT+QCSQ")
     return {
         "csq": parse_csq(csq_raw) or "N/A",
         "csq_raw": csq_raw,
         "qcsq": parse_qcsq(qcsq_raw) or "N/A",
-        "qcsq_raw": qcsq_raw
+        "qcsq_raw": qcsq_raw,
+        "ca": parse_qcainfo(raw.get("AT+QCAINFO"))
     }
 
-def get_network_info():
-    """Obtiene info completa: operador, tecnología, registro, SIM"""
-    cops_raw = send_at("AT+COPS?")
-    qnwinfo_raw = send_at("AT+QNWINFO")
-    creg_raw = send_at("AT+CREG?")
-    cereg_raw = send_at("AT+CEREG?")
-    cpin_raw = send_at("AT+CPIN?")
+def _network_from(raw):
+    """Arma el dict de red a partir de las respuestas crudas"""
+    cops_raw = raw.get("AT+COPS?")
+    qnwinfo_raw = raw.get("AT+QNWINFO")
+    creg_raw = raw.get("AT+CREG?")
+    cereg_raw = raw.get("AT+CEREG?")
+    cpin_raw = raw.get("AT+CPIN?")
     
     return {
         "operator": parse_cops(cops_raw) or "N/A",
@@ -191,13 +300,32 @@ def get_network_info():
         "cpin_raw": cpin_raw
     }
 
+def get_signal(priority=Priority.BACKGROUND):
+    """Obtiene señal CSQ y QCSQ parseada"""
+    return _signal_from(send_at_batch(SIGNAL_COMMANDS, priority=priority))
+
+def get_network_info(priority=Priority.BACKGROUND):
+    """Obtiene info completa: operador, tecnología, registro, SIM"""
+    return _network_from(send_at_batch(NETWORK_COMMANDS, priority=priority))
+
+def get_modem_status(priority=Priority.BACKGROUND):
+    """Señal + red en un solo lote (2 transacciones serie en vez de 7); lo usa el monitor, sin caché"""
+    raw = send_at_batch(SIGNAL_COMMANDS + NETWORK_COMMANDS, priority=priority, cached=False)
+    return _signal_from(raw), _network_from(raw)
+
 def set_apn(apn: str):
     """Configura APN en el módem"""
-    return send_at(f'AT+CGDCONT=1,"IPV4V6","{apn}"')
+    return send_at(f'AT+CGDCONT=1,"IPV4V6","{apn}"', priority=Priority.INTERACTIVE)
 
 def reset_modem():
     """Reinicia el módem EC25"""
-    return send_at("AT+CFUN=1,1")
+    global _cached_port
+    result = send_at("AT+CFUN=1,1", priority=Priority.INTERACTIVE)
+    # El módem se re-enumera en USB: cerrar sesión, olvidar el puerto y la caché
+    _session.close()
+    _cache.clear()
+    _cached_port = None
+    return result
 
 def is_ec25_detected():
     """Detecta si el módem EC25 está presente"""
@@ -0,0 +1,69 @@
+"""
+Detección del puerto AT leyendo /sys/bus/usb/devices (sin abrir ningún puerto).
+Resuelve VID:PID de Quectel + número de interfaz USB al ttyUSB correspondiente.
+"""
+import glob
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+SYSFS_USB_DEVICES = "/sys/bus/usb/devices"
+
+# (idVendor, idProduct) -> interfaces con puerto AT, en orden de preferencia.
+# EC25/EG25: if00 DM, if01 NMEA, if02 AT, if03 modem (PPP, también responde AT)
+AT_INTERFACES = {
+    ("2c7c", "0125"): (2, 3),
+}
+
+
+def _read_attr(path):
+    try:
+        with open(path) as f:
+            return f.read().strip().lower()
+    except OSError:
+        return None
+
+
+def _interface_tty(interface_dir):
+    """ttyUSB creado por el driver option/usb-serial para una interfaz"""
+    ttys = glob.glob(os.path.join(interface_dir, "ttyUSB*")) or glob.glob(
+        os.path.join(interface_dir, "tty", "ttyUSB*")
+    )
+    if not ttys:
+        return None
+    return "/dev/" + os.path.basename(sorted(ttys)[0])
+
+
+def find_sysfs_at_ports(root=SYSFS_USB_DEVICES):
+    """Lista de puertos AT (uno por módem) según sysfs; [] si no hay ninguno"""
+    try:
+        entries = sorted(os.listdir(root))
+    except OSError:
+        return []
+
+    ports = []
+    for entry in entries:
+        if ":" in entry:  # es una interfaz, no un dispositivo
+            continue
+        device_dir = os.path.join(root, entry)
+        vid = _read_attr(os.path.join(device_dir, "idVendor"))
+        pid = _read_attr(os.path.join(device_dir, "idProduct"))
+        wanted = AT_INTERFACES.get((vid or "", pid or ""))
+        if not wanted:
+            continue
+
+        by_number = {}
+        for interface_dir in glob.glob(os.path.join(device_dir, f"{entry}:*")):
+            number = _read_attr(os.path.join(interface_dir, "bInterfaceNumber"))
+            if number is not None:
+                by_number[int(number, 16)] = interface_dir
+
+        for number in wanted:
+            interface_dir = by_number.get(number)
+            tty = _interface_tty(interface_dir) if interface_dir else None
+            if tty:
+                logger.debug(f"Módem {vid}:{pid} en {entry} -> {tty}")
+                ports.append(tty)
+                break
+    return ports
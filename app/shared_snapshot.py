@@ -0,0 +1,132 @@
+"""
+Buffer compartido entre procesos para el snapshot del monitor EC25.
+
+Con gunicorn -w N el monitor corre una sola vez (en el master, ver
+gunicorn.conf.py) y escribe cada snapshot serializado en un archivo
+mapeado en memoria (/dev/shm). Los workers lo leen directamente, sin
+IPC ni sockets, protegidos por un seqlock: el escritor incrementa el
+contador antes y después de copiar los bytes (impar = escritura en curso)
+y el lector reintenta si el contador cambió mientras copiaba.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+MAGIC = b"EC25"
+# magic, habilitado, seqlock, seq publicado, largo, crc32, época del escritor
+_HEADER = struct.Struct("<4sB3xQQIIQ")
+_ENABLED = struct.Struct("<B")
+_LOCK = struct.Struct("<Q")
+_PAYLOAD = struct.Struct("<QII")
+_EPOCH = struct.Struct("<Q")
+_ENABLED_OFFSET = 4
+_LOCK_OFFSET = 8
+_PAYLOAD_OFFSET = 16
+_EPOCH_OFFSET = 32
+DATA_OFFSET = _HEADER.size
+
+DEFAULT_CAPACITY = 64 * 1024
+READ_RETRIES = 100
+
+
+def default_path():
+    """Ruta del buffer: tmpfs si existe, si no el directorio temporal"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "ec25-monitor")
+
+
+class SharedSnapshot:
+    """Un escritor (el monitor) y cualquier cantidad de lectores (workers)"""
+
+    def __init__(self, path, mm, capacity):
+        self.path = path
+        self.capacity = capacity
+        self._mm = mm
+
+    @classmethod
+    def create(cls, path=None, capacity=DEFAULT_CAPACITY):
+        """Crea (o reinicia) el buffer; lo llama el proceso que corre el monitor"""
+        path = path or default_path()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            os.ftruncate(fd, DATA_OFFSET + capacity)
+            mm = mmap.mmap(fd, DATA_OFFSET + capacity)
+        finally:
+            os.close(fd)
+        _HEADER.pack_into(mm, 0, MAGIC, 0, 0, 0, 0, 0, time.time_ns())
+        return cls(path, mm, capacity)
+
+    @classmethod
+    def open(cls, path=None):
+        """Abre un buffer existente; None si el monitor todavía no lo creó"""
+        path = path or default_path()
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        try:
+            size = os.fstat(fd).st_size
+            if size <= DATA_OFFSET:
+                return None
+            mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        if mm[:4] != MAGIC:
+            mm.close()
+            return None
+        return cls(path, mm, size - DATA_OFFSET)
+
+    def close(self):
+        self._mm.close()
+
+    @property
+    def enabled(self):
+        """Bandera de habilitado: la escribe cualquier worker, la lee el monitor"""
+        return bool(_ENABLED.unpack_from(self._mm, _ENABLED_OFFSET)[0])
+
+    @enabled.setter
+    def enabled(self, value):
+        _ENABLED.pack_into(self._mm, _ENABLED_OFFSET, 1 if value else 0)
+
+    @property
+    def epoch(self):
+        """Marca de creación del buffer: los seq de otro arranque del monitor no son comparables"""
+        return _EPOCH.unpack_from(self._mm, _EPOCH_OFFSET)[0]
+
+    @property
+    def seq(self):
+        """Seq del último snapshot publicado (lectura barata para detectar cambios)"""
+        return _PAYLOAD.unpack_from(self._mm, _PAYLOAD_OFFSET)[0]
+
+    def write(self, seq, body):
+        """Publica los bytes de un snapshot (un único escritor)"""
+        if len(body) > self.capacity:
+            raise ValueError(f"Snapshot de {len(body)} bytes excede el buffer ({self.capacity})")
+        lock = _LOCK.unpack_from(self._mm, _LOCK_OFFSET)[0]
+        _LOCK.pack_into(self._mm, _LOCK_OFFSET, lock + 1)
+        self._mm[DATA_OFFSET:DATA_OFFSET + len(body)] = body
+        _PAYLOAD.pack_into(self._mm, _PAYLOAD_OFFSET, seq, len(body), zlib.crc32(body))
+        _LOCK.pack_into(self._mm, _LOCK_OFFSET, lock + 2)
+
+    def read(self, last_seq=None):
+        """
+        Devuelve (seq, bytes) del último snapshot, o None si no hay nada
+        nuevo respecto a last_seq o no se logró una lectura consistente.
+        """
+        for _ in range(READ_RETRIES):
+            lock = _LOCK.unpack_from(self._mm, _LOCK_OFFSET)[0]
+            if lock & 1:
+                continue
+            seq, length, crc = _PAYLOAD.unpack_from(self._mm, _PAYLOAD_OFFSET)
+            if seq == 0 or seq == last_seq:
+                return None
+            if length > self.capacity:
+                continue
+            body = self._mm[DATA_OFFSET:DATA_OFFSET + length]
+            # El crc cubre el orden de escritura en CPUs que reordenan stores (ARM)
+            if _LOCK.unpack_from(self._mm, _LOCK_OFFSET)[0] == lock and zlib.crc32(body) == crc:
+                return seq, body
+        return None
@@ -0,0 +1,197 @@
+"""
+Historial de métricas de señal del EC25 en un buffer circular de memoria fija.
+
+Una columna de timestamps (float64) y una columna float32 por métrica,
+vistas como arrays sobre un único buffer: un bytearray en el proceso del
+monitor, o un archivo mapeado en /dev/shm cuando el monitor corre aparte
+de los workers de gunicorn (ver gunicorn.conf.py). 86400 muestras (24 h a
+1 s) ocupan ~2 MB. Las métricas sin medición se guardan como NaN.
+
+El submuestreo usa NumPy si está instalado y si no cae a Python puro,
+con el mismo resultado.
+"""
+import math
+import mmap
+import os
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # Raspberry Pi sin NumPy: mismo resultado, más lento
+    np = None
+
+METRICS = ("rsrp", "rsrq", "sinr", "csq")
+DEFAULT_CAPACITY = 24 * 3600
+MAX_POINTS = 2000
+
+MAGIC = b"EC25HIST"
+# magic, capacidad, muestras escritas en total
+_HEADER = struct.Struct("<8sQQ")
+_HEAD_OFFSET = 16
+
+
+def buffer_size(capacity):
+    return _HEADER.size + capacity * (8 + 4 * len(METRICS))
+
+
+class SignalHistory:
+    """Un escritor (el monitor) y lectores concurrentes sin locks"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, buffer=None):
+        if buffer is None:
+            buffer = bytearray(buffer_size(capacity))
+            _HEADER.pack_into(buffer, 0, MAGIC, capacity, 0)
+        magic, capacity, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Buffer de historial inválido")
+        self.capacity = capacity
+        self._buffer = buffer
+        view = memoryview(buffer)
+        offset = _HEADER.size
+        self._t = view[offset:offset + capacity * 8].cast("d")
+        offset += capacity * 8
+        self._columns = {}
+        for metric in METRICS:
+            self._columns[metric] = view[offset:offset + capacity * 4].cast("f")
+            offset += capacity * 4
+
+    @classmethod
+    def create(cls, path, capacity=DEFAULT_CAPACITY):
+        """Historial en un archivo mapeado, compartido con otros procesos"""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            os.ftruncate(fd, buffer_size(capacity))
+            mm = mmap.mmap(fd, buffer_size(capacity))
+        finally:
+            os.close(fd)
+        _HEADER.pack_into(mm, 0, MAGIC, capacity, 0)
+        return cls(buffer=mm)
+
+    @classmethod
+    def open(cls, path):
+        """Abre un historial compartido existente; None si todavía no existe"""
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        try:
+            size = os.fstat(fd).st_size
+            if size < _HEADER.size:
+                return None
+            mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        try:
+            return cls(buffer=mm)
+        except ValueError:
+            return None
+
+    @property
+    def count(self):
+        """Muestras escritas desde el arranque (incluye las ya pisadas)"""
+        return struct.unpack_from("<Q", self._buffer, _HEAD_OFFSET)[0]
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp, metrics):
+        """Agrega una muestra; las métricas ausentes o None quedan como NaN"""
+        head = self.count
+        slot = head % self.capacity
+        self._t[slot] = timestamp
+        for metric, column in self._columns.items():
+            value = metrics.get(metric)
+            column[slot] = math.nan if value is None else value
+        # Publicar la muestra recién cuando está completa
+        struct.pack_into("<Q", self._buffer, _HEAD_OFFSET, head + 1)
+
+    def _window(self, metric):
+        """Copia (timestamps, valores) en orden cronológico, sin muestras pisadas a mitad de lectura"""
+        head = self.count
+        start = max(0, head - self.capacity)
+        t = _ordered(self._t, head, self.capacity)
+        values = _ordered(self._columns[metric], head, self.capacity)
+        # El escritor pudo avanzar mientras copiábamos (y el slot siguiente puede estar a medio escribir)
+        overwritten = max(0, self.count + 1 - self.capacity - start)
+        return t[overwritten:], values[overwritten:]
+
+    def query(self, metric, start=None, end=None, step=None):
+        """
+        Serie submuestreada de una métrica entre start y end (epoch en segundos).
+        Cada bucket de `step` segundos devuelve promedio, mínimo, máximo y
+        cantidad de muestras; los buckets vacíos se omiten. step se agranda
+        si hiciera falta para no pasar de MAX_POINTS puntos.
+        """
+        if metric not in self._columns:
+            raise ValueError(f"Métrica desconocida: {metric}")
+        t, values = self._window(metric)
+        if end is None:
+            end = float(t[-1]) if len(t) else 0.0
+        if start is None:
+            start = end - 3600
+        if end < start:
+            raise ValueError("El rango termina antes de empezar")
+        span = end - start
+        step = max(float(step or 0), span / MAX_POINTS, 1.0)
+        buckets = int(span // step) + 1
+        downsample = _downsample_numpy if np is not None else _downsample_python
+        series = downsample(t, values, start, end, step, buckets)
+        return {"metric": metric, "from": start, "to": end, "step": step, **series}
+
+
+def _ordered(column, head, capacity):
+    """Columna de la muestra más vieja a la más nueva"""
+    if np is not None:
+        column = np.frombuffer(column, dtype=np.float64 if column.format == "d" else np.float32)
+        if head < capacity:
+            return column[:head].astype(np.float64)
+        first = head % capacity
+        return np.concatenate((column[first:], column[:first])).astype(np.float64)
+    if head < capacity:
+        return column[:head].tolist()
+    first = head % capacity
+    return column[first:].tolist() + column[:first].tolist()
+
+
+def _downsample_numpy(t, values, start, end, step, buckets):
+    mask = (t >= start) & (t <= end) & ~np.isnan(values)
+    index = ((t[mask] - start) // step).astype(np.intp)
+    values = values[mask]
+    counts = np.bincount(index, minlength=buckets)
+    sums = np.bincount(index, weights=values, minlength=buckets)
+    mins = np.full(buckets, np.inf)
+    maxs = np.full(buckets, -np.inf)
+    np.minimum.at(mins, index, values)
+    np.maximum.at(maxs, index, values)
+    filled = counts > 0
+    return {
+        "t": (start + np.flatnonzero(filled) * step).tolist(),
+        "avg": np.round(sums[filled] / counts[filled], 2).tolist(),
+        "min": mins[filled].tolist(),
+        "max": maxs[filled].tolist(),
+        "count": counts[filled].tolist(),
+    }
+
+
+def _downsample_python(t, values, start, end, step, buckets):
+    stats = {}
+    for ts, value in zip(t, values):
+        if ts < start or ts > end or value != value:
+            continue
+        bucket = int((ts - start) // step)
+        entry = stats.get(bucket)
+        if entry is None:
+            stats[bucket] = [value, value, value, 1]
+        else:
+            entry[0] += value
+            entry[1] = min(entry[1], value)
+            entry[2] = max(entry[2], value)
+            entry[3] += 1
+    ordered = sorted(stats.items())
+    return {
+        "t": [start + bucket * step for bucket, _ in ordered],
+        "avg": [round(s[0] / s[3], 2) for _, s in ordered],
+        "min": [s[1] for _, s in ordered],
+        "max": [s[2] for _, s in ordered],
+        "count": [s[3] for _, s in ordered],
+    }
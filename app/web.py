@@ -2,12 +2,13 @@ import logging
 import subprocess
 import re
 import os
-import json
 import time
 from flask import Blueprint, jsonify, render_template, request, redirect, url_for, flash, Response
 from flask_login import login_user, logout_user, login_required, current_user
 
-from .modem import get_network_info, get_signal, set_apn, reset_modem, find_at_port, is_ec25_detected as modem_is_ec25_detected
+from .modem import get_network_info, get_signal, set_apn, reset_modem, get_at_stats, get_cache_stats, is_ec25_detected as modem_is_ec25_detected
+from .at_scheduler import Priority
+from .modem_discovery import find_sysfs_at_ports
 from .config import load_config, save_config
 from .network import active_wan
 from .firewall import apply_firewall
@@ -47,10 +48,9 @@ def set_ec25_enabled(enabled: bool):
         f.writelines(lines)
 
 def is_ec25_detected():
-    """Detecta si el EC25 está conectado"""
+    """Detecta si el EC25 está conectado (sysfs; el sondeo AT queda cacheado)"""
     try:
-        port = find_at_port(force_refresh=True)
-        return port is not None
+        return bool(find_sysfs_at_ports()) or modem_is_ec25_detected()
     except:
         return False
 
@@ -62,8 +62,15 @@ def api_ec25_data():
     Obtiene los últimos datos del EC25 desde el cache del monitor.
     Alternativa rápida al SSE para obtener datos sin streaming.
     """
-    data = ec25_monitor.get_latest_data()
-    return jsonify(data)
+    snapshot = ec25_monitor.get_latest_data()
+    # Bytes serializados una vez por actualización; sin json.dumps por petición
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if snapshot.etag in request.headers.get("If-None-Match", ""):
+        return Response(status=304, headers=headers)
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(snapshot.gzipped, mimetype="application/json", headers=headers)
+    return Response(snapshot.body, mimetype="application/json", headers=headers)
 
 # ============== Helper Functions ==============
 
@@ -174,12 +181,24 @@ def api_set_web_password():
 @web.route("/api/signal")
 @login_required
 def api_signal():
-    return jsonify(get_signal())
+    return jsonify(get_signal(priority=Priority.INTERACTIVE))
 
 @web.route("/api/modem/info")
 @login_required
 def api_modem_info():
-    return jsonify(get_network_info())
+    return jsonify(get_network_info(priority=Priority.INTERACTIVE))
+
+@web.route("/api/modem/scheduler")
+@login_required
+def api_modem_scheduler():
+    """Métricas del planificador AT (cola, esperas por prioridad, rechazos)"""
+    return jsonify(get_at_stats())
+
+@web.route("/api/modem/cache")
+@login_required
+def api_modem_cache():
+    """Aciertos/fallos de la caché de respuestas AT"""
+    return jsonify(get_cache_stats())
 
 @web.route("/api/modem/reset", methods=["POST"])
 @login_required
@@ -277,29 +296,42 @@ def api_ec25_toggle():
 def api_ec25_stream():
     """
     Server-Sent Events endpoint para streaming de datos del EC25 en tiempo real.
-    Consume datos de la cola alimentada por el hilo de monitoreo.
+    Cada conexión tiene su propia suscripción al difusor del monitor.
     """
+    # Id del último evento recibido: cabecera del reintento nativo o parámetro de una reconexión manual
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id", "")
+
     def event_stream():
-        """Generador que produce eventos SSE"""
-        # Enviar datos iniciales desde cache
-        initial_data = ec25_monitor.get_latest_data()
-        yield f"data: {json.dumps(initial_data)}\n\n"
-        
-        # Timeout para keep-alive (30s)
-        timeout = 30.0
-        
-        while True:
-            try:
-                # Esperar datos de la cola con timeout
-                data = ec25_monitor.ec25_data_queue.get(timeout=timeout)
-                
-                # Enviar como evento SSE
-                yield f"data: {json.dumps(data)}\n\n"
-                
-            except:
-                # Timeout: enviar keep-alive (comentario SSE)
-                yield ": keep-alive\n\n"
-    
+        """Generador que produce eventos SSE: snapshot inicial y luego solo parches"""
+        # Suscribirse antes de leer el historial para no perder la siguiente actualización
+        with ec25_monitor.broadcaster.subscribe() as subscription:
+            # Un id de otra época (el monitor se reinició) recibe el snapshot completo
+            encoder = ec25_monitor.broadcaster.resume(last_event_id)
+            yield "retry: 3000\n\n"
+
+            # Estado actual: completo, o solo lo que cambió desde el id del cliente
+            current = ec25_monitor.broadcaster.snapshot_at(ec25_monitor.broadcaster.seq)
+            if current is not None:
+                event = encoder.encode(*current)
+                if event is not None:
+                    yield event
+            else:
+                # Monitor sin publicaciones aún: estado inicial (id 0, retomarlo pide snapshot completo)
+                yield ec25_monitor.get_latest_data().event
+
+            # Timeout para keep-alive (30s)
+            timeout = 30.0
+
+            while True:
+                item = subscription.get(timeout=timeout)
+                if item is None:
+                    # Timeout: enviar keep-alive (comentario SSE)
+                    yield ": keep-alive\n\n"
+                    continue
+                event = encoder.encode(*item)
+                if event is not None:
+                    yield event
+
     return Response(
         event_stream(),
         mimetype="text/event-stream",
@@ -310,6 +342,36 @@ def api_ec25_stream():
     )
 
 
+@web.route("/api/ec25/stream/stats")
+@login_required
+def api_ec25_stream_stats():
+    """Suscriptores SSE conectados y actualizaciones perdidas por lectores lentos"""
+    return jsonify(ec25_monitor.broadcaster.stats())
+
+
+@web.route("/api/ec25/history")
+@login_required
+def api_ec25_history():
+    """
+    Serie submuestreada de una métrica de señal.
+    Parámetros: metric (rsrp|rsrq|sinr|csq), from/to (epoch, por defecto la
+    última hora) y step (segundos por punto).
+    """
+    history = ec25_monitor.get_history()
+    if history is None:
+        return jsonify({"error": "Historial no disponible"}), 503
+    try:
+        series = history.query(
+            request.args.get("metric", "rsrp"),
+            start=request.args.get("from", type=float),
+            end=request.args.get("to", type=float),
+            step=request.args.get("step", type=float),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(series)
+
+
 # ============== WiFi AP Configuration ==============
 
 def read_hostapd_config():
@@ -1,45 +1,219 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
 
 from ..core.deps import get_current_active_user
 from ..models.user import User
-from ..schemas.lte import APNRequest, LTEStatusResponse, ModemCommandRequest
+from ..schemas.lte import (
+    AlignmentRequest,
+    AlignmentStatusResponse,
+    APNRequest,
+    ATCacheStatsResponse,
+    ATSchedulerStatsResponse,
+    BandLockRequest,
+    BandScanRequest,
+    BandScanResponse,
+    CellSampleResponse,
+    DataCallStatusResponse,
+    LTEStatusResponse,
+    ModemCommandRequest,
+    ModemInfoResponse,
+    ModemSummaryResponse,
+    OperatorScanResponse,
+    RecoveryStatusResponse,
+    RecoveryStepResponse,
+    StreamStatsResponse,
+)
 from ..schemas.token import MessageResponse
-from ..services.ec25_monitor import get_latest_data
-from ..services.modem import reset_modem, send_at, set_apn
+from ..services.at_scheduler import Priority
+from ..services.band_scan import scanner
+from ..services.cell_info import CellHistory
+from ..services.data_call import data_call
+from ..services.ec25_monitor import (
+    Broadcaster,
+    Snapshot,
+    broadcaster,
+    get_alignment_status,
+    get_latest_data,
+    monitor,
+    start_alignment,
+    stop_alignment,
+)
+from ..services.modem import (
+    get_at_stats,
+    get_busy_reason,
+    get_cache_stats,
+    get_modem_info_async,
+    reset_modem_async,
+    send_at_async,
+    set_apn_async,
+)
+from ..services.modem_registry import ModemEntry, registry
+from ..services.operator_scan import operator_scanner
+from ..services.recovery import recovery
+from ..services.scan_job import ScanJob
 
 router = APIRouter(prefix="/api/lte", tags=["lte"])
 
 
+def _snapshot_response(request: Request, snapshot: Snapshot) -> Response:
+    # Pre-encoded bytes as-is: no validation or json.dumps per request.
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if snapshot.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(snapshot.gzipped, media_type="application/json", headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+
 @router.get("/status", response_model=LTEStatusResponse)
-async def get_lte_status(current_user: User = Depends(get_current_active_user)):
-    return get_latest_data()
+async def get_lte_status(request: Request, current_user: User = Depends(get_current_active_user)):
+    return _snapshot_response(request, get_latest_data())
 
 
-@router.get("/stream")
-async def stream_lte(current_user: User = Depends(get_current_active_user)):
-    import asyncio
-    import json
+@router.get("/info", response_model=ModemInfoResponse)
+async def get_modem_info(current_user: User = Depends(get_current_active_user)):
+    return await get_modem_info_async()
+
+
+SSE_RETRY_MS = 3000
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
 
-    from ..services.ec25_monitor import ec25_data_queue
 
+def _event_stream(source: Broadcaster, last_event_id: str | None = None) -> StreamingResponse:
+    async def event_generator():
+        with source.subscribe() as subscription:
+            # Full snapshot on connect, or only what changed since the id the client last saw.
+            encoder = source.resume(last_event_id)
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            current = source.snapshot_at(source.seq)
+            if current is not None:
+                event = encoder.encode(*current)
+                if event is not None:
+                    yield event
+            while True:
+                item = await subscription.get_async(timeout=10)
+                if item is None:
+                    yield ": keepalive\n\n"
+                    continue
+                event = encoder.encode(*item)
+                if event is not None:
+                    yield event
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _job_stream(job: ScanJob, interval: float = 1.0) -> StreamingResponse:
     async def event_generator():
         while True:
-            try:
-                data = await asyncio.to_thread(ec25_data_queue.get, timeout=10)
-                yield f"data: {json.dumps(data, default=str)}\n\n"
-            except Exception:
-                yield ": keepalive\n\n"
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+            result = job.result()
+            yield f"data: {json.dumps(result, default=str)}\n\n"
+            if result["state"] != "running":
+                return
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/stream")
+async def stream_lte(
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    resume: str | None = Query(default=None, alias="last_event_id"),
+    current_user: User = Depends(get_current_active_user),
+):
+    return _event_stream(broadcaster, last_event_id or resume)
+
+
+@router.get("/stream/stats", response_model=StreamStatsResponse)
+async def stream_stats(current_user: User = Depends(get_current_active_user)):
+    return broadcaster.stats()
+
+
+@router.get("/alignment", response_model=AlignmentStatusResponse)
+async def alignment_status(current_user: User = Depends(get_current_active_user)):
+    return get_alignment_status()
+
+
+@router.post("/alignment", response_model=AlignmentStatusResponse)
+async def start_alignment_mode(
+    request: AlignmentRequest,
+    current_user: User = Depends(get_current_active_user),
+):
+    return start_alignment(request.rate, request.duration, request.source)
+
+
+@router.delete("/alignment", response_model=AlignmentStatusResponse)
+async def stop_alignment_mode(current_user: User = Depends(get_current_active_user)):
+    stop_alignment()
+    return get_alignment_status()
+
+
+def _query_cells(
+    history: CellHistory,
+    since: float | None,
+    until: float | None,
+    pci: int | None,
+    limit: int,
+) -> list[dict[str, Any]]:
+    return [sample.to_dict() for sample in history.query(since=since, until=until, pci=pci, limit=limit)]
+
+
+@router.get("/cells", response_model=list[CellSampleResponse])
+async def get_cell_history(
+    since: float | None = None,
+    until: float | None = None,
+    pci: int | None = None,
+    limit: int = Query(default=60, ge=1, le=10000),
+    current_user: User = Depends(get_current_active_user),
+):
+    return _query_cells(monitor.cells, since, until, pci, limit)
+
+
+def _get_modem(modem_id: str) -> ModemEntry:
+    entry = registry.get(modem_id)
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Modem {modem_id} not found")
+    return entry
+
+
+@router.get("/modems", response_model=list[ModemSummaryResponse])
+async def list_modems(current_user: User = Depends(get_current_active_user)):
+    return [entry.summary() for entry in registry.entries()]
+
+
+@router.get("/modems/{modem_id}/status", response_model=LTEStatusResponse)
+async def get_modem_status(modem_id: str, request: Request, current_user: User = Depends(get_current_active_user)):
+    return _snapshot_response(request, _get_modem(modem_id).monitor.get_latest_data())
+
+
+@router.get("/modems/{modem_id}/stream")
+async def stream_modem(
+    modem_id: str,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    resume: str | None = Query(default=None, alias="last_event_id"),
+    current_user: User = Depends(get_current_active_user),
+):
+    return _event_stream(_get_modem(modem_id).monitor.broadcaster, last_event_id or resume)
+
+
+@router.get("/modems/{modem_id}/cells", response_model=list[CellSampleResponse])
+async def get_modem_cell_history(
+    modem_id: str,
+    since: float | None = None,
+    until: float | None = None,
+    pci: int | None = None,
+    limit: int = Query(default=60, ge=1, le=10000),
+    current_user: User = Depends(get_current_active_user),
+):
+    return _query_cells(_get_modem(modem_id).monitor.cells, since, until, pci, limit)
 
 
 @router.post("/apn", response_model=MessageResponse)
@@ -47,7 +221,7 @@ async def configure_apn(
     request: APNRequest,
     current_user: User = Depends(get_current_active_user),
 ):
-    result = set_apn(request.apn)
+    result = await set_apn_async(request.apn)
     if result and "OK" in result:
         return MessageResponse(message=f"APN configured: {request.apn}")
     return MessageResponse(message=f"Failed to configure APN. Response: {result}")
@@ -55,7 +229,7 @@ async def configure_apn(
 
 @router.post("/reset", response_model=MessageResponse)
 async def reset_modem_endpoint(current_user: User = Depends(get_current_active_user)):
-    result = reset_modem()
+    result = await reset_modem_async()
     if result:
         return MessageResponse(message="Modem reset command sent")
     return MessageResponse(message="Failed to send reset command")
@@ -68,5 +242,122 @@ async def send_at_command(
 ):
     if not request.command.upper().startswith("AT"):
         request.command = f"AT{request.command}"
-    result = send_at(request.command)
+    busy = get_busy_reason()
+    if busy is not None:
+        return MessageResponse(message=f"Modem busy: {busy}")
+    result = await send_at_async(request.command, priority=Priority.INTERACTIVE, cached=False)
     return MessageResponse(message=f"Response: {result}" if result else "No response")
+
+
+@router.get("/scan", response_model=BandScanResponse)
+async def get_band_scan(current_user: User = Depends(get_current_active_user)):
+    return scanner.result()
+
+
+@router.post("/scan", response_model=BandScanResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_band_scan(
+    request: BandScanRequest,
+    current_user: User = Depends(get_current_active_user),
+):
+    if get_busy_reason() is not None or not scanner.start(
+        request.method, bands=request.bands, probe=request.probe, lock=request.lock
+    ):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Modem busy with another scan")
+    return scanner.result()
+
+
+@router.get("/scan/stream")
+async def stream_band_scan(current_user: User = Depends(get_current_active_user)):
+    return _job_stream(scanner)
+
+
+@router.get("/operators", response_model=OperatorScanResponse)
+async def get_operator_scan(current_user: User = Depends(get_current_active_user)):
+    return operator_scanner.result()
+
+
+@router.post("/operators/scan", response_model=OperatorScanResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_operator_scan(current_user: User = Depends(get_current_active_user)):
+    if get_busy_reason() is not None or not operator_scanner.start():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Modem busy with another scan")
+    return operator_scanner.result()
+
+
+@router.get("/operators/scan/stream")
+async def stream_operator_scan(current_user: User = Depends(get_current_active_user)):
+    return _job_stream(operator_scanner)
+
+
+def _check_band_lock_allowed() -> None:
+    # A running scan restores the original bands when it ends and would undo the change.
+    if scanner.running or get_busy_reason() is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Modem busy with another scan")
+
+
+@router.post("/scan/lock", response_model=MessageResponse)
+async def lock_band(
+    request: BandLockRequest,
+    current_user: User = Depends(get_current_active_user),
+):
+    _check_band_lock_allowed()
+    with scanner.client.busy_for("fijando banda"):
+        locked = await scanner.lock(request.band, request.earfcn, request.pci)
+    if locked:
+        return MessageResponse(message=f"Locked to LTE band {request.band}")
+    return MessageResponse(message="Failed to lock band")
+
+
+@router.delete("/scan/lock", response_model=MessageResponse)
+async def unlock_band(current_user: User = Depends(get_current_active_user)):
+    _check_band_lock_allowed()
+    with scanner.client.busy_for("liberando banda"):
+        unlocked = await scanner.unlock()
+    if unlocked:
+        return MessageResponse(message="Band lock removed")
+    return MessageResponse(message="Failed to restore band configuration")
+
+
+@router.get("/data-call", response_model=DataCallStatusResponse)
+async def get_data_call_status(current_user: User = Depends(get_current_active_user)):
+    return data_call.status()
+
+
+@router.post("/data-call/restart", response_model=DataCallStatusResponse)
+async def restart_data_call(current_user: User = Depends(get_current_active_user)):
+    if get_busy_reason() is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Modem busy")
+    await data_call.restart()
+    return data_call.status()
+
+
+@router.get("/recovery", response_model=RecoveryStatusResponse)
+async def get_recovery_status(current_user: User = Depends(get_current_active_user)):
+    return recovery.status()
+
+
+@router.get("/recovery/log", response_model=list[RecoveryStepResponse])
+async def get_recovery_log(
+    limit: int | None = Query(default=None, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+):
+    return recovery.log(limit)
+
+
+@router.post("/recovery", response_model=RecoveryStatusResponse)
+async def run_recovery(current_user: User = Depends(get_current_active_user)):
+    if get_busy_reason() is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Modem busy")
+    failure = await recovery.diagnose()
+    if failure is not None:
+        await recovery.recover(failure)
+    return recovery.status()
+
+
+@router.get("/scheduler", response_model=ATSchedulerStatsResponse)
+async def at_scheduler_stats(current_user: User = Depends(get_current_active_user)):
+    return get_at_stats()
+
+
+@router.get("/cache", response_model=ATCacheStatsResponse)
+async def at_cache_stats(current_user: User = Depends(get_current_active_user)):
+    return get_cache_stats()
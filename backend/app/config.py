@@ -29,6 +29,23 @@ class Settings(BaseSettings):
 
     EC25_ENABLED: bool = True
     EC25_UPDATE_INTERVAL: float = 5.0
+    EC25_SIGNAL_INTERVAL: float = 2.0
+    EC25_SLOW_INTERVAL: float = 60.0
+    EC25_CELL_INTERVAL: float = 10.0
+    EC25_CELL_HISTORY: int = 720
+    EC25_SCAN_PROBE_URL: str | None = None
+    EC25_AT_PORT: str | None = None
+    EC25_SIMULATOR: bool = False
+    EC25_URC_ENABLED: bool = False
+    EC25_URC_UPDATE_INTERVAL: float = 30.0
+    EC25_CACHE_TTLS: dict[str, float | None] = {}
+    EC25_TRANSCRIPT_PATH: str | None = None
+    # Off by default: scripts/watchdog.sh also resets the modem unless it sees our heartbeat.
+    EC25_RECOVERY_ENABLED: bool = False
+    EC25_RECOVERY_HEARTBEAT: str = "/run/lock/ec25-recovery.heartbeat"
+    # Off by default: wan-manager.sh and watchdog.sh already own the usb0/wwan0 lease.
+    EC25_DATA_CALL_ENABLED: bool = False
+    EC25_DATA_CID: int = 1
 
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
 
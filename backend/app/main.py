@@ -8,7 +8,21 @@ from .api import auth, lte, network, system
 from .config import settings
 from .core.logging_config import setup_logging
 from .database import init_db
+from .services.at_transcript import TranscriptRecorder
+from .services.band_scan import scanner
+from .services.data_call import data_call
 from .services.ec25_monitor import start_monitor, stop_monitor
+from .services.ec25_simulator import EC25Simulator
+from .services.modem import (
+    configure_cache,
+    configure_port,
+    primary,
+    start_async_transport,
+    stop_async_transport,
+)
+from .services.modem_registry import registry
+from .services.operator_scan import operator_scanner
+from .services.recovery import recovery
 
 
 @asynccontextmanager
@@ -16,10 +30,46 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     setup_logging()
     await init_db()
     await _seed_admin()
+    configure_cache(settings.EC25_CACHE_TTLS)
+    simulator = None
+    if settings.EC25_SIMULATOR:
+        simulator = EC25Simulator()
+        configure_port(simulator.start())
+    elif settings.EC25_AT_PORT:
+        configure_port(settings.EC25_AT_PORT)
+    if settings.EC25_TRANSCRIPT_PATH:
+        primary.recorder = TranscriptRecorder(settings.EC25_TRANSCRIPT_PATH, modem=primary.name)
     if settings.EC25_ENABLED:
-        start_monitor(update_interval=settings.EC25_UPDATE_INTERVAL, enabled=settings.EC25_ENABLED)
+        start_async_transport()
+        interval = settings.EC25_URC_UPDATE_INTERVAL if settings.EC25_URC_ENABLED else settings.EC25_UPDATE_INTERVAL
+        monitor_options = dict(
+            update_interval=interval,
+            enabled=settings.EC25_ENABLED,
+            urc=settings.EC25_URC_ENABLED,
+            signal_interval=settings.EC25_SIGNAL_INTERVAL,
+            slow_interval=settings.EC25_SLOW_INTERVAL,
+            cell_interval=settings.EC25_CELL_INTERVAL,
+        )
+        start_monitor(**monitor_options)
+        registry.start(**monitor_options, cache_ttls=settings.EC25_CACHE_TTLS)
+        if settings.EC25_DATA_CALL_ENABLED:
+            data_call.start()
+        if settings.EC25_RECOVERY_ENABLED:
+            recovery.start()
     yield
+    await recovery.stop()
+    await data_call.stop()
+    await scanner.cancel()
+    await operator_scanner.cancel()
+    await registry.stop()
     stop_monitor()
+    await stop_async_transport()
+    if primary.recorder is not None:
+        primary.recorder.close()
+        primary.recorder = None
+    if simulator is not None:
+        configure_port(None)
+        simulator.stop()
 
 
 async def _seed_admin() -> None:
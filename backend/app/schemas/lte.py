@@ -1,11 +1,34 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
+class ComponentCarrierResponse(BaseModel):
+    role: str
+    earfcn: int
+    bandwidth_mhz: float | None = None
+    band: str
+    state: int
+    pci: int
+    rsrp: int | None = None
+    rsrq: int | None = None
+    rssi: int | None = None
+    sinr: int | None = None
+
+
+class CarrierAggregationResponse(BaseModel):
+    active: bool
+    carriers: list[ComponentCarrierResponse]
+    bands: list[str]
+    bandwidth_mhz: float
+
+
 class LTESignalResponse(BaseModel):
     csq: str
     csq_raw: str | None = None
     qcsq: str
     qcsq_raw: str | None = None
+    ca: CarrierAggregationResponse | None = None
 
 
 class LTENetworkResponse(BaseModel):
@@ -18,9 +41,11 @@ class LTENetworkResponse(BaseModel):
 class LTEStatusResponse(BaseModel):
     enabled: bool
     detected: bool
+    busy: str | None = None
     timestamp: float
     signal: LTESignalResponse
     network: LTENetworkResponse
+    age: dict[str, float] = {}
 
 
 class APNRequest(BaseModel):
@@ -30,3 +55,253 @@ class APNRequest(BaseModel):
 
 class ModemCommandRequest(BaseModel):
     command: str = Field(min_length=1, max_length=256)
+
+
+class ATPriorityStats(BaseModel):
+    executed: int
+    wait_avg_ms: float
+    wait_max_ms: float
+
+
+class ATSchedulerStatsResponse(BaseModel):
+    submitted: int
+    completed: int
+    failed: int
+    expired: int
+    rejected: int
+    paused: int = 0
+    queue_depth: int
+    max_queue_depth: int
+    queue_limit: int
+    current_command: str | None = None
+    busy: str | None = None
+    by_priority: dict[str, ATPriorityStats]
+
+
+class ATCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    stores: int
+    invalidations: int
+    hit_rate: float
+    entries: dict[str, float | None]
+
+
+class PDPContext(BaseModel):
+    cid: int
+    pdp_type: str
+    apn: str
+
+
+class ModemInfoResponse(BaseModel):
+    imei: str | None = None
+    firmware: str | None = None
+    sim: str
+    pdp_contexts: list[PDPContext] = []
+
+
+class ModemSummaryResponse(BaseModel):
+    id: str
+    primary: bool
+    port: str | None = None
+    running: bool
+    enabled: bool
+    detected: bool
+
+
+class ServingCellResponse(BaseModel):
+    state: str
+    rat: str | None = None
+    duplex: str | None = None
+    mcc: int | None = None
+    mnc: int | None = None
+    cell_id: str | None = None
+    pci: int | None = None
+    earfcn: int | None = None
+    band: int | None = None
+    ul_bandwidth: int | None = None
+    dl_bandwidth: int | None = None
+    tac: str | None = None
+    rsrp: int | None = None
+    rsrq: int | None = None
+    rssi: int | None = None
+    sinr: int | None = None
+
+
+class NeighbourCellResponse(BaseModel):
+    kind: str
+    rat: str
+    earfcn: int | None = None
+    pci: int | None = None
+    rsrq: int | None = None
+    rsrp: int | None = None
+    rssi: int | None = None
+    sinr: int | None = None
+
+
+class CellSampleResponse(BaseModel):
+    timestamp: float
+    serving: ServingCellResponse | None = None
+    neighbours: list[NeighbourCellResponse] = []
+
+
+class BandScanRequest(BaseModel):
+    method: Literal["qscan", "sweep"] = "qscan"
+    bands: list[int] | None = None
+    probe: bool = False
+    lock: bool = False
+
+
+class BandLockRequest(BaseModel):
+    band: int = Field(ge=1, le=256)
+    earfcn: int | None = None
+    pci: int | None = Field(default=None, ge=0, le=503)
+
+
+class ScanCandidateResponse(BaseModel):
+    band: int | None = None
+    earfcn: int | None = None
+    pci: int | None = None
+    rsrp: int | None = None
+    rsrq: int | None = None
+    sinr: int | None = None
+    mcc: int | None = None
+    mnc: int | None = None
+    throughput_mbps: float | None = None
+    score: float
+
+
+class BandLockResponse(BaseModel):
+    band: int
+    earfcn: int | None = None
+    pci: int | None = None
+    at: float
+
+
+class BandScanResponse(BaseModel):
+    state: str
+    method: str | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+    elapsed: float | None = None
+    progress: float | None = None
+    error: str | None = None
+    candidates: list[ScanCandidateResponse] = []
+    best: ScanCandidateResponse | None = None
+    locked: BandLockResponse | None = None
+
+
+class SubscriberStatsResponse(BaseModel):
+    id: int
+    buffered: int
+    delivered: int
+    dropped: int
+    last_seq: int
+
+
+class StreamStatsResponse(BaseModel):
+    seq: int
+    subscribers: int
+    dropped: int
+    per_subscriber: list[SubscriberStatsResponse]
+
+
+class AlignmentRequest(BaseModel):
+    rate: float = Field(default=5.0, ge=1.0, le=10.0)
+    duration: float = Field(default=120.0, ge=5.0, le=600.0)
+    source: Literal["qcsq", "servingcell"] = "qcsq"
+
+
+class AlignmentStatusResponse(BaseModel):
+    active: bool
+    rate: float | None = None
+    source: str | None = None
+    remaining: float | None = None
+    samples: int | None = None
+    overruns: int | None = None
+
+
+class OperatorResponse(BaseModel):
+    status: str
+    long_name: str
+    short_name: str
+    numeric: str
+    act: str
+
+
+class OperatorScanResponse(BaseModel):
+    state: str
+    started_at: float | None = None
+    finished_at: float | None = None
+    elapsed: float | None = None
+    progress: float | None = None
+    error: str | None = None
+    operators: list[OperatorResponse] = []
+
+
+class RecoveryStepStatsResponse(BaseModel):
+    attempts: int
+    successes: int
+    total_s: float
+
+
+class RecoveryCountersResponse(BaseModel):
+    episodes: int
+    recovered: int
+    failed: int
+    steps: dict[str, RecoveryStepStatsResponse]
+
+
+class RecoveryEpisodeResponse(BaseModel):
+    failure: str
+    started_at: float
+    steps: list[str]
+    recovered: bool
+    duration_s: float | None = None
+
+
+class RecoveryStatusResponse(BaseModel):
+    state: str
+    running: bool
+    backoff_s: float | None = None
+    counters: RecoveryCountersResponse
+    last_episode: RecoveryEpisodeResponse | None = None
+
+
+class RecoveryStepResponse(BaseModel):
+    t: float
+    modem: str
+    failure: str
+    step: str
+    ok: bool
+    duration_s: float
+    detail: str | None = None
+
+
+class HistogramBucketResponse(BaseModel):
+    le: float | None
+    count: int
+
+
+class HistogramResponse(BaseModel):
+    buckets: list[HistogramBucketResponse]
+    count: int
+    sum_s: float
+    mean_s: float | None = None
+    max_s: float | None = None
+    last_s: float | None = None
+
+
+class DataCallStatusResponse(BaseModel):
+    state: str
+    mode: str | None = None
+    interface: str | None = None
+    ip: str | None = None
+    cid: int
+    connected_since: float | None = None
+    down_for: float | None = None
+    connects: int
+    failures: int
+    drops: int
+    time_to_connect: HistogramResponse
+    time_to_recover: HistogramResponse
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import termios
+import threading
+import time
+import tty
+from typing import Callable
+
+from .at_scheduler import (
+    AT_LOCK_FILE,
+    MAX_QUEUE_DEPTH,
+    QUEUE_TIMEOUT,
+    ATScheduler,
+    Priority,
+    _Job,
+)
+from .at_session import BAUDRATE, _response_prefixes, command_timeout, is_final_result
+
+logger = logging.getLogger(__name__)
+
+WRITE_TIMEOUT = 2.0
+LOCK_RETRY_INTERVAL = 0.02
+
+
+def _configure_tty(fd: int, baudrate: int) -> None:
+    tty.setraw(fd)
+    attrs = termios.tcgetattr(fd)
+    speed = getattr(termios, f"B{baudrate}")
+    attrs[2] = (attrs[2] & ~getattr(termios, "CRTSCTS", 0)) | termios.CLOCAL | termios.CREAD
+    attrs[4] = attrs[5] = speed
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    termios.tcflush(fd, termios.TCIFLUSH)
+
+
+class AsyncATSession:
+    def __init__(
+        self,
+        port_resolver: Callable[[bool], str | None],
+        baudrate: int = BAUDRATE,
+    ) -> None:
+        self._port_resolver = port_resolver
+        self._baudrate = baudrate
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fd: int | None = None
+        self._port: str | None = None
+        self._lock = asyncio.Lock()
+        self._urc_handler: Callable[[str], None] | None = None
+        self._urc_prefixes: tuple[str, ...] = ()
+        self._init_commands: list[str] = []
+        self._initialized = False
+        self._rx = b""
+        self._lines: list[str] | None = None
+        self._response_prefixes: tuple[str, ...] = ()
+        self._done: asyncio.Future[str] | None = None
+
+    @property
+    def port(self) -> str | None:
+        return self._port
+
+    @property
+    def is_open(self) -> bool:
+        return self._fd is not None
+
+    @property
+    def listening(self) -> bool:
+        return self._urc_handler is not None
+
+    def set_urc_handler(
+        self,
+        handler: Callable[[str], None] | None,
+        prefixes: tuple[str, ...] = (),
+        init_commands: list[str] | None = None,
+    ) -> None:
+        self._urc_handler = handler
+        self._urc_prefixes = prefixes
+        self._init_commands = list(init_commands or [])
+        self._initialized = False
+
+    async def open(self, force_refresh: bool = False) -> bool:
+        if self.is_open and not force_refresh:
+            return True
+        self.close()
+        port = await asyncio.to_thread(self._port_resolver, force_refresh)
+        if not port:
+            return False
+        try:
+            fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        except OSError as e:
+            logger.warning("No se pudo abrir puerto AT %s: %s", port, e)
+            return False
+        try:
+            _configure_tty(fd, self._baudrate)
+        except (OSError, termios.error, AttributeError) as e:
+            logger.warning("No se pudo configurar puerto AT %s: %s", port, e)
+            os.close(fd)
+            return False
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._on_readable)
+        self._fd = fd
+        self._port = port
+        logger.info("Sesion AT asincrona abierta en %s", port)
+        return True
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and _running_loop() is not loop:
+            loop.call_soon_threadsafe(self.close)
+            return
+        if self._fd is not None:
+            if loop is not None and not loop.is_closed():
+                loop.remove_reader(self._fd)
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            logger.info("Sesion AT cerrada en %s", self._port)
+        self._fd = None
+        self._port = None
+        self._initialized = False
+        self._rx = b""
+        if self._done is not None and not self._done.done():
+            self._done.set_exception(OSError("puerto AT cerrado"))
+
+    async def command(self, cmd: str, timeout: float | None = None) -> str | None:
+        if timeout is None:
+            timeout = command_timeout(cmd)
+        async with self._lock:
+            for attempt in range(2):
+                if not await self.open(force_refresh=attempt > 0):
+                    return None
+                try:
+                    await self._run_init_commands()
+                    return await self._transact(cmd, timeout)
+                except OSError as e:
+                    logger.warning("Puerto AT %s perdido (%s), reconectando", self._port, e)
+                    self.close()
+            logger.error("Error enviando comando AT %s: puerto no disponible", cmd)
+            return None
+
+    async def _run_init_commands(self) -> None:
+        if self._initialized:
+            return
+        self._initialized = True
+        for init_cmd in self._init_commands:
+            response = await self._transact(init_cmd, command_timeout(init_cmd))
+            if not response or not response.rstrip().endswith("OK"):
+                logger.warning("Comando de inicializacion %s fallo: %r", init_cmd, response)
+
+    def _on_readable(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            chunk = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.warning("Puerto AT %s perdido (%s)", self._port, e)
+            self.close()
+            return
+        if not chunk:
+            logger.warning("Puerto AT %s cerrado por el dispositivo", self._port)
+            self.close()
+            return
+        self._rx += chunk
+        while b"\n" in self._rx:
+            raw, self._rx = self._rx.split(b"\n", 1)
+            line = raw.decode(errors="ignore").strip()
+            if line:
+                self._on_line(line)
+
+    def _on_line(self, line: str) -> None:
+        if self._lines is None or self._done is None or self._done.done():
+            if self._urc_handler is not None:
+                self._dispatch_urc(line)
+            else:
+                logger.debug("Descartando datos pendientes: %r", line[:80])
+            return
+        if self._is_urc(line):
+            self._dispatch_urc(line)
+            return
+        self._lines.append(line)
+        if is_final_result(line):
+            self._done.set_result("\r\n".join(self._lines) + "\r\n")
+
+    def _dispatch_urc(self, line: str) -> None:
+        if self._urc_handler is None:
+            return
+        try:
+            self._urc_handler(line)
+        except Exception as e:
+            logger.error("Error procesando URC %r: %s", line, e, exc_info=True)
+
+    def _is_urc(self, line: str) -> bool:
+        return (
+            self._urc_handler is not None
+            and line.startswith(self._urc_prefixes)
+            and not line.startswith(self._response_prefixes)
+        )
+
+    async def _write(self, data: bytes) -> None:
+        deadline = time.monotonic() + WRITE_TIMEOUT
+        while data:
+            if self._fd is None:
+                raise OSError("puerto AT cerrado")
+            try:
+                written = os.write(self._fd, data)
+            except BlockingIOError:
+                written = 0
+            data = data[written:]
+            if data:
+                if time.monotonic() > deadline:
+                    raise OSError("timeout escribiendo al puerto AT")
+                await asyncio.sleep(0.01)
+
+    async def _transact(self, cmd: str, timeout: float) -> str | None:
+        assert self._loop is not None
+        self._rx = b""
+        self._lines = []
+        self._response_prefixes = _response_prefixes(cmd)
+        self._done = self._loop.create_future()
+        try:
+            await self._write((cmd + "\r").encode())
+            response = await asyncio.wait_for(asyncio.shield(self._done), timeout)
+            logger.debug("AT %s: %s", cmd, response[:80])
+            return response
+        except asyncio.TimeoutError:
+            logger.warning("Timeout (%.1fs) esperando respuesta a %s", timeout, cmd)
+            if self._lines:
+                return "\r\n".join(self._lines) + "\r\n"
+            return None
+        finally:
+            if not self._done.done():
+                self._done.cancel()
+            self._lines = None
+            self._done = None
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncATScheduler(ATScheduler):
+    def __init__(
+        self,
+        session: AsyncATSession,
+        max_depth: int = MAX_QUEUE_DEPTH,
+        queue_timeout: float = QUEUE_TIMEOUT,
+        lock_file: str | None = AT_LOCK_FILE,
+    ) -> None:
+        super().__init__(session, max_depth, queue_timeout, lock_file)  # type: ignore[arg-type]
+        self._async_session = session
+        self._async_queue: asyncio.PriorityQueue[_Job] = asyncio.PriorityQueue()
+        self._backlog: list[_Job] = []
+        # Handed to the loop from another thread but not in _async_queue yet.
+        self._in_transit = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._enqueue_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def execute(
+        self,
+        cmd: str,
+        priority: Priority = Priority.NORMAL,
+        timeout: float | None = None,
+    ) -> str | None:
+        if self._loop is not None and _running_loop() is self._loop:
+            raise RuntimeError(f"execute({cmd}) bloquearia el event loop, usar execute_async")
+        return super().execute(cmd, priority=priority, timeout=timeout)
+
+    async def execute_async(
+        self,
+        cmd: str,
+        priority: Priority = Priority.NORMAL,
+        timeout: float | None = None,
+    ) -> str | None:
+        future = self.submit(cmd, priority=priority, timeout=timeout)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            logger.warning("Comando AT %s sin respuesta: %s", cmd, e or type(e).__name__)
+            return None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        with self._enqueue_lock:
+            backlog, self._backlog = self._backlog, []
+        for job in backlog:
+            self._async_queue.put_nowait(job)
+        self._task = self._loop.create_task(self._worker_async(), name="ATScheduler")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        while not self._async_queue.empty():
+            self._async_queue.get_nowait().future.cancel()
+        self._async_session.close()
+        self._loop = None
+
+    def _ensure_worker(self) -> None:
+        pass
+
+    def _depth(self) -> int:
+        with self._enqueue_lock:
+            return self._async_queue.qsize() + len(self._backlog) + self._in_transit
+
+    def _enqueue(self, job: _Job) -> None:
+        with self._enqueue_lock:
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                self._backlog.append(job)
+                return
+            threadsafe = _running_loop() is not loop
+            if threadsafe:
+                self._in_transit += 1
+        if threadsafe:
+            loop.call_soon_threadsafe(self._deliver, job)
+        else:
+            self._async_queue.put_nowait(job)
+
+    def _deliver(self, job: _Job) -> None:
+        with self._enqueue_lock:
+            self._in_transit -= 1
+        self._async_queue.put_nowait(job)
+
+    async def _acquire_port(self) -> None:
+        while not self._port_lock.try_acquire():
+            await asyncio.sleep(LOCK_RETRY_INTERVAL)
+
+    async def _worker_async(self) -> None:
+        while True:
+            job = await self._async_queue.get()
+            if not self._begin(job):
+                continue
+            try:
+                await self._acquire_port()
+                try:
+                    result = await self._async_session.command(job.cmd, timeout=job.timeout)
+                finally:
+                    self._port_lock.release()
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._current = None
+                job.future.set_exception(RuntimeError(f"{job.cmd} interrumpido: planificador detenido"))
+                raise
+            except Exception as e:
+                self._fail(job, e)
+                continue
+            self._finish(job, result)
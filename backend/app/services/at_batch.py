@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from .at_session import is_final_result, response_prefix
+
+MAX_CHAIN_COMMANDS = 4
+
+
+def chain_commands(cmds: list[str]) -> str:
+    return cmds[0] + "".join(";" + (c[2:] if c[:2].upper() == "AT" else c) for c in cmds[1:])
+
+
+def unchain_commands(cmd: str) -> list[str]:
+    head, *rest = cmd.split(";")
+    return [head] + ["AT" + c for c in rest if c]
+
+
+def chunk_commands(cmds: list[str], size: int = MAX_CHAIN_COMMANDS) -> list[list[str]]:
+    # Replies are split by prefix, so two commands sharing one (AT+QENG="...")
+    # never go in the same chain.
+    chunks: list[list[str]] = []
+    prefixes: set[str] = set()
+    for cmd in cmds:
+        prefix = response_prefix(cmd)
+        if not chunks or len(chunks[-1]) >= size or prefix in prefixes:
+            chunks.append([])
+            prefixes = set()
+        chunks[-1].append(cmd)
+        prefixes.add(prefix)
+    return chunks
+
+
+def split_chained_response(cmds: list[str], response: str | None) -> dict[str, str | None]:
+    results: dict[str, str | None] = dict.fromkeys(cmds)
+    if not response:
+        return results
+
+    prefixes = [response_prefix(c) for c in cmds]
+    body: list[list[str]] = [[] for _ in cmds]
+    final: str | None = None
+    current = -1
+    last_with_output = -1
+
+    for line in response.splitlines():
+        line = line.strip()
+        if not line or line[:2].upper() == "AT":
+            continue
+        if is_final_result(line):
+            final = line
+            break
+        for i in range(max(current, 0), len(cmds)):
+            if line.upper().startswith(prefixes[i]):
+                current = i
+                break
+        if current < 0:
+            continue
+        body[current].append(line)
+        last_with_output = current
+
+    if final is None:
+        return results
+
+    completed = len(cmds) if final == "OK" else last_with_output + 1
+    for i in range(completed):
+        results[cmds[i]] = "\r\n".join(body[i] + ["OK"]) + "\r\n"
+    return results
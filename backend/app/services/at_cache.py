@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+from .at_session import response_prefix
+
+logger = logging.getLogger(__name__)
+
+# Seconds a response stays valid; None keeps it until invalidated.
+CACHE_TTLS: dict[str, float | None] = {
+    "AT+GSN": None,
+    "AT+CGSN": None,
+    "AT+QGMR": None,
+    "AT+CGMR": None,
+    "AT+CIMI": None,
+    "AT+QCCID": None,
+    "AT+CGDCONT?": 300.0,
+    "AT+CPIN?": 300.0,
+    "AT+COPS?": 30.0,
+    "AT+QNWINFO": 10.0,
+    "AT+CREG?": 5.0,
+    "AT+CEREG?": 5.0,
+}
+
+CACHE_CONDITIONS: dict[str, Callable[[str], bool]] = {
+    "AT+CPIN?": lambda response: "READY" in response,
+}
+
+_REGISTRATION = ("AT+CREG?", "AT+CEREG?", "AT+COPS?", "AT+QNWINFO")
+
+URC_INVALIDATIONS: dict[str, tuple[str, ...]] = {
+    "+CREG:": _REGISTRATION,
+    "+CEREG:": _REGISTRATION,
+    "+CGREG:": _REGISTRATION,
+    '+QIND: "act"': ("AT+QNWINFO", "AT+COPS?"),
+    "+CPIN:": ("AT+CPIN?", "AT+CIMI", "AT+QCCID") + _REGISTRATION,
+    "+QSIMSTAT:": ("AT+CPIN?", "AT+CIMI", "AT+QCCID") + _REGISTRATION,
+}
+
+SET_INVALIDATIONS: dict[str, tuple[str, ...]] = {
+    "+CFUN:": tuple(CACHE_TTLS),
+    "+COPS:": _REGISTRATION,
+    "+CGDCONT:": ("AT+CGDCONT?",),
+    "+QCFG:": _REGISTRATION,
+    "+QNWLOCK:": _REGISTRATION,
+}
+
+
+def is_set_command(cmd: str) -> bool:
+    return "=" in cmd and not cmd.rstrip().endswith("=?")
+
+
+class ATResponseCache:
+    def __init__(
+        self,
+        ttls: dict[str, float | None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, float | None]] = {}
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+    def configure(self, ttls: dict[str, float | None]) -> None:
+        with self._lock:
+            self._ttls.update({cmd.upper(): ttl for cmd, ttl in ttls.items()})
+            for cmd, ttl in ttls.items():
+                if ttl == 0:
+                    self._entries.pop(cmd.upper(), None)
+
+    def is_cacheable(self, cmd: str) -> bool:
+        return self._ttls.get(cmd.upper(), 0) != 0
+
+    def get(self, cmd: str) -> str | None:
+        key = cmd.upper()
+        if not self.is_cacheable(key):
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > self._clock()):
+                self._counters["hits"] += 1
+                return entry[0]
+            self._entries.pop(key, None)
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, cmd: str, response: str | None) -> None:
+        key = cmd.upper()
+        if is_set_command(key):
+            if response is not None and response.rstrip().endswith("OK"):
+                self._invalidate_for_set(key)
+            return
+        if not response or not response.rstrip().endswith("OK") or not self.is_cacheable(key):
+            return
+        condition = CACHE_CONDITIONS.get(key)
+        if condition is not None and not condition(response):
+            return
+        ttl = self._ttls.get(key)
+        with self._lock:
+            self._entries[key] = (response, None if ttl is None else self._clock() + ttl)
+            self._counters["stores"] += 1
+
+    def invalidate(self, *cmds: str) -> None:
+        with self._lock:
+            removed = [c for c in (cmd.upper() for cmd in cmds) if self._entries.pop(c, None)]
+            self._counters["invalidations"] += len(removed)
+        if removed:
+            logger.debug("Cache AT invalidada: %s", ", ".join(removed))
+
+    def invalidate_urc(self, line: str) -> None:
+        for prefix, cmds in URC_INVALIDATIONS.items():
+            if line.startswith(prefix):
+                self.invalidate(*cmds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            now = self._clock()
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": {
+                    cmd: None if expires is None else round(max(0.0, expires - now), 1)
+                    for cmd, (_, expires) in self._entries.items()
+                },
+            }
+
+    def _invalidate_for_set(self, cmd: str) -> None:
+        prefix = response_prefix(cmd)
+        query = cmd.split("=", 1)[0] + "?"
+        self.invalidate(query, *SET_INVALIDATIONS.get(prefix, ()))
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import fcntl
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Iterator
+
+from .at_session import ATSession, command_timeout
+
+logger = logging.getLogger(__name__)
+
+AT_LOCK_FILE = "/run/lock/ec25-at.lock"
+MAX_QUEUE_DEPTH = 32
+QUEUE_TIMEOUT = 10.0
+URC_POLL_INTERVAL = 0.05
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    cmd: str = field(compare=False)
+    timeout: float = field(compare=False)
+    deadline: float = field(compare=False)
+    enqueued: float = field(compare=False)
+    future: Future[str | None] = field(compare=False)
+
+
+def _open_lock_file(path: str) -> int:
+    # flock needs no write access: watchdog.sh (root) may have created the file 0644 in
+    # sticky /run/lock, where fs.protected_regular also refuses O_CREAT on files of other users.
+    try:
+        return os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return os.open(path, os.O_RDONLY | os.O_CREAT, 0o666)
+
+
+class _PortLock:
+    def __init__(self, path: str | None) -> None:
+        self._path = path
+        self._fd: int | None = None
+        self._warned = False
+
+    def _open(self) -> int | None:
+        if self._fd is None and self._path is not None:
+            try:
+                self._fd = _open_lock_file(self._path)
+            except OSError as e:
+                if not self._warned:
+                    logger.warning("Sin lock inter-proceso para el puerto AT (%s): %s", self._path, e)
+                    self._warned = True
+        return self._fd
+
+    def try_acquire(self) -> bool:
+        fd = self._open()
+        if fd is None:
+            return True
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def __enter__(self) -> _PortLock:
+        fd = self._open()
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+class ATScheduler:
+    def __init__(
+        self,
+        session: ATSession,
+        max_depth: int = MAX_QUEUE_DEPTH,
+        queue_timeout: float = QUEUE_TIMEOUT,
+        lock_file: str | None = AT_LOCK_FILE,
+    ) -> None:
+        self._session = session
+        self._max_depth = max_depth
+        self._queue_timeout = queue_timeout
+        self._port_lock = _PortLock(lock_file)
+        self._queue: queue.PriorityQueue[_Job] = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._current: str | None = None
+        self._busy: str | None = None
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "expired": 0,
+            "rejected": 0,
+            "paused": 0,
+        }
+        self._max_depth_seen = 0
+        self._wait = {p: {"count": 0, "total": 0.0, "max": 0.0} for p in Priority}
+
+    def submit(
+        self,
+        cmd: str,
+        priority: Priority = Priority.NORMAL,
+        timeout: float | None = None,
+    ) -> Future[str | None]:
+        future: Future[str | None] = Future()
+        now = time.monotonic()
+        with self._lock:
+            if self._busy is not None and priority >= Priority.BACKGROUND:
+                self._counters["paused"] += 1
+                future.set_result(None)
+                return future
+            depth = self._depth()
+            if depth >= self._max_depth:
+                self._counters["rejected"] += 1
+                logger.warning("Cola AT llena (%d), rechazando %s", depth, cmd)
+                future.set_result(None)
+                return future
+            self._counters["submitted"] += 1
+            self._max_depth_seen = max(self._max_depth_seen, depth + 1)
+            self._ensure_worker()
+        self._enqueue(_Job(
+            priority=int(priority),
+            seq=next(self._seq),
+            cmd=cmd,
+            timeout=timeout if timeout is not None else command_timeout(cmd),
+            deadline=now + self._queue_timeout,
+            enqueued=now,
+            future=future,
+        ))
+        return future
+
+    def execute(
+        self,
+        cmd: str,
+        priority: Priority = Priority.NORMAL,
+        timeout: float | None = None,
+    ) -> str | None:
+        future = self.submit(cmd, priority=priority, timeout=timeout)
+        limit = self._queue_timeout + (timeout if timeout is not None else command_timeout(cmd)) + 1.0
+        try:
+            return future.result(timeout=limit)
+        except Exception as e:
+            future.cancel()
+            logger.warning("Comando AT %s sin respuesta: %s", cmd, e or type(e).__name__)
+            return None
+
+    @property
+    def busy(self) -> str | None:
+        return self._busy
+
+    @contextmanager
+    def busy_for(self, reason: str) -> Iterator[None]:
+        # Long jobs (COPS=?, QSCAN) hold the port for minutes: background polls
+        # are answered with None straight away instead of expiring in the queue.
+        with self._lock:
+            self._busy = reason
+        logger.info("Puerto AT ocupado (%s): sondeo en segundo plano pausado", reason)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._busy = None
+            logger.info("Puerto AT libre (%s): sondeo reanudado", reason)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            by_priority = {}
+            for p, w in self._wait.items():
+                by_priority[p.name.lower()] = {
+                    "executed": w["count"],
+                    "wait_avg_ms": round(w["total"] / w["count"] * 1000, 1) if w["count"] else 0.0,
+                    "wait_max_ms": round(w["max"] * 1000, 1),
+                }
+            return {
+                **self._counters,
+                "queue_depth": self._depth(),
+                "max_queue_depth": self._max_depth_seen,
+                "queue_limit": self._max_depth,
+                "current_command": self._current,
+                "busy": self._busy,
+                "by_priority": by_priority,
+            }
+
+    def start(self) -> None:
+        with self._lock:
+            self._ensure_worker()
+
+    def _depth(self) -> int:
+        return self._queue.qsize()
+
+    def _enqueue(self, job: _Job) -> None:
+        self._queue.put(job)
+
+    def _ensure_worker(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._worker, daemon=True, name="ATScheduler")
+        self._thread.start()
+
+    def _next_job(self) -> _Job:
+        while True:
+            if not self._session.listening:
+                return self._queue.get()
+            try:
+                return self._queue.get(timeout=URC_POLL_INTERVAL)
+            except queue.Empty:
+                self._session.poll_unsolicited()
+
+    def _begin(self, job: _Job) -> bool:
+        if not job.future.set_running_or_notify_cancel():
+            return False
+
+        started = time.monotonic()
+        waited = started - job.enqueued
+        if started > job.deadline:
+            with self._lock:
+                self._counters["expired"] += 1
+            job.future.set_exception(TimeoutError(f"{job.cmd} expiro en cola ({waited:.1f}s)"))
+            return False
+
+        with self._lock:
+            self._current = job.cmd
+            w = self._wait[Priority(job.priority)]
+            w["count"] += 1
+            w["total"] += waited
+            w["max"] = max(w["max"], waited)
+        return True
+
+    def _fail(self, job: _Job, error: BaseException) -> None:
+        logger.error("Error ejecutando %s: %s", job.cmd, error, exc_info=True)
+        with self._lock:
+            self._counters["failed"] += 1
+            self._current = None
+        job.future.set_exception(error)
+
+    def _finish(self, job: _Job, result: str | None) -> None:
+        with self._lock:
+            self._counters["completed" if result is not None else "failed"] += 1
+            self._current = None
+        job.future.set_result(result)
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if not self._begin(job):
+                continue
+            try:
+                with self._port_lock:
+                    result = self._session.command(job.cmd, timeout=job.timeout)
+            except Exception as e:
+                self._fail(job, e)
+                continue
+            self._finish(job, result)
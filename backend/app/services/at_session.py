@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from typing import Callable
+
+import serial
+
+logger = logging.getLogger(__name__)
+
+BAUDRATE = 115200
+DEFAULT_TIMEOUT = 5.0
+
+COMMAND_TIMEOUTS: dict[str, float] = {
+    "AT+COPS=?": 180.0,
+    "AT+QSCAN": 180.0,
+    "AT+COPS=": 180.0,
+    "AT+CGATT": 140.0,
+    "AT+CGACT": 150.0,
+    "AT+QNETDEVCTL": 30.0,
+    "AT+CFUN": 15.0,
+}
+
+FINAL_RESULT_CODES = ("OK", "ERROR", "NO CARRIER", "BUSY", "NO ANSWER", "NO DIALTONE")
+FINAL_ERROR_PREFIXES = ("+CME ERROR:", "+CMS ERROR:")
+
+_PREFIX_SPLIT = re.compile(r"[?=]")
+
+
+def command_timeout(cmd: str) -> float:
+    upper = cmd.upper()
+    for prefix, timeout in COMMAND_TIMEOUTS.items():
+        if upper.startswith(prefix):
+            return timeout
+    return DEFAULT_TIMEOUT
+
+
+def is_final_result(line: str) -> bool:
+    return line in FINAL_RESULT_CODES or line.startswith(FINAL_ERROR_PREFIXES)
+
+
+def response_prefix(cmd: str) -> str:
+    body = cmd[2:] if cmd[:2].upper() == "AT" else cmd
+    return _PREFIX_SPLIT.split(body, 1)[0].upper() + ":"
+
+
+class ATSession:
+    def __init__(
+        self,
+        port_resolver: Callable[[bool], str | None],
+        baudrate: int = BAUDRATE,
+        serial_factory: Callable[..., serial.Serial] = serial.Serial,
+    ) -> None:
+        self._port_resolver = port_resolver
+        self._baudrate = baudrate
+        self._serial_factory = serial_factory
+        self._serial: serial.Serial | None = None
+        self._port: str | None = None
+        self._lock = threading.RLock()
+        self._urc_handler: Callable[[str], None] | None = None
+        self._urc_prefixes: tuple[str, ...] = ()
+        self._init_commands: list[str] = []
+        self._initialized = False
+        self._rx = b""
+
+    @property
+    def port(self) -> str | None:
+        return self._port
+
+    @property
+    def is_open(self) -> bool:
+        return self._serial is not None and self._serial.is_open
+
+    @property
+    def listening(self) -> bool:
+        return self._urc_handler is not None
+
+    def set_urc_handler(
+        self,
+        handler: Callable[[str], None] | None,
+        prefixes: tuple[str, ...] = (),
+        init_commands: list[str] | None = None,
+    ) -> None:
+        with self._lock:
+            self._urc_handler = handler
+            self._urc_prefixes = prefixes
+            self._init_commands = list(init_commands or [])
+            self._initialized = False
+
+    def open(self, force_refresh: bool = False) -> bool:
+        with self._lock:
+            if self.is_open and not force_refresh:
+                return True
+            self.close()
+            port = self._port_resolver(force_refresh)
+            if not port:
+                return False
+            try:
+                self._serial = self._serial_factory(
+                    port, self._baudrate, timeout=0.1, write_timeout=2, rtscts=False, dsrdtr=False,
+                )
+            except (serial.SerialException, OSError) as e:
+                logger.warning("No se pudo abrir puerto AT %s: %s", port, e)
+                self._serial = None
+                return False
+            self._port = port
+            self._serial.reset_input_buffer()
+            logger.info("Sesion AT abierta en %s", port)
+            return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._serial is not None:
+                try:
+                    self._serial.close()
+                except (serial.SerialException, OSError):
+                    pass
+                logger.info("Sesion AT cerrada en %s", self._port)
+            self._serial = None
+            self._port = None
+            self._initialized = False
+            self._rx = b""
+
+    def command(self, cmd: str, timeout: float | None = None) -> str | None:
+        if timeout is None:
+            timeout = command_timeout(cmd)
+        with self._lock:
+            for attempt in range(2):
+                if not self.open(force_refresh=attempt > 0):
+                    return None
+                try:
+                    self._run_init_commands()
+                    return self._transact(cmd, timeout)
+                except (serial.SerialException, OSError) as e:
+                    logger.warning("Puerto AT %s perdido (%s), reconectando", self._port, e)
+                    self.close()
+            logger.error("Error enviando comando AT %s: puerto no disponible", cmd)
+            return None
+
+    def poll_unsolicited(self) -> int:
+        if self._urc_handler is None or not self.is_open:
+            return 0
+        with self._lock:
+            try:
+                s = self._serial
+                if s is None or not s.in_waiting:
+                    return 0
+                self._rx += s.read(s.in_waiting)
+            except (serial.SerialException, OSError) as e:
+                logger.warning("Puerto AT %s perdido (%s)", self._port, e)
+                self.close()
+                return 0
+            count = 0
+            for line in self._take_lines():
+                self._dispatch_urc(line)
+                count += 1
+            return count
+
+    def _run_init_commands(self) -> None:
+        if self._initialized:
+            return
+        self._initialized = True
+        for init_cmd in self._init_commands:
+            response = self._transact(init_cmd, command_timeout(init_cmd))
+            if not response or not response.rstrip().endswith("OK"):
+                logger.warning("Comando de inicializacion %s fallo: %r", init_cmd, response)
+
+    def _take_lines(self) -> list[str]:
+        lines = []
+        while b"\n" in self._rx:
+            raw, self._rx = self._rx.split(b"\n", 1)
+            line = raw.decode(errors="ignore").strip()
+            if line:
+                lines.append(line)
+        return lines
+
+    def _dispatch_urc(self, line: str) -> None:
+        if self._urc_handler is None:
+            return
+        try:
+            self._urc_handler(line)
+        except Exception as e:
+            logger.error("Error procesando URC %r: %s", line, e, exc_info=True)
+
+    def _is_urc(self, line: str, response_prefixes: tuple[str, ...]) -> bool:
+        return (
+            self._urc_handler is not None
+            and line.startswith(self._urc_prefixes)
+            and not line.startswith(response_prefixes)
+        )
+
+    def _transact(self, cmd: str, timeout: float) -> str | None:
+        s = self._serial
+        assert s is not None
+
+        if s.in_waiting:
+            self._rx += s.read(s.in_waiting)
+        for line in self._take_lines():
+            if self._urc_handler is not None:
+                self._dispatch_urc(line)
+            else:
+                logger.debug("Descartando datos pendientes: %r", line[:80])
+        self._rx = b""
+
+        s.write((cmd + "\r").encode())
+
+        response_prefixes = _response_prefixes(cmd)
+        lines: list[str] = []
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            chunk = s.read(max(1, s.in_waiting))
+            if not chunk:
+                continue
+            self._rx += chunk
+            received = self._take_lines()
+            for i, line in enumerate(received):
+                if self._is_urc(line, response_prefixes):
+                    self._dispatch_urc(line)
+                    continue
+                lines.append(line)
+                if is_final_result(line):
+                    for trailing in received[i + 1:]:
+                        self._dispatch_urc(trailing)
+                    response = "\r\n".join(lines) + "\r\n"
+                    logger.debug("AT %s: %s", cmd, response[:80])
+                    return response
+
+        logger.warning("Timeout (%.1fs) esperando respuesta a %s", timeout, cmd)
+        if lines:
+            return "\r\n".join(lines) + "\r\n"
+        return None
+
+
+def _response_prefixes(cmd: str) -> tuple[str, ...]:
+    return tuple(p for p in (response_prefix(part) for part in cmd.split(";")) if p != ":")
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from .at_batch import split_chained_response, unchain_commands
+from .at_session import ATSession, is_final_result
+from .cell_info import NEIGHBOURCELL_COMMAND, SERVINGCELL_COMMAND, parse_neighbourcells, parse_servingcell
+from .modem import (
+    parse_cgdcont,
+    parse_cops,
+    parse_cpin,
+    parse_csq,
+    parse_qcainfo,
+    parse_qcsq,
+    parse_qnwinfo,
+    parse_reg_status,
+    parse_urc,
+)
+
+logger = logging.getLogger(__name__)
+
+# One JSON object per line:
+#   {"v": 1, "meta": {...}}                                  optional header
+#   {"v": 1, "t": ..., "modem": ..., "cmd": ..., "response": ..., "ms": ...}
+#   {"v": 1, "t": ..., "modem": ..., "urc": ...}
+TRANSCRIPT_VERSION = 1
+MAX_TRANSCRIPT_BYTES = 5 * 1024 * 1024
+
+PARSERS: dict[str, Callable[[str | None], Any]] = {
+    "AT+CSQ": parse_csq,
+    "AT+QCSQ": parse_qcsq,
+    "AT+COPS?": parse_cops,
+    "AT+QNWINFO": parse_qnwinfo,
+    "AT+CREG?": parse_reg_status,
+    "AT+CEREG?": parse_reg_status,
+    "AT+CPIN?": parse_cpin,
+    "AT+QCAINFO": parse_qcainfo,
+    "AT+CGDCONT?": parse_cgdcont,
+    SERVINGCELL_COMMAND: parse_servingcell,
+    NEIGHBOURCELL_COMMAND: parse_neighbourcells,
+}
+
+RECORD_COMMANDS = list(PARSERS)
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptEntry:
+    t: float
+    modem: str
+    cmd: str | None = None
+    response: str | None = None
+    urc: str | None = None
+    ms: float | None = None
+
+
+class TranscriptRecorder:
+    def __init__(self, path: str, modem: str = "primary", max_bytes: int = MAX_TRANSCRIPT_BYTES) -> None:
+        self.path = path
+        self.modem = modem
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._full = False
+
+    def write_meta(self, **meta: Any) -> None:
+        self._write({"v": TRANSCRIPT_VERSION, "meta": meta})
+
+    def record(self, cmd: str, response: str | None, elapsed: float | None = None) -> None:
+        self._write({
+            "v": TRANSCRIPT_VERSION,
+            "t": round(time.time(), 3),
+            "modem": self.modem,
+            "cmd": cmd,
+            "response": response,
+            "ms": round(elapsed * 1000, 1) if elapsed is not None else None,
+        })
+
+    def record_urc(self, line: str) -> None:
+        self._write({"v": TRANSCRIPT_VERSION, "t": round(time.time(), 3), "modem": self.modem, "urc": line})
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def _write(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._full or self._file.closed:
+                return
+            if self._file.tell() + len(line) > self._max_bytes:
+                self._full = True
+                logger.warning("Transcripcion AT llena (%s), grabacion detenida", self.path)
+                return
+            self._file.write(line)
+            self._file.flush()
+
+
+def load_transcript(path: str) -> list[TranscriptEntry]:
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            record = json.loads(line)
+            if record.get("v") != TRANSCRIPT_VERSION:
+                raise ValueError(f"{path}:{n}: version de transcripcion no soportada: {record.get('v')}")
+            if "meta" in record:
+                continue
+            entries.append(TranscriptEntry(
+                t=record.get("t", 0.0),
+                modem=record.get("modem", "primary"),
+                cmd=record.get("cmd"),
+                response=record.get("response"),
+                urc=record.get("urc"),
+                ms=record.get("ms"),
+            ))
+    return entries
+
+
+def expand_entries(entries: Iterable[TranscriptEntry]) -> Iterator[tuple[str, str | None]]:
+    # Chained polls (AT+CSQ;+QCSQ) are split exactly as the modem layer does it.
+    for entry in entries:
+        if entry.cmd is None:
+            continue
+        cmds = unchain_commands(entry.cmd)
+        if len(cmds) == 1:
+            yield entry.cmd, entry.response
+        else:
+            yield from split_chained_response(cmds, entry.response).items()
+
+
+def replay(
+    entries: Iterable[TranscriptEntry],
+    parsers: dict[str, Callable[[str | None], Any]] = PARSERS,
+) -> Iterator[tuple[str, str | None, Any]]:
+    entries = list(entries)
+    for cmd, response in expand_entries(entries):
+        parser = parsers.get(cmd)
+        if parser is not None:
+            yield cmd, response, parser(response)
+    for entry in entries:
+        if entry.urc is not None:
+            yield "URC", entry.urc, parse_urc(entry.urc)
+
+
+def simulator_responses(entries: Iterable[TranscriptEntry]) -> dict[str, str]:
+    responses = {}
+    for cmd, response in expand_entries(entries):
+        if not response:
+            continue
+        lines = [line.strip() for line in response.splitlines()]
+        if lines and lines[-1] != "OK":
+            continue
+        body = [line for line in lines if line and not is_final_result(line) and line.upper() != cmd.upper()]
+        responses[cmd.upper()] = "\r\n".join(body)
+    return responses
+
+
+def record_from_port(port: str, output: str, rounds: int, interval: float, cmds: list[str]) -> int:
+    session = ATSession(lambda force_refresh: port)
+    recorder = TranscriptRecorder(output, modem=os.path.basename(port))
+    recorded = 0
+    try:
+        firmware = session.command("AT+QGMR")
+        recorder.write_meta(port=port, firmware=firmware.splitlines()[0].strip() if firmware else None)
+        for n in range(rounds):
+            for cmd in cmds:
+                started = time.monotonic()
+                response = session.command(cmd)
+                recorder.record(cmd, response, time.monotonic() - started)
+                recorded += 1
+            if n + 1 < rounds:
+                time.sleep(interval)
+    finally:
+        session.close()
+        recorder.close()
+    return recorded
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Graba o reproduce transcripciones AT del EC25")
+    sub = parser.add_subparsers(dest="action", required=True)
+    rec = sub.add_parser("record", help="graba respuestas de un modem real")
+    rec.add_argument("--port", required=True)
+    rec.add_argument("--output", required=True)
+    rec.add_argument("--rounds", type=int, default=10)
+    rec.add_argument("--interval", type=float, default=2.0)
+    rec.add_argument("--command", action="append", dest="commands", help="repetible; por defecto todos los parseados")
+    rep = sub.add_parser("replay", help="pasa una transcripcion por los parsers")
+    rep.add_argument("transcript")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.action == "record":
+        count = record_from_port(args.port, args.output, args.rounds, args.interval, args.commands or RECORD_COMMANDS)
+        print(f"{count} respuestas grabadas en {args.output}")
+        return 0
+
+    try:
+        for cmd, response, parsed in replay(load_transcript(args.transcript)):
+            print(f"{cmd}: {parsed if parsed not in (None, []) else '-'}")
+    except Exception as e:
+        print(f"Error reproduciendo {args.transcript}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import http.client
+import logging
+import re
+import socket
+import time
+import urllib.parse
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Literal
+
+from ..config import settings
+from .at_scheduler import Priority
+from .cell_info import SERVINGCELL_COMMAND, parse_servingcell
+from .modem import ModemClient, primary
+from .modem_discovery import WATCHED_NET_INTERFACES
+from .network import egress_interface, get_ip_address
+from .scan_job import ScanJob
+
+logger = logging.getLogger(__name__)
+
+ScanMethod = Literal["qscan", "sweep"]
+ThroughputProbe = Callable[[], Awaitable[float | None]]
+
+QSCAN_COMMAND = "AT+QSCAN=1,1"
+BAND_QUERY = 'AT+QCFG="band"'
+CELL_LOCK_COMMAND = 'AT+QNWLOCK="common/lte"'
+
+SETTLE_TIMEOUT = 20.0
+SETTLE_POLL = 1.0
+PROBE_CANDIDATES = 3
+PROBE_DURATION = 8.0
+
+_QSCAN_RE = re.compile(
+    r'\+QSCAN:\s*"LTE",(\d+),(\d+),(\d+),(\d+),(-?\d+),(-?\d+),(-?\d+),(-?\d+)(?:,([0-9A-Fa-f]+),([0-9A-Fa-f]+),(\d+),(\d+))?'
+)
+_BAND_RE = re.compile(r'\+QCFG:\s*"band",(0x[0-9A-Fa-f]+|\d+),(0x[0-9A-Fa-f]+|\d+)(?:,(0x[0-9A-Fa-f]+|\d+))?')
+
+
+@dataclass(frozen=True, slots=True)
+class ScanCandidate:
+    band: int | None
+    earfcn: int | None
+    pci: int | None
+    rsrp: int | None
+    rsrq: int | None = None
+    sinr: int | None = None
+    mcc: int | None = None
+    mnc: int | None = None
+    throughput_mbps: float | None = None
+
+    @property
+    def score(self) -> float:
+        # SINR when the modem reports it, otherwise RSRQ shifted to a similar 0..20 dB range.
+        if self.rsrp is None:
+            return float("-inf")
+        if self.sinr is not None:
+            return self.rsrp + 2.0 * self.sinr
+        return self.rsrp + 2.0 * ((self.rsrq or -20) + 20)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "score": self.score}
+
+
+@dataclass(frozen=True, slots=True)
+class BandConfig:
+    gw: str
+    lte: str
+    tds: str = "0x0"
+
+    @property
+    def lte_bands(self) -> list[int]:
+        mask = int(self.lte, 0)
+        return [bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+    def command(self, effect: bool = True) -> str:
+        return f'AT+QCFG="band",{self.gw},{self.lte},{self.tds}' + (",1" if effect else "")
+
+    def with_lte_bands(self, bands: list[int]) -> BandConfig:
+        return replace(self, lte=lte_band_mask(bands))
+
+
+def lte_band_mask(bands: list[int]) -> str:
+    mask = 0
+    for band in bands:
+        mask |= 1 << (band - 1)
+    return hex(mask)
+
+
+def parse_qscan(response: str | None) -> list[ScanCandidate]:
+    if not response:
+        return []
+    candidates = []
+    for m in _QSCAN_RE.finditer(response):
+        mcc, mnc, earfcn, pci, rsrp, rsrq, _srxlev, _squal, _cell_id, _tac, _bw, band = m.groups()
+        candidates.append(
+            ScanCandidate(
+                band=int(band) if band is not None else None,
+                earfcn=int(earfcn),
+                pci=int(pci),
+                rsrp=int(rsrp),
+                rsrq=int(rsrq),
+                mcc=int(mcc),
+                mnc=int(mnc),
+            )
+        )
+    return candidates
+
+
+def parse_band_config(response: str | None) -> BandConfig | None:
+    if not response:
+        return None
+    match = _BAND_RE.search(response)
+    if not match:
+        return None
+    gw, lte, tds = match.groups()
+    return BandConfig(gw, lte, tds or "0x0")
+
+
+def rank_candidates(candidates: list[ScanCandidate]) -> list[ScanCandidate]:
+    best: dict[int | None, ScanCandidate] = {}
+    for c in candidates:
+        current = best.get(c.band)
+        if current is None or c.score > current.score:
+            best[c.band] = c
+    return sorted(
+        best.values(),
+        key=lambda c: (c.throughput_mbps is not None, c.throughput_mbps or 0.0, c.score),
+        reverse=True,
+    )
+
+
+def lte_source(interfaces: tuple[str, ...] = WATCHED_NET_INTERFACES) -> tuple[str, str] | None:
+    for iface in interfaces:
+        ip = get_ip_address(iface)
+        if ip is not None:
+            return iface, ip
+    return None
+
+
+def http_throughput_probe(
+    url: str,
+    duration: float = PROBE_DURATION,
+    source: Callable[[], tuple[str, str] | None] = lte_source,
+    route: Callable[[str, str], str | None] = egress_interface,
+) -> ThroughputProbe:
+    parsed = urllib.parse.urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+
+    def download() -> float | None:
+        # eth0 owns the default route whenever it is up: measure LTE or nothing.
+        lte = source()
+        if lte is None:
+            logger.info("Sonda de throughput omitida: sin IP en %s", "/".join(WATCHED_NET_INTERFACES))
+            return None
+        iface, ip = lte
+        try:
+            host_ip = socket.gethostbyname(parsed.hostname or "")
+        except OSError as e:
+            logger.warning("Sonda de throughput fallo: %s", e)
+            return None
+        egress = route(host_ip, ip)
+        if egress != iface:
+            logger.info("Sonda de throughput omitida: %s sale por %s, no por %s", parsed.hostname, egress, iface)
+            return None
+
+        started = time.monotonic()
+        received = 0
+        connection = connection_class(parsed.hostname, parsed.port, timeout=duration, source_address=(ip, 0))
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            while time.monotonic() - started < duration:
+                chunk = response.read(65536)
+                if not chunk:
+                    break
+                received += len(chunk)
+        except OSError as e:
+            logger.warning("Sonda de throughput fallo: %s", e)
+            return None
+        finally:
+            connection.close()
+        elapsed = time.monotonic() - started
+        return round(received * 8 / elapsed / 1_000_000, 2) if elapsed > 0 else None
+
+    async def probe() -> float | None:
+        return await asyncio.to_thread(download)
+
+    return probe
+
+
+class BandScanner(ScanJob):
+    kind = "band_scan"
+    busy_reason = "escaneando bandas"
+    expected_duration = 180.0
+
+    def __init__(
+        self,
+        client: ModemClient,
+        cache_path: Path | None = None,
+        probe: ThroughputProbe | None = None,
+        settle_timeout: float = SETTLE_TIMEOUT,
+    ) -> None:
+        super().__init__(client, cache_path)
+        self.probe = probe
+        self._settle_timeout = settle_timeout
+        self._original: BandConfig | None = None
+
+    def _empty(self) -> dict[str, Any]:
+        return {**super()._empty(), "method": None, "candidates": [], "best": None, "locked": None}
+
+    def start(
+        self,
+        method: ScanMethod = "qscan",
+        bands: list[int] | None = None,
+        probe: bool = False,
+        lock: bool = False,
+    ) -> bool:
+        return self._launch(
+            lambda: self._run(method, bands, probe, lock),
+            method=method,
+            locked=self._result.get("locked"),
+        )
+
+    async def lock(self, band: int, earfcn: int | None = None, pci: int | None = None) -> bool:
+        current = await self._band_config()
+        if current is None:
+            return False
+        if self._original is None:
+            self._original = self._persisted_original() or current
+        if not await self._apply_bands(current, [band]):
+            return False
+        if earfcn is not None and pci is not None:
+            result = await self._send(f"{CELL_LOCK_COMMAND},2,{earfcn},{pci}")
+            if not _ok(result):
+                return False
+        self._result["locked"] = {
+            "band": band,
+            "earfcn": earfcn,
+            "pci": pci,
+            "at": time.time(),
+            "original": asdict(self._original),
+        }
+        self._save()
+        logger.info("Modem %s fijado en banda %s (EARFCN=%s, PCI=%s)", self.client.name, band, earfcn, pci)
+        return True
+
+    async def unlock(self) -> bool:
+        await self._send(f"{CELL_LOCK_COMMAND},0")
+        original = self._original or self._persisted_original()
+        ok = True
+        if original is not None:
+            ok = _ok(await self._send(original.command()))
+            self._original = None
+        if ok:
+            self._result["locked"] = None
+            self._save()
+            logger.info("Modem %s liberado de bloqueo de banda", self.client.name)
+        return ok
+
+    def _persisted_original(self) -> BandConfig | None:
+        locked = self._result.get("locked") or {}
+        return BandConfig(**locked["original"]) if locked.get("original") else None
+
+    async def _run(self, method: ScanMethod, bands: list[int] | None, probe: bool, lock: bool) -> dict[str, Any]:
+        if method == "qscan":
+            candidates = parse_qscan(await self._send(QSCAN_COMMAND))
+            if bands:
+                candidates = [c for c in candidates if c.band in bands]
+        else:
+            candidates = await self._sweep(bands)
+        ranked = rank_candidates(candidates)
+        if probe and self.probe is not None and ranked:
+            ranked = rank_candidates(await self._probe(ranked[:PROBE_CANDIDATES]) + ranked[PROBE_CANDIDATES:])
+        best = ranked[0] if ranked else None
+        if lock and best is not None and best.band is not None:
+            await self.lock(best.band, best.earfcn, best.pci)
+        logger.info(
+            "Escaneo de bandas (%s): %d candidatos, mejor banda %s",
+            self.client.name,
+            len(ranked),
+            best.band if best else None,
+        )
+        return {"candidates": [c.to_dict() for c in ranked], "best": best.to_dict() if best else None}
+
+    async def _sweep(self, bands: list[int] | None) -> list[ScanCandidate]:
+        original = await self._band_config()
+        if original is None:
+            raise RuntimeError("No se pudo leer la configuracion de bandas")
+        candidates = []
+        try:
+            allowed = self._original or self._persisted_original() or original
+            for band in bands or allowed.lte_bands:
+                if not await self._apply_bands(original, [band]):
+                    continue
+                cell = await self._settled_cell()
+                if cell is not None:
+                    candidates.append(cell)
+        finally:
+            await self._send(original.command())
+        return candidates
+
+    async def _probe(self, candidates: list[ScanCandidate]) -> list[ScanCandidate]:
+        assert self.probe is not None
+        original = await self._band_config()
+        if original is None:
+            return candidates
+        probed = []
+        try:
+            for c in candidates:
+                throughput = None
+                if c.band is not None and await self._apply_bands(original, [c.band]):
+                    if await self._settled_cell() is not None:
+                        throughput = await self.probe()
+                probed.append(replace(c, throughput_mbps=throughput))
+        finally:
+            await self._send(original.command())
+        return probed
+
+    async def _settled_cell(self) -> ScanCandidate | None:
+        deadline = time.monotonic() + self._settle_timeout
+        while True:
+            cell = parse_servingcell(await self._send(SERVINGCELL_COMMAND))
+            if cell is not None and cell.rat == "LTE" and cell.rsrp is not None:
+                return ScanCandidate(
+                    band=cell.band,
+                    earfcn=cell.earfcn,
+                    pci=cell.pci,
+                    rsrp=cell.rsrp,
+                    rsrq=cell.rsrq,
+                    sinr=cell.sinr,
+                    mcc=cell.mcc,
+                    mnc=cell.mnc,
+                )
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(SETTLE_POLL)
+
+    async def _band_config(self) -> BandConfig | None:
+        return parse_band_config(await self._send(BAND_QUERY))
+
+    async def _apply_bands(self, base: BandConfig, bands: list[int]) -> bool:
+        return _ok(await self._send(base.with_lte_bands(bands).command()))
+
+    async def _send(self, cmd: str, priority: Priority = Priority.NORMAL) -> str | None:
+        return await self.client.send_at_async(cmd, priority=priority, cached=False)
+
+
+def _ok(response: str | None) -> bool:
+    return response is not None and response.rstrip().endswith("OK")
+
+
+scanner = BandScanner(
+    primary,
+    cache_path=settings.data_dir / "band_scan.json",
+    probe=http_throughput_probe(settings.EC25_SCAN_PROBE_URL) if settings.EC25_SCAN_PROBE_URL else None,
+)
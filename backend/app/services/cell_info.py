@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+SERVINGCELL_COMMAND = 'AT+QENG="servingcell"'
+NEIGHBOURCELL_COMMAND = 'AT+QENG="neighbourcell"'
+CELL_COMMANDS = [SERVINGCELL_COMMAND, NEIGHBOURCELL_COMMAND]
+
+DEFAULT_HISTORY_SIZE = 720
+
+_QENG_RE = re.compile(r"\+QENG:\s*(.+?)\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True, slots=True)
+class ServingCell:
+    state: str
+    rat: str | None = None
+    duplex: str | None = None
+    mcc: int | None = None
+    mnc: int | None = None
+    cell_id: str | None = None
+    pci: int | None = None
+    earfcn: int | None = None
+    band: int | None = None
+    ul_bandwidth: int | None = None
+    dl_bandwidth: int | None = None
+    tac: str | None = None
+    rsrp: int | None = None
+    rsrq: int | None = None
+    rssi: int | None = None
+    sinr: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class NeighbourCell:
+    kind: str
+    rat: str
+    earfcn: int | None
+    pci: int | None
+    rsrq: int | None = None
+    rsrp: int | None = None
+    rssi: int | None = None
+    sinr: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CellSample:
+    timestamp: float
+    serving: ServingCell | None
+    neighbours: tuple[NeighbourCell, ...] = ()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "serving": asdict(self.serving) if self.serving else None,
+            "neighbours": [asdict(n) for n in self.neighbours],
+        }
+
+
+def _fields(line: str) -> list[str]:
+    return [f.strip().strip('"') for f in line.split(",")]
+
+
+def _int(value: str | None) -> int | None:
+    if value is None or value in ("", "-"):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _hex(value: str | None) -> str | None:
+    if value is None or value in ("", "-"):
+        return None
+    return value.upper()
+
+
+def parse_servingcell(response: str | None) -> ServingCell | None:
+    if not response:
+        return None
+    match = _QENG_RE.search(response)
+    if not match:
+        return None
+    f = _fields(match.group(1))
+    if f[0] != "servingcell" or len(f) < 2:
+        return None
+    if len(f) < 3:
+        return ServingCell(state=f[1])
+    rat = f[2]
+    if rat == "LTE" and len(f) >= 17:
+        return ServingCell(
+            state=f[1],
+            rat=rat,
+            duplex=f[3],
+            mcc=_int(f[4]),
+            mnc=_int(f[5]),
+            cell_id=_hex(f[6]),
+            pci=_int(f[7]),
+            earfcn=_int(f[8]),
+            band=_int(f[9]),
+            ul_bandwidth=_int(f[10]),
+            dl_bandwidth=_int(f[11]),
+            tac=_hex(f[12]),
+            rsrp=_int(f[13]),
+            rsrq=_int(f[14]),
+            rssi=_int(f[15]),
+            sinr=_int(f[16]),
+        )
+    if rat == "WCDMA" and len(f) >= 12:
+        return ServingCell(
+            state=f[1],
+            rat=rat,
+            mcc=_int(f[3]),
+            mnc=_int(f[4]),
+            tac=_hex(f[5]),
+            cell_id=_hex(f[6]),
+            earfcn=_int(f[7]),
+            pci=_int(f[8]),
+        )
+    return ServingCell(state=f[1], rat=rat)
+
+
+def parse_neighbourcells(response: str | None) -> tuple[NeighbourCell, ...]:
+    if not response:
+        return ()
+    cells: list[NeighbourCell] = []
+    for match in _QENG_RE.finditer(response):
+        f = _fields(match.group(1))
+        if not f[0].startswith("neighbourcell") or len(f) < 4:
+            continue
+        kind = f[0].partition(" ")[2] or "intra"
+        rat = f[1]
+        if rat == "LTE" and len(f) >= 8:
+            cells.append(
+                NeighbourCell(
+                    kind=kind,
+                    rat=rat,
+                    earfcn=_int(f[2]),
+                    pci=_int(f[3]),
+                    rsrq=_int(f[4]),
+                    rsrp=_int(f[5]),
+                    rssi=_int(f[6]),
+                    sinr=_int(f[7]),
+                )
+            )
+        elif rat == "WCDMA" and len(f) >= 9:
+            cells.append(NeighbourCell(kind=kind, rat=rat, earfcn=_int(f[2]), pci=_int(f[6])))
+    return tuple(cells)
+
+
+def parse_cell_sample(raw: dict[str, str | None], timestamp: float | None = None) -> CellSample | None:
+    serving = parse_servingcell(raw.get(SERVINGCELL_COMMAND))
+    neighbours = parse_neighbourcells(raw.get(NEIGHBOURCELL_COMMAND))
+    if serving is None and not neighbours:
+        return None
+    return CellSample(time.time() if timestamp is None else timestamp, serving, neighbours)
+
+
+class CellHistory:
+    def __init__(self, maxlen: int = DEFAULT_HISTORY_SIZE) -> None:
+        self._samples: deque[CellSample] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    @property
+    def maxlen(self) -> int:
+        return self._samples.maxlen or 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def append(self, sample: CellSample) -> None:
+        with self._lock:
+            self._samples.append(sample)
+
+    def latest(self) -> CellSample | None:
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def query(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        pci: int | None = None,
+        limit: int | None = None,
+    ) -> list[CellSample]:
+        with self._lock:
+            samples = list(self._samples)
+        result = [
+            s
+            for s in samples
+            if (since is None or s.timestamp >= since)
+            and (until is None or s.timestamp <= until)
+            and (pci is None or (s.serving is not None and s.serving.pci == pci))
+        ]
+        if limit is not None:
+            result = result[-limit:] if limit > 0 else []
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
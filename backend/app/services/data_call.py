@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Literal
+
+from ..config import settings
+from .at_scheduler import Priority
+from .modem import ModemClient, primary
+from .modem_discovery import WATCHED_NET_INTERFACES
+from .network import get_ip_address, run_command
+
+logger = logging.getLogger(__name__)
+
+DataMode = Literal["ecm", "qmi"]
+DataCallState = Literal["idle", "connecting", "connected", "down"]
+
+# usb0 is the ECM interface (AT+QCFG="usbnet",1); wwan0 is QMI/raw-ip.
+INTERFACE_MODES: dict[str, DataMode] = {"usb0": "ecm", "wwan0": "qmi"}
+
+CHECK_INTERVAL = 5.0
+CONNECT_TIMEOUT = 30.0
+IP_POLL = 0.5
+DHCP_AFTER = 3.0
+RETRY_BASE = 1.0
+RETRY_MAX = 30.0
+
+# Seconds; the last bucket catches everything above.
+HISTOGRAM_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+_CGACT_RE = re.compile(r"\+CGACT:\s*(\d+),(\d)")
+
+
+def parse_cgact(response: str | None) -> dict[int, bool]:
+    if not response:
+        return {}
+    return {int(cid): state == "1" for cid, state in _CGACT_RE.findall(response)}
+
+
+def connect_command(mode: DataMode, cid: int) -> str:
+    return f"AT+QNETDEVCTL=1,{cid},1" if mode == "ecm" else f"AT+CGACT=1,{cid}"
+
+
+def disconnect_command(mode: DataMode, cid: int) -> str:
+    return f"AT+QNETDEVCTL=0,{cid},0" if mode == "ecm" else f"AT+CGACT=0,{cid}"
+
+
+def interface_present(iface: str) -> bool:
+    return os.path.exists(f"/sys/class/net/{iface}")
+
+
+async def dhclient(iface: str) -> bool:
+    rc, _, err = await asyncio.to_thread(run_command, ["dhclient", "-1", iface], 20)
+    if rc != 0:
+        logger.warning("DHCP fallo en %s: %s", iface, err)
+    return rc == 0
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = HISTOGRAM_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last: float | None = None
+
+    def observe(self, value: float) -> None:
+        index = next((i for i, le in enumerate(self.buckets) if value <= le), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.last = value
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "buckets": [
+                {"le": le, "count": count} for le, count in zip((*self.buckets, None), self.counts)
+            ],
+            "count": self.count,
+            "sum_s": round(self.total, 2),
+            "mean_s": round(self.total / self.count, 2) if self.count else None,
+            "max_s": round(self.max, 2) if self.count else None,
+            "last_s": round(self.last, 2) if self.last is not None else None,
+        }
+
+
+class DataCallManager:
+    def __init__(
+        self,
+        client: ModemClient,
+        cid: int = 1,
+        interfaces: tuple[str, ...] = WATCHED_NET_INTERFACES,
+        present: Callable[[str], bool] = interface_present,
+        ip_lookup: Callable[[str], str | None] = get_ip_address,
+        dhcp: Callable[[str], Awaitable[bool]] | None = dhclient,
+        check_interval: float = CHECK_INTERVAL,
+        connect_timeout: float = CONNECT_TIMEOUT,
+    ) -> None:
+        self.client = client
+        self.cid = cid
+        self._interfaces = interfaces
+        self._present = present
+        self._ip_lookup = ip_lookup
+        self._dhcp = dhcp
+        self._check_interval = check_interval
+        self._connect_timeout = connect_timeout
+        self._task: asyncio.Task[None] | None = None
+        self._wake: asyncio.Event | None = None
+        self._retry = 0
+        self._down_since: float | None = None
+        self.state: DataCallState = "idle"
+        self.interface: str | None = None
+        self.ip: str | None = None
+        self.connected_since: float | None = None
+        self.counters = {"connects": 0, "failures": 0, "drops": 0}
+        self.time_to_connect = Histogram()
+        self.time_to_recover = Histogram()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def mode(self) -> DataMode | None:
+        return INTERFACE_MODES.get(self.interface) if self.interface else None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._watch(), name=f"data-call-{self.client.name}")
+        logger.info("Gestor de llamada de datos iniciado (%s, cid=%d)", self.client.name, self.cid)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.state = "idle"
+
+    def wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "interface": self.interface,
+            "ip": self.ip,
+            "cid": self.cid,
+            "connected_since": self.connected_since,
+            "down_for": round(time.monotonic() - self._down_since, 1) if self._down_since is not None else None,
+            **self.counters,
+            "time_to_connect": self.time_to_connect.to_dict(),
+            "time_to_recover": self.time_to_recover.to_dict(),
+        }
+
+    async def check(self) -> bool:
+        iface = self._resolve_interface()
+        ip = await self._link_ip(iface, Priority.BACKGROUND) if iface else None
+        if ip is not None:
+            self._mark_up(iface, ip)
+        elif self.state == "connected":
+            self.counters["drops"] += 1
+            self._down_since = time.monotonic()
+            self.state = "down"
+            self.ip = None
+            self.connected_since = None
+            logger.warning("Llamada de datos caida (%s, %s)", self.client.name, iface)
+        return ip is not None
+
+    async def connect(self) -> bool:
+        iface = self._resolve_interface()
+        if iface is None:
+            logger.warning("Sin interfaz de datos (%s)", "/".join(self._interfaces))
+            self.state = "down"
+            return False
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+        self.state = "connecting"
+        started = time.monotonic()
+        mode = INTERFACE_MODES.get(iface, "qmi")
+        # An already active context answers ERROR on some firmwares: only the link check decides.
+        result = await self._send(connect_command(mode, self.cid))
+        logger.debug("Activacion de datos (%s): %s", iface, result)
+        ip = await self._wait_for_ip(iface, min(DHCP_AFTER, self._connect_timeout))
+        if ip is None and self._dhcp is not None:
+            await self._dhcp(iface)
+            ip = await self._wait_for_ip(iface, self._connect_timeout)
+        if ip is None:
+            self.counters["failures"] += 1
+            self.state = "down"
+            logger.warning("Llamada de datos sin IP en %s tras %.1fs", iface, time.monotonic() - started)
+            return False
+        self.time_to_connect.observe(time.monotonic() - started)
+        self._mark_up(iface, ip)
+        return True
+
+    async def restart(self) -> bool:
+        iface = self._resolve_interface()
+        if iface is not None:
+            await self._send(disconnect_command(INTERFACE_MODES.get(iface, "qmi"), self.cid))
+        if self.state == "connected":
+            self.counters["drops"] += 1
+            self._down_since = time.monotonic()
+        self.state = "down"
+        return await self.connect()
+
+    def _mark_up(self, iface: str | None, ip: str) -> None:
+        if self.state != "connected":
+            self.counters["connects"] += 1
+            self.connected_since = time.time()
+            if self._down_since is not None and self.counters["connects"] > 1:
+                self.time_to_recover.observe(time.monotonic() - self._down_since)
+            logger.info("Llamada de datos activa (%s): %s en %s", self.client.name, ip, iface)
+        self._down_since = None
+        self._retry = 0
+        self.state = "connected"
+        self.interface = iface
+        self.ip = ip
+
+    async def _watch(self) -> None:
+        while True:
+            delay = self._check_interval
+            try:
+                # Scans and recovery steps take the link down on purpose.
+                if self.client.busy is None and not await self.check():
+                    if not await self.connect():
+                        delay = min(RETRY_BASE * 2**self._retry, RETRY_MAX)
+                        self._retry += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error en gestor de datos (%s): %s", self.client.name, e, exc_info=True)
+            assert self._wake is not None
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _link_ip(self, iface: str, priority: Priority = Priority.NORMAL) -> str | None:
+        ip = await asyncio.to_thread(self._ip_lookup, iface)
+        if ip is None:
+            return None
+        # ECM keeps its 192.168.225.x lease when the PDP context drops, so both must hold.
+        pdp = parse_cgact(await self._send("AT+CGACT?", priority)).get(self.cid)
+        return ip if pdp is not False else None
+
+    async def _wait_for_ip(self, iface: str, timeout: float) -> str | None:
+        deadline = time.monotonic() + timeout
+        while True:
+            ip = await self._link_ip(iface)
+            if ip is not None or time.monotonic() >= deadline:
+                return ip
+            await asyncio.sleep(IP_POLL)
+
+    def _resolve_interface(self) -> str | None:
+        if self.interface is not None and self._present(self.interface):
+            return self.interface
+        return next((iface for iface in self._interfaces if self._present(iface)), None)
+
+    async def _send(self, cmd: str, priority: Priority = Priority.NORMAL) -> str | None:
+        return await self.client.send_at_async(cmd, priority=priority, cached=False)
+
+
+data_call = DataCallManager(primary, cid=settings.EC25_DATA_CID)
@@ -1,154 +1,683 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
+import hashlib
 import logging
-import queue
+import itertools
+import json
+import math
 import threading
 import time
-from typing import Any
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Literal, Mapping
 
 from ..config import settings
-from .modem import get_network_info, get_signal, is_ec25_detected
+from .at_scheduler import Priority
+from .cell_info import DEFAULT_HISTORY_SIZE, SERVINGCELL_COMMAND, CellHistory, parse_servingcell
+from .modem import POLL_GROUPS, ModemClient, is_ec25_detected, parse_qcsq, presence, primary
 
 logger = logging.getLogger(__name__)
 
-ec25_data_queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=10)
+AlignmentSource = Literal["qcsq", "servingcell"]
 
-_last_data: dict[str, Any] = {
-    "signal": {"csq": "N/A", "qcsq": "N/A"},
-    "network": {
-        "operator": "N/A",
-        "network": "N/A",
-        "registration": "N/A",
-        "sim": "N/A",
-    },
-    "timestamp": time.time(),
-    "enabled": False,
-    "detected": False,
-}
-_data_lock = threading.Lock()
+ALIGNMENT_MAX_RATE = 10.0
+ALIGNMENT_MAX_DURATION = 600.0
+SUBSCRIBER_BUFFER = 16
+# Published snapshots kept for Last-Event-ID resume
+RESUME_HISTORY = 64
+
+
+def _empty_data(enabled: bool, detected: bool) -> dict[str, Any]:
+    return {
+        "signal": {"csq": "N/A", "qcsq": "N/A"},
+        "network": {
+            "operator": "N/A",
+            "network": "N/A",
+            "registration": "N/A",
+            "sim": "N/A",
+        },
+        "timestamp": time.time(),
+        "enabled": enabled,
+        "detected": detected,
+        "busy": None,
+    }
+
+
+def build_intervals(
+    update_interval: float = 5.0,
+    signal_interval: float | None = None,
+    slow_interval: float = 60.0,
+    cell_interval: float | None = None,
+) -> dict[str, float]:
+    intervals = {
+        "signal": signal_interval or update_interval,
+        "registration": update_interval,
+        "operator": max(slow_interval, update_interval),
+    }
+    if cell_interval:
+        intervals["cell"] = cell_interval
+    return intervals
+
+
+@dataclass
+class _Alignment:
+    interval: float
+    deadline: float
+    source: AlignmentSource
+    samples: int = 0
+    overruns: int = 0
+
+
+def is_snapshot(data: Mapping[str, Any]) -> bool:
+    # Alignment samples share the stream but are not monitor snapshots.
+    return not data.get("alignment")
+
+
+_MISSING = object()
+
+
+def merge_patch(old: Mapping[str, Any], new: Mapping[str, Any]) -> dict[str, Any]:
+    # RFC 7386: changed keys only, removed keys as null, nested objects recursively.
+    patch: dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = merge_patch(previous, value)
+            if nested:
+                patch[key] = nested
+        elif previous is _MISSING or previous != value:
+            patch[key] = value
+    for key in old.keys() - new.keys():
+        patch[key] = None
+    return patch
+
+
+def new_epoch() -> str:
+    # Event ids are "<epoch>-<seq>": a restarted process (or a new broadcaster) never
+    # mistakes an id from the previous one for its own seq.
+    return format(time.time_ns(), "x")
+
+
+def parse_event_id(value: str | None) -> tuple[str, int] | None:
+    epoch, _, seq = (value or "").rpartition("-")
+    return (epoch, int(seq)) if epoch and seq.isdigit() else None
+
+
+def _dumps(data: Mapping[str, Any]) -> str:
+    return json.dumps(data, default=_json_default, separators=(",", ":"))
+
+
+def _json_default(value: Any) -> Any:
+    return dict(value) if isinstance(value, Snapshot) else str(value)
+
+
+class Snapshot(Mapping[str, Any]):
+    # One published update, serialized once; every HTTP and SSE reader shares these bytes.
+    __slots__ = ("seq", "_data", "body", "etag", "event", "patch_base", "patch_event", "_gzipped")
+
+    def __init__(self, seq: int, data: dict[str, Any], previous: Snapshot | None = None, epoch: str = "0") -> None:
+        self.seq = seq
+        self._data = data
+        payload = _dumps(data)
+        self.body = payload.encode()
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=8).hexdigest()}"'
+        self.event = _sse(epoch, seq, "snapshot" if is_snapshot(data) else "alignment", payload)
+        # Patch against the snapshot published right before: what every up-to-date client needs.
+        self.patch_base = previous.seq if previous is not None else None
+        self.patch_event = (
+            _sse(epoch, seq, "patch", _dumps(merge_patch(previous, data))) if previous is not None else None
+        )
+        self._gzipped: bytes | None = None
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, mtime=0)
+        return self._gzipped
+
+
+class DeltaEncoder:
+    def __init__(self, base: tuple[int, Mapping[str, Any]] | None = None, epoch: str = "0") -> None:
+        self.seq, self._state = base if base is not None else (0, None)
+        self._state_seq = self.seq
+        self.epoch = epoch
+
+    def encode(self, seq: int, data: Mapping[str, Any]) -> str | None:
+        if seq <= self.seq:
+            return None
+        self.seq = seq
+        snapshot = data if isinstance(data, Snapshot) else None
+        if not is_snapshot(data):
+            return snapshot.event if snapshot is not None else _sse(self.epoch, seq, "alignment", _dumps(data))
+        previous, previous_seq = self._state, self._state_seq
+        self._state, self._state_seq = data, seq
+        if previous is None:
+            return snapshot.event if snapshot is not None else _sse(self.epoch, seq, "snapshot", _dumps(data))
+        if snapshot is not None and snapshot.patch_base == previous_seq:
+            return snapshot.patch_event
+        # Empty patches still move the id forward so a resume starts from here.
+        return _sse(self.epoch, seq, "patch", _dumps(merge_patch(previous, data)))
+
+
+def _sse(epoch: str, seq: int, event: str, payload: str) -> str:
+    return f"id: {epoch}-{seq}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, broadcaster: Broadcaster, id: int, maxlen: int) -> None:
+        self.id = id
+        self._broadcaster = broadcaster
+        self._buffer: deque[tuple[int, Snapshot]] = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._event = asyncio.Event()
+        self.delivered = 0
+        self.dropped = 0
+        self.last_seq = 0
+        self.closed = False
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def push(self, seq: int, data: Snapshot) -> None:
+        with self._cond:
+            # Slow consumer: the ring overwrites its oldest update and the gap shows in the seq.
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append((seq, data))
+            self._cond.notify()
+            loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._event.set)
+
+    def get_nowait(self) -> tuple[int, Snapshot] | None:
+        with self._cond:
+            if not self._buffer:
+                return None
+            seq, data = self._buffer.popleft()
+            self.delivered += 1
+            self.last_seq = seq
+            return seq, data
+
+    def get(self, timeout: float | None = None) -> tuple[int, Snapshot] | None:
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or self.closed, timeout)
+        return self.get_nowait()
+
+    async def get_async(self, timeout: float | None = None) -> tuple[int, Snapshot] | None:
+        with self._cond:
+            self._loop = asyncio.get_running_loop()
+            self._event.clear()
+            if self._buffer or self.closed:
+                self._event.set()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.get_nowait()
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._broadcaster.unsubscribe(self)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "id": self.id,
+            "buffered": buffered,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "last_seq": self.last_seq,
+        }
+
+
+class Broadcaster:
+    def __init__(self, maxlen: int = SUBSCRIBER_BUFFER, history: int = RESUME_HISTORY) -> None:
+        self._maxlen = maxlen
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, Subscription] = {}
+        self._ids = itertools.count(1)
+        self._history: deque[tuple[int, Snapshot]] = deque(maxlen=history)
+        self.current: Snapshot | None = None
+        self.seq = 0
+        self.epoch = new_epoch()
+        self._dropped_closed = 0
+
+    def publish(self, data: dict[str, Any]) -> int:
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+            if is_snapshot(data):
+                snapshot = self.current = Snapshot(seq, data, self.current, self.epoch)
+                # Alignment ticks (up to 10 Hz) stay out: resume only needs snapshots.
+                self._history.append((seq, snapshot))
+            else:
+                snapshot = Snapshot(seq, data, epoch=self.epoch)
+            subscribers = list(self._subscribers.values())
+        for sub in subscribers:
+            sub.push(seq, snapshot)
+        return seq
+
+    def subscribe(self, maxlen: int | None = None) -> Subscription:
+        with self._lock:
+            sub = Subscription(self, next(self._ids), maxlen or self._maxlen)
+            self._subscribers[sub.id] = sub
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if self._subscribers.pop(sub.id, None) is not None:
+                self._dropped_closed += sub.dropped
+
+    def snapshot_at(self, seq: int) -> tuple[int, Snapshot] | None:
+        # The snapshot a client that last saw `seq` holds; None once it left the history.
+        with self._lock:
+            if not self._history or self._history[0][0] > seq or seq > self.seq:
+                return None
+            for item in reversed(self._history):
+                if item[0] <= seq:
+                    return item
+        return None
+
+    def resume(self, last_event_id: str | None) -> DeltaEncoder:
+        # Ids from another epoch (a restarted process) start over from a full snapshot.
+        parsed = parse_event_id(last_event_id)
+        base = self.snapshot_at(parsed[1]) if parsed is not None and parsed[0] == self.epoch else None
+        return DeltaEncoder(base, self.epoch)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            subscribers = [sub.stats() for sub in self._subscribers.values()]
+            dropped_closed = self._dropped_closed
+            seq = self.seq
+        return {
+            "seq": seq,
+            "subscribers": len(subscribers),
+            "dropped": dropped_closed + sum(s["dropped"] for s in subscribers),
+            "per_subscriber": subscribers,
+        }
+
+
+class ModemMonitor:
+    def __init__(
+        self,
+        client: ModemClient,
+        detector: Callable[[], bool],
+        name: str = "ec25",
+        cell_history: int = DEFAULT_HISTORY_SIZE,
+    ) -> None:
+        self.name = name
+        self.client = client
+        self._detector = detector
+        self.broadcaster = Broadcaster()
+        self.cells = CellHistory(cell_history)
+        self._last_data = _empty_data(enabled=False, detected=False)
+        self._initial = Snapshot(0, self._last_data, epoch=self.broadcaster.epoch)
+        self._data_lock = threading.Lock()
+        self._updated_at: dict[str, float] = {}
+        self._next_due: dict[str, float] = dict.fromkeys(POLL_GROUPS, 0.0)
+        self._thread: threading.Thread | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._running = False
+        self.enabled = False
+        self._wake: asyncio.Event | None = None
+        self._alignment: _Alignment | None = None
+
+    @property
+    def running(self) -> bool:
+        if self._task is not None:
+            return not self._task.done()
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_latest_data(self) -> Snapshot:
+        # Shared and read-only: no copy per caller.
+        return self.broadcaster.current or self._initial
+
+    def refresh_groups(self, *groups: str) -> None:
+        for group in groups or tuple(self._next_due):
+            if group in self._next_due:
+                self._next_due[group] = 0.0
+        self._wake_worker()
+
+    def _wake_worker(self) -> None:
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wake.set()
+        else:
+            loop.call_soon_threadsafe(wake.set)
+
+    def start_alignment(
+        self,
+        rate: float = 5.0,
+        duration: float = 120.0,
+        source: AlignmentSource = "qcsq",
+    ) -> dict[str, Any]:
+        rate = min(max(rate, 0.1), ALIGNMENT_MAX_RATE)
+        duration = min(max(duration, 1.0), ALIGNMENT_MAX_DURATION)
+        self._alignment = _Alignment(1.0 / rate, time.monotonic() + duration, source)
+        logger.info("Modo alineacion (%s): %.1f Hz durante %.0fs via %s", self.name, rate, duration, source)
+        self._wake_worker()
+        return self.alignment_status()
+
+    def stop_alignment(self) -> None:
+        if self._alignment is None:
+            return
+        alignment, self._alignment = self._alignment, None
+        logger.info(
+            "Modo alineacion terminado (%s): %d muestras, %d atrasos",
+            self.name,
+            alignment.samples,
+            alignment.overruns,
+        )
+        self.refresh_groups()
+
+    def alignment_status(self) -> dict[str, Any]:
+        alignment = self._alignment
+        if alignment is None:
+            return {"active": False}
+        return {
+            "active": True,
+            "rate": round(1.0 / alignment.interval, 2),
+            "source": alignment.source,
+            "remaining": round(max(0.0, alignment.deadline - time.monotonic()), 1),
+            "samples": alignment.samples,
+            "overruns": alignment.overruns,
+        }
+
+    async def _align_tick(self, alignment: _Alignment) -> None:
+        # Minimal payload: only the figures an installer watches while pointing the antenna.
+        if alignment.source == "servingcell":
+            cell = parse_servingcell(
+                await self.client.send_at_async(SERVINGCELL_COMMAND, priority=Priority.BACKGROUND, cached=False)
+            )
+            values = (
+                {"rsrp": cell.rsrp, "rsrq": cell.rsrq, "sinr": cell.sinr, "rssi": cell.rssi, "pci": cell.pci}
+                if cell
+                else {}
+            )
+        else:
+            qcsq = parse_qcsq(await self.client.send_at_async("AT+QCSQ", priority=Priority.BACKGROUND, cached=False))
+            values = {k: qcsq[k] for k in ("rsrp", "rsrq", "sinr", "rssi")} if qcsq else {}
+        alignment.samples += 1
+        self._publish({"alignment": True, "t": round(time.time(), 2), **values})
+
+    def _publish(self, data: dict[str, Any]) -> None:
+        if is_snapshot(data):
+            # Ages relative to the snapshot timestamp so the serialized bytes stay valid.
+            with self._data_lock:
+                updated_at = dict(self._updated_at)
+            data = {**data, "age": {group: round(data["timestamp"] - ts, 1) for group, ts in updated_at.items()}}
+        self.broadcaster.publish(data)
+
+    def apply_urc(self, event: dict[str, Any]) -> None:
+        with self._data_lock:
+            if not self.enabled or not self._last_data.get("detected"):
+                self.refresh_groups()
+                return
+            data = {
+                **self._last_data,
+                "signal": dict(self._last_data["signal"]),
+                "network": dict(self._last_data["network"]),
+                "timestamp": time.time(),
+            }
+            kind = event["type"]
+            if kind == "registration":
+                data["network"]["registration"] = event["registration"]
+                self._updated_at["registration"] = data["timestamp"]
+            elif kind == "csq" and event["csq"]:
+                data["signal"]["csq"] = event["csq"]
+            elif kind == "sim" and event["sim"]:
+                data["network"]["sim"] = event["sim"]
+            self._last_data = data
+
+        logger.debug("URC aplicado (%s): %s", self.name, event)
+        self._publish(data)
+        if kind == "registration":
+            self.refresh_groups("registration", "operator")
+        elif kind in ("act", "sim"):
+            self.refresh_groups("operator")
+
+    async def _worker(self, intervals: dict[str, float]) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        logger.info(
+            "EC25 monitor iniciado (%s, intervalos: %s)",
+            self.name,
+            ", ".join(f"{g}={i:.1f}s" for g, i in intervals.items()),
+        )
+
+        while self._running:
+            wait = min(intervals.values())
+            try:
+                if not self.enabled:
+                    await asyncio.sleep(1)
+                    continue
+
+                busy = self.client.busy
+                alignment = self._alignment
+                if busy is not None:
+                    # Port held by a long job: report it instead of letting polls time out.
+                    if self._last_data.get("busy") != busy:
+                        with self._data_lock:
+                            data = {**self._last_data, "busy": busy, "timestamp": time.time()}
+                            self._last_data = data
+                        self._publish(data)
+                    for group in self._next_due:
+                        self._next_due[group] = 0.0
+                    wait = 1.0
+                elif alignment is not None:
+                    started = time.monotonic()
+                    if started >= alignment.deadline:
+                        self.stop_alignment()
+                        continue
+                    # One command in flight at most and background priority: other callers go first.
+                    await self._align_tick(alignment)
+                    elapsed = time.monotonic() - started
+                    if elapsed > alignment.interval:
+                        alignment.overruns += 1
+                    wait = max(0.0, alignment.interval - elapsed)
+                elif not await asyncio.to_thread(self._detector):
+                    data = _empty_data(enabled=True, detected=False)
+                    with self._data_lock:
+                        self._last_data = data
+                        self._updated_at.clear()
+                    for group in self._next_due:
+                        self._next_due[group] = 0.0
+                    self._publish(data)
+                else:
+                    now = time.monotonic()
+                    due = [g for g in POLL_GROUPS if self._next_due.get(g, math.inf) <= now]
+                    if due:
+                        for group in due:
+                            self._next_due[group] = now + intervals[group]
+                        fresh = await self.client.poll_groups_async(due)
+                        with self._data_lock:
+                            previous = (
+                                self._last_data if self._last_data.get("detected") else _empty_data(True, True)
+                            )
+                            data = {
+                                "signal": {**previous["signal"], **fresh["signal"]},
+                                "network": {**previous["network"], **fresh["network"]},
+                                "timestamp": time.time(),
+                                "enabled": True,
+                                "detected": True,
+                                "busy": None,
+                            }
+                            self._last_data = data
+                            for group in due:
+                                self._updated_at[group] = data["timestamp"]
+                        self._publish(data)
+
+                        logger.debug(
+                            "Datos EC25 actualizados (%s: %s): CSQ=%s, Op=%s",
+                            self.name,
+                            ",".join(due),
+                            data["signal"]["csq"],
+                            data["network"]["operator"],
+                        )
+                    # Engineering data goes last so it never delays the snapshot above.
+                    if self._next_due.get("cell", math.inf) <= time.monotonic():
+                        self._next_due["cell"] = time.monotonic() + intervals["cell"]
+                        sample = await self.client.get_cell_sample_async()
+                        if sample is not None:
+                            self.cells.append(sample)
+                    wait = max(0.0, min(self._next_due.values()) - time.monotonic())
+
+            except Exception as e:
+                logger.error("Error en monitor EC25 (%s): %s", self.name, e, exc_info=True)
 
-_monitor_thread: threading.Thread | None = None
-_monitor_running = False
-_monitor_enabled = False
+            try:
+                await asyncio.wait_for(self._wake.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+        logger.info("EC25 monitor detenido (%s)", self.name)
+
+    def start(self, intervals: dict[str, float], enabled: bool = True, urc: bool = False) -> None:
+        if self.running:
+            logger.warning("Monitor EC25 (%s) ya esta corriendo", self.name)
+            return
+
+        self._running = True
+        self.enabled = enabled
+        self._next_due = dict.fromkeys(intervals, 0.0)
+        with self._data_lock:
+            self._last_data = _empty_data(enabled=enabled, detected=False)
+            self._updated_at.clear()
+        self._publish(self._last_data)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._task = loop.create_task(self._worker(intervals), name=f"EC25Monitor-{self.name}")
+        else:
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self._worker(intervals)),
+                daemon=True,
+                name=f"EC25Monitor-{self.name}",
+            )
+            self._thread.start()
+        if urc:
+            self.client.enable_urc(self.apply_urc)
+        logger.info("Monitor EC25 iniciado (%s, enabled=%s, urc=%s)", self.name, enabled, urc)
 
+    def stop(self) -> None:
+        if not self.running:
+            logger.warning("Monitor EC25 (%s) no esta corriendo", self.name)
+            return
 
-def get_latest_data() -> dict[str, Any]:
-    with _data_lock:
-        return _last_data.copy()
+        logger.info("Deteniendo monitor EC25 (%s)...", self.name)
+        self._running = False
+        self._alignment = None
+        self.client.disable_urc()
+        self._wake_worker()
 
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._loop = None
+            logger.info("Monitor EC25 detenido (%s)", self.name)
+            return
 
-def _monitor_worker(update_interval: float = 5.0) -> None:
-    global _last_data, _monitor_running
+        assert self._thread is not None
+        self._thread.join(timeout=5.0)
+        if self._thread.is_alive():
+            logger.error("Monitor EC25 (%s) no se detuvo correctamente", self.name)
+        else:
+            logger.info("Monitor EC25 detenido (%s)", self.name)
+        self._thread = None
+        self._loop = None
 
-    logger.info("EC25 monitor thread iniciado (intervalo: %.1fs)", update_interval)
 
-    while _monitor_running:
-        try:
-            if not _monitor_enabled:
-                time.sleep(1)
-                continue
-
-            detected = is_ec25_detected()
-
-            if not detected:
-                data = {
-                    "signal": {"csq": "N/A", "qcsq": "N/A"},
-                    "network": {
-                        "operator": "N/A",
-                        "network": "N/A",
-                        "registration": "N/A",
-                        "sim": "N/A",
-                    },
-                    "timestamp": time.time(),
-                    "enabled": True,
-                    "detected": False,
-                }
-            else:
-                signal_data = get_signal()
-                network_data = get_network_info()
+monitor = ModemMonitor(primary, detector=lambda: is_ec25_detected(), cell_history=settings.EC25_CELL_HISTORY)
+broadcaster = monitor.broadcaster
 
-                data = {
-                    "signal": signal_data,
-                    "network": network_data,
-                    "timestamp": time.time(),
-                    "enabled": True,
-                    "detected": True,
-                }
 
-            with _data_lock:
-                _last_data = data
+def get_latest_data() -> Snapshot:
+    return monitor.get_latest_data()
 
-            try:
-                ec25_data_queue.put_nowait(data)
-            except queue.Full:
-                try:
-                    ec25_data_queue.get_nowait()
-                    ec25_data_queue.put_nowait(data)
-                except queue.Empty:
-                    pass
-
-            logger.debug(
-                "Datos EC25 actualizados: CSQ=%s, Op=%s",
-                data["signal"]["csq"],
-                data["network"]["operator"],
-            )
 
-        except Exception as e:
-            logger.error("Error en monitor EC25: %s", e, exc_info=True)
+def refresh_groups(*groups: str) -> None:
+    monitor.refresh_groups(*groups)
 
-        time.sleep(update_interval)
 
-    logger.info("EC25 monitor thread detenido")
+def _on_presence_change(present: bool, port: str | None) -> None:
+    monitor.refresh_groups()
 
 
-def start_monitor(update_interval: float = 5.0, enabled: bool = True) -> None:
-    global _monitor_thread, _monitor_running, _monitor_enabled
+presence.add_listener(_on_presence_change)
 
-    if _monitor_thread and _monitor_thread.is_alive():
+
+def start_monitor(
+    update_interval: float = 5.0,
+    enabled: bool = True,
+    urc: bool = False,
+    signal_interval: float | None = None,
+    slow_interval: float = 60.0,
+    cell_interval: float | None = None,
+) -> None:
+    if monitor.running:
         logger.warning("Monitor EC25 ya esta corriendo")
         return
-
-    _monitor_running = True
-    _monitor_enabled = enabled
-    _monitor_thread = threading.Thread(
-        target=_monitor_worker,
-        args=(update_interval,),
-        daemon=True,
-        name="EC25Monitor",
-    )
-    _monitor_thread.start()
-    logger.info("Monitor EC25 iniciado (enabled=%s)", enabled)
+    intervals = build_intervals(update_interval, signal_interval, slow_interval, cell_interval)
+    monitor.start(intervals, enabled=enabled, urc=urc)
+    presence.start()
 
 
 def stop_monitor() -> None:
-    global _monitor_running, _monitor_thread
-
-    if not _monitor_thread or not _monitor_thread.is_alive():
+    if not monitor.running:
         logger.warning("Monitor EC25 no esta corriendo")
         return
+    monitor.stop()
+    presence.stop()
+
+
+def start_alignment(rate: float = 5.0, duration: float = 120.0, source: AlignmentSource = "qcsq") -> dict[str, Any]:
+    return monitor.start_alignment(rate, duration, source)
+
 
-    logger.info("Deteniendo monitor EC25...")
-    _monitor_running = False
-    _monitor_thread.join(timeout=5.0)
+def stop_alignment() -> None:
+    monitor.stop_alignment()
 
-    if _monitor_thread.is_alive():
-        logger.error("Monitor EC25 no se detuvo correctamente")
-    else:
-        logger.info("Monitor EC25 detenido")
 
-    _monitor_thread = None
+def get_alignment_status() -> dict[str, Any]:
+    return monitor.alignment_status()
 
 
 def set_monitor_enabled(enabled: bool) -> None:
-    global _monitor_enabled
-    _monitor_enabled = enabled
+    monitor.enabled = enabled
     logger.info("Monitor EC25 %s", "habilitado" if enabled else "deshabilitado")
 
 
 def is_monitor_running() -> bool:
-    return _monitor_thread is not None and _monitor_thread.is_alive()
+    return monitor.running
 
 
 def is_monitor_enabled() -> bool:
-    return _monitor_enabled
+    return monitor.enabled
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+import os
+import pty
+import random
+import select
+import threading
+import time
+import tty
+from typing import Literal
+
+logger = logging.getLogger(__name__)
+
+FailureMode = Literal["no_reply", "partial", "error"]
+
+DEFAULT_RESPONSES: dict[str, str] = {
+    "AT": "",
+    "AT+CSQ": "+CSQ: 20,99",
+    "AT+QCSQ": '+QCSQ: "LTE",-65,-95,135,-10',
+    "AT+QCAINFO": (
+        '+QCAINFO: "pcc",650,75,"LTE BAND 2",1,367,-95,-10,-65,13\r\n'
+        '+QCAINFO: "scc",9610,50,"LTE BAND 28",1,112,-104,-13,-74,4'
+    ),
+    "AT+COPS?": '+COPS: 0,0,"Movistar",7',
+    "AT+QNWINFO": '+QNWINFO: "FDD LTE","73002","LTE BAND 2",650',
+    "AT+CREG?": "+CREG: 0,1",
+    "AT+CEREG?": "+CEREG: 0,1",
+    "AT+CPIN?": "+CPIN: READY",
+    "AT+CGDCONT?": '+CGDCONT: 1,"IPV4V6","internet","0.0.0.0",0,0',
+    "AT+GSN": "866758041234567",
+    "AT+QGMR": "EC25EFAR06A06M4G",
+    'AT+QENG="SERVINGCELL"': (
+        '+QENG: "servingcell","NOCONN","LTE","FDD",730,02,1A2D001,367,650,2,5,5,2B5D,-95,-10,-65,13,-'
+    ),
+    'AT+QENG="NEIGHBOURCELL"': (
+        '+QENG: "neighbourcell intra","LTE",650,368,-12,-101,-70,8,30,6,-,-,-\r\n'
+        '+QENG: "neighbourcell inter","LTE",9610,112,-14,-108,-77,2,22,4,-,-'
+    ),
+}
+
+
+class EC25Simulator:
+    def __init__(
+        self,
+        responses: dict[str, str] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        echo: bool = True,
+        seed: int | None = None,
+    ) -> None:
+        self.responses = {**DEFAULT_RESPONSES, **(responses or {})}
+        self.latency = latency
+        self.jitter = jitter
+        self.echo = echo
+        self.failures: dict[str, FailureMode] = {}
+        self.delays: dict[str, float] = {}
+        self.received: list[str] = []
+        self._random = random.Random(seed)
+        self._master: int | None = None
+        self._slave: int | None = None
+        self._port: str | None = None
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._write_lock = threading.Lock()
+
+    @property
+    def port(self) -> str:
+        if self._port is None:
+            raise RuntimeError("Simulador no iniciado")
+        return self._port
+
+    def start(self) -> str:
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self._port = os.ttyname(self._slave)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True, name="EC25Simulator")
+        self._thread.start()
+        logger.info("Simulador EC25 escuchando en %s", self._port)
+        return self._port
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+        self._thread = None
+
+    def __enter__(self) -> EC25Simulator:
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def set_response(self, cmd: str, body: str) -> None:
+        self.responses[cmd.upper()] = body
+
+    def set_delay(self, cmd: str, seconds: float) -> None:
+        self.delays[cmd.upper()] = seconds
+
+    def fail(self, cmd: str, mode: FailureMode | None) -> None:
+        if mode is None:
+            self.failures.pop(cmd.upper(), None)
+        else:
+            self.failures[cmd.upper()] = mode
+
+    def emit_urc(self, line: str) -> None:
+        self._write(f"\r\n{line}\r\n")
+
+    def _write(self, text: str) -> None:
+        if self._master is None:
+            return
+        with self._write_lock:
+            os.write(self._master, text.encode())
+
+    def _serve(self) -> None:
+        buffer = b""
+        while self._running:
+            ready, _, _ = select.select([self._master], [], [], 0.1)
+            if not ready:
+                continue
+            try:
+                buffer += os.read(self._master, 1024)
+            except OSError:
+                continue
+            while b"\r" in buffer:
+                raw, buffer = buffer.split(b"\r", 1)
+                line = raw.decode(errors="ignore").strip()
+                if line:
+                    self._handle(line)
+
+    def _handle(self, line: str) -> None:
+        self.received.append(line)
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        delay += sum(self.delays.get(cmd, 0.0) for cmd in self._split(line))
+        if delay:
+            time.sleep(delay)
+
+        out = f"{line}\r\r\n" if self.echo else ""
+        for cmd in self._split(line):
+            mode = self.failures.get(cmd)
+            if mode == "no_reply":
+                self._write(out)
+                return
+            if mode == "error":
+                self._write(out + "\r\nERROR\r\n")
+                return
+            if cmd in ("ATE0", "ATE1"):
+                self.echo = cmd == "ATE1"
+                continue
+            body = self._lookup(cmd)
+            if body is None:
+                self._write(out + "\r\nERROR\r\n")
+                return
+            if body:
+                out += f"\r\n{body}\r\n"
+            if mode == "partial":
+                self._write(out[: max(1, len(out) // 2)])
+                return
+        self._write(out + "\r\nOK\r\n")
+
+    def _lookup(self, cmd: str) -> str | None:
+        if cmd in self.responses:
+            return self.responses[cmd]
+        if "=" in cmd and not cmd.endswith("=?"):
+            return ""
+        return None
+
+    @staticmethod
+    def _split(line: str) -> list[str]:
+        parts = line.upper().split(";")
+        cmds = [parts[0]]
+        for part in parts[1:]:
+            if part:
+                cmds.append("AT" + part)
+        return cmds
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with EC25Simulator() as sim:
+        print(f"EC25_AT_PORT={sim.port}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
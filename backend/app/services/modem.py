@@ -1,28 +1,121 @@
 from __future__ import annotations
 
+import asyncio
 import glob
 import logging
+import os
 import re
 import time
-from typing import Any
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, ContextManager
 
 import serial
 
+from .at_async import AsyncATScheduler, AsyncATSession
+from .at_batch import chain_commands, chunk_commands, split_chained_response
+from .at_cache import ATResponseCache
+from .at_scheduler import AT_LOCK_FILE, ATScheduler, Priority
+from .at_session import BAUDRATE, ATSession, command_timeout
+from .cell_info import CELL_COMMANDS, CellSample, parse_cell_sample
+from .modem_discovery import ModemPresence, find_sysfs_at_ports
+
+if TYPE_CHECKING:
+    from .at_transcript import TranscriptRecorder
+
 logger = logging.getLogger(__name__)
 
-BAUDRATE = 115200
 CACHE_DURATION = 30
 
+REG_STATUS_MAP = {
+    "0": "No registrado",
+    "1": "Registrado",
+    "2": "Buscando",
+    "3": "Denegado",
+    "5": "Roaming",
+}
+SIM_STATUS_MAP = {"READY": "Lista", "SIM PIN": "PIN requerido", "SIM PUK": "PUK requerido"}
+COPS_TECH_MAP = {"0": "GSM", "2": "UTRAN", "7": "LTE", "9": "NB-IoT"}
+
+URC_PREFIXES = ("+CREG:", "+CEREG:", "+CGREG:", "+QIND:", "+CPIN:", "+QSIMSTAT:")
+URC_ENABLE_COMMANDS = [
+    'AT+QURCCFG="urcport","usbat"',
+    "AT+CREG=2",
+    "AT+CEREG=2",
+    'AT+QINDCFG="csq",1,0',
+    'AT+QINDCFG="act",1,0',
+    "AT+QSIMSTAT=1",
+]
+
+_URC_REG_RE = re.compile(r'\+(CREG|CEREG|CGREG):\s*(\d+)(?:,"([0-9A-Fa-f]*)","([0-9A-Fa-f]*)"(?:,(\d+))?)?\s*$')
+_URC_QIND_CSQ_RE = re.compile(r'\+QIND:\s*"csq",(\d+),(\d+)')
+_URC_QIND_ACT_RE = re.compile(r'\+QIND:\s*"act","([^"]*)"')
+_URC_CPIN_RE = re.compile(r"\+CPIN:\s*(.+?)\s*$")
+_URC_QSIMSTAT_RE = re.compile(r"\+QSIMSTAT:\s*\d+,(\d)")
+
+_CSQ_RE = re.compile(r"\+CSQ:\s*(\d+),(\d+)")
+_QCSQ_RE = re.compile(r'\+QCSQ:\s*"([^"]+)",(-?\d+),(-?\d+),(-?\d+),(-?\d+)')
+_COPS_RE = re.compile(r'\+COPS:\s*\d+,\d+,"([^"]+)",(\d+)')
+_QNWINFO_RE = re.compile(r'\+QNWINFO:\s*"([^"]+)","([^"]+)","([^"]+)",(\d+)')
+_REG_RE = re.compile(r"\+(CE?REG|CGREG):\s*\d+,(\d+)")
+_CPIN_RE = re.compile(r"\+CPIN:\s*([^\r\n]*\S)")
+_CGDCONT_RE = re.compile(r'\+CGDCONT:\s*(\d+),"([^"]*)","([^"]*)"')
+_QCAINFO_RE = re.compile(
+    r'\+QCAINFO:\s*"(pcc|scc)",(\d+),(\d+),"([^"]*)",(\d+),(\d+)(?:,(-?\d+),(-?\d+),(-?\d+),(-?\d+))?'
+)
+# Transmission bandwidth in resource blocks -> channel bandwidth in MHz
+LTE_BANDWIDTH_MHZ = {6: 1.4, 15: 3.0, 25: 5.0, 50: 10.0, 75: 15.0, 100: 20.0}
+
+SIGNAL_COMMANDS = ["AT+CSQ", "AT+QCSQ", "AT+QCAINFO"]
+NETWORK_COMMANDS = ["AT+COPS?", "AT+QNWINFO", "AT+CREG?", "AT+CEREG?", "AT+CPIN?"]
+INFO_COMMANDS = ["AT+CPIN?", "AT+CGDCONT?"]
+# No response prefix, so they cannot be split out of a chained reply.
+PLAIN_INFO_COMMANDS = ["AT+GSN", "AT+QGMR"]
+
+POLL_GROUPS: dict[str, list[str]] = {
+    "signal": SIGNAL_COMMANDS,
+    "registration": ["AT+CREG?", "AT+CEREG?"],
+    "operator": ["AT+COPS?", "AT+QNWINFO", "AT+CPIN?"],
+}
+
 _cached_port: str | None = None
 _cache_time: float = 0
+_fixed_port: str | None = None
+
+
+def configure_port(port: str | None) -> None:
+    global _fixed_port, _cached_port
+    _fixed_port = port
+    _cached_port = None
+    primary.close()
+    logger.info("Puerto AT fijo: %s", port or "autodeteccion")
 
 
 def find_at_port(force_refresh: bool = False) -> str | None:
     global _cached_port, _cache_time
 
+    if _fixed_port:
+        return _fixed_port
+
+    if primary.session.is_open and not force_refresh:
+        return primary.session.port
+
+    if not force_refresh and presence.running and presence.present:
+        return presence.port
+
     if not force_refresh and _cached_port and (time.time() - _cache_time < CACHE_DURATION):
         return _cached_port
 
+    sysfs_ports = find_sysfs_at_ports()
+    if sysfs_ports:
+        if sysfs_ports[0] != _cached_port:
+            logger.info("Puerto AT detectado via sysfs: %s", sysfs_ports[0])
+        _cached_port = sysfs_ports[0]
+        _cache_time = time.time()
+        return _cached_port
+
+    if primary.session.is_open:
+        return primary.session.port
+
     all_ports = glob.glob("/dev/ttyUSB*")
     priority_ports = ["/dev/ttyUSB2", "/dev/ttyUSB3"]
     remaining_ports = sorted([p for p in all_ports if p not in priority_ports])
@@ -58,37 +151,32 @@ def find_at_port(force_refresh: bool = False) -> str | None:
     return None
 
 
-def send_at(cmd: str) -> str | None:
-    port = find_at_port()
-    if not port:
-        logger.error("No hay puerto AT disponible")
-        return None
-    try:
-        with serial.Serial(port, BAUDRATE, timeout=2, rtscts=False, dsrdtr=False) as s:
-            s.reset_input_buffer()
-            s.reset_output_buffer()
-            s.write((cmd + "\r\n").encode())
-            time.sleep(0.5)
-
-            response = ""
-            for _ in range(5):
-                chunk = s.read(s.in_waiting or 128).decode(errors="ignore")
-                response += chunk
-                if "OK" in response or "ERROR" in response:
-                    break
-                time.sleep(0.1)
-
-            logger.debug("AT %s: %s", cmd, response[:80])
-            return response if response else None
-    except Exception as e:
-        logger.error("Error enviando comando AT %s: %s", cmd, e)
-        return None
+def _batch_requests(cmds: list[str]) -> list[tuple[list[str], str, float | None]]:
+    requests: list[tuple[list[str], str, float | None]] = []
+    for chunk in chunk_commands(cmds):
+        if len(chunk) == 1:
+            requests.append((chunk, chunk[0], None))
+        else:
+            requests.append((chunk, chain_commands(chunk), max(command_timeout(c) for c in chunk)))
+    return requests
+
+
+def _split_batch(chunk: list[str], raw: str | None) -> tuple[dict[str, str | None], list[str]]:
+    if len(chunk) == 1:
+        return {chunk[0]: raw}, []
+    if raw is None:
+        return dict.fromkeys(chunk), []
+    split = split_chained_response(chunk, raw)
+    retry = [cmd for cmd in chunk if split[cmd] is None]
+    if retry:
+        logger.debug("Comandos encadenados fallaron, reintentando individualmente: %s", retry)
+    return split, retry
 
 
 def parse_csq(response: str | None) -> str | None:
     if not response:
         return None
-    match = re.search(r"\+CSQ:\s*(\d+),(\d+)", response)
+    match = _CSQ_RE.search(response)
     if match:
         rssi = int(match.group(1))
         dbm = -113 + (rssi * 2) if rssi < 31 else None
@@ -101,7 +189,7 @@ def parse_csq(response: str | None) -> str | None:
 def parse_qcsq(response: str | None) -> dict[str, Any] | None:
     if not response:
         return None
-    match = re.search(r'\+QCSQ:\s*"([^"]+)",(-?\d+),(-?\d+),(-?\d+),(-?\d+)', response)
+    match = _QCSQ_RE.search(response)
     if match:
         tech, rssi, rsrp, sinr, rsrq = match.groups()
         return {
@@ -114,10 +202,41 @@ def parse_qcsq(response: str | None) -> dict[str, Any] | None:
     return None
 
 
+def parse_qcainfo(response: str | None) -> dict[str, Any] | None:
+    if not response:
+        return None
+    carriers = []
+    for m in _QCAINFO_RE.finditer(response):
+        role, earfcn, rbs, band, state, pci, rsrp, rsrq, rssi, sinr = m.groups()
+        carriers.append(
+            {
+                "role": role,
+                "earfcn": int(earfcn),
+                "bandwidth_mhz": LTE_BANDWIDTH_MHZ.get(int(rbs)),
+                "band": band,
+                "state": int(state),
+                "pci": int(pci),
+                "rsrp": int(rsrp) if rsrp is not None else None,
+                "rsrq": int(rsrq) if rsrq is not None else None,
+                "rssi": int(rssi) if rssi is not None else None,
+                "sinr": int(sinr) if sinr is not None else None,
+            }
+        )
+    if not carriers:
+        return None
+    secondary = [c for c in carriers if c["role"] == "scc"]
+    return {
+        "active": bool(secondary),
+        "carriers": carriers,
+        "bands": [c["band"] for c in carriers],
+        "bandwidth_mhz": sum(c["bandwidth_mhz"] or 0 for c in carriers),
+    }
+
+
 def parse_qcsq_text(response: str | None) -> str | None:
     if not response:
         return None
-    match = re.search(r'\+QCSQ:\s*"([^"]+)",(-?\d+),(-?\d+),(-?\d+),(-?\d+)', response)
+    match = _QCSQ_RE.search(response)
     if match:
         tech, rssi, rsrp, sinr, rsrq = match.groups()
         return f"{tech}: RSRP {rsrp}dBm, RSRQ {rsrq}dB, SINR {sinr}dB"
@@ -127,18 +246,17 @@ def parse_qcsq_text(response: str | None) -> str | None:
 def parse_cops(response: str | None) -> str | None:
     if not response:
         return None
-    match = re.search(r'\+COPS:\s*\d+,\d+,"([^"]+)",(\d+)', response)
+    match = _COPS_RE.search(response)
     if match:
         operator, act = match.groups()
-        tech_map = {"0": "GSM", "2": "UTRAN", "7": "LTE", "9": "NB-IoT"}
-        return f"{operator} ({tech_map.get(act, 'Unknown')})"
+        return f"{operator} ({COPS_TECH_MAP.get(act, 'Unknown')})"
     return None
 
 
 def parse_qnwinfo(response: str | None) -> str | None:
     if not response:
         return None
-    match = re.search(r'\+QNWINFO:\s*"([^"]+)","([^"]+)","([^"]+)",(\d+)', response)
+    match = _QNWINFO_RE.search(response)
     if match:
         act, mcc_mnc, band, channel = match.groups()
         return f"{act} - {band} @ {channel} MHz"
@@ -148,71 +266,521 @@ def parse_qnwinfo(response: str | None) -> str | None:
 def parse_reg_status(response: str | None) -> str | None:
     if not response:
         return None
-    match = re.search(r"\+(C?[ER]REG):\s*\d+,(\d+)", response)
+    match = _REG_RE.search(response)
     if match:
         stat = match.group(2)
-        status_map = {
-            "0": "No registrado",
-            "1": "Registrado",
-            "2": "Buscando",
-            "3": "Denegado",
-            "5": "Roaming",
-        }
-        return status_map.get(stat, f"Estado {stat}")
+        return REG_STATUS_MAP.get(stat, f"Estado {stat}")
     return None
 
 
 def parse_cpin(response: str | None) -> str | None:
     if not response:
         return None
-    match = re.search(r"\+CPIN:\s*(\w+)", response)
+    match = _CPIN_RE.search(response)
+    if match:
+        status = match.group(1)
+        return SIM_STATUS_MAP.get(status, status)
+    return None
+
+
+def parse_plain(response: str | None, cmd: str) -> str | None:
+    if not response:
+        return None
+    for line in response.splitlines():
+        line = line.strip()
+        if line and line != cmd and line not in ("OK", "ERROR"):
+            return line
+    return None
+
+
+def parse_cgdcont(response: str | None) -> list[dict[str, Any]]:
+    if not response:
+        return []
+    return [
+        {"cid": int(m.group(1)), "pdp_type": m.group(2), "apn": m.group(3)}
+        for m in _CGDCONT_RE.finditer(response)
+    ]
+
+
+def parse_urc(line: str) -> dict[str, Any] | None:
+    match = _URC_REG_RE.match(line)
+    if match:
+        source, stat, tac, cell_id, act = match.groups()
+        return {
+            "type": "registration",
+            "source": source,
+            "stat": int(stat),
+            "registration": REG_STATUS_MAP.get(stat, f"Estado {stat}"),
+            "tac": tac,
+            "cell_id": cell_id,
+            "act": int(act) if act is not None else None,
+        }
+    match = _URC_QIND_CSQ_RE.match(line)
+    if match:
+        rssi, ber = match.groups()
+        return {
+            "type": "csq",
+            "rssi": int(rssi),
+            "ber": int(ber),
+            "csq": parse_csq(f"+CSQ: {rssi},{ber}"),
+        }
+    match = _URC_QIND_ACT_RE.match(line)
+    if match:
+        return {"type": "act", "act": match.group(1)}
+    match = _URC_CPIN_RE.match(line)
     if match:
         status = match.group(1)
-        status_map = {"READY": "Lista", "SIM PIN": "PIN requerido", "SIM PUK": "PUK requerido"}
-        return status_map.get(status, status)
+        return {"type": "sim", "status": status, "sim": SIM_STATUS_MAP.get(status, status)}
+    match = _URC_QSIMSTAT_RE.match(line)
+    if match:
+        inserted = match.group(1) == "1"
+        return {
+            "type": "sim",
+            "status": "INSERTED" if inserted else "REMOVED",
+            "sim": None if inserted else "No insertada",
+        }
     return None
 
 
-def get_signal() -> dict[str, Any]:
-    csq_raw = send_at("AT+CSQ")
-    qcsq_raw = send_at("AT+QCSQ")
+def _signal_from(raw: dict[str, str | None]) -> dict[str, Any]:
+    csq_raw = raw.get("AT+CSQ")
+    qcsq_raw = raw.get("AT+QCSQ")
     return {
         "csq": parse_csq(csq_raw) or "N/A",
         "csq_raw": csq_raw,
         "qcsq": parse_qcsq_text(qcsq_raw) or "N/A",
         "qcsq_raw": qcsq_raw,
         "qcsq_parsed": parse_qcsq(qcsq_raw),
+        "ca": parse_qcainfo(raw.get("AT+QCAINFO")),
     }
 
 
-def get_network_info() -> dict[str, Any]:
-    cops_raw = send_at("AT+COPS?")
-    qnwinfo_raw = send_at("AT+QNWINFO")
-    creg_raw = send_at("AT+CREG?")
-    cereg_raw = send_at("AT+CEREG?")
-    cpin_raw = send_at("AT+CPIN?")
+def _registration_from(raw: dict[str, str | None]) -> dict[str, Any]:
+    creg_raw = raw.get("AT+CREG?")
+    cereg_raw = raw.get("AT+CEREG?")
+    return {
+        "registration": parse_reg_status(cereg_raw or creg_raw) or "N/A",
+        "creg_raw": creg_raw,
+        "cereg_raw": cereg_raw,
+    }
+
 
+def _operator_from(raw: dict[str, str | None]) -> dict[str, Any]:
+    cops_raw = raw.get("AT+COPS?")
+    qnwinfo_raw = raw.get("AT+QNWINFO")
+    cpin_raw = raw.get("AT+CPIN?")
     return {
         "operator": parse_cops(cops_raw) or "N/A",
         "network": parse_qnwinfo(qnwinfo_raw) or "N/A",
-        "registration": parse_reg_status(cereg_raw or creg_raw) or "N/A",
         "sim": parse_cpin(cpin_raw) or "N/A",
         "cops_raw": cops_raw,
         "qnwinfo_raw": qnwinfo_raw,
-        "creg_raw": creg_raw,
-        "cereg_raw": cereg_raw,
         "cpin_raw": cpin_raw,
     }
 
 
+def _network_from(raw: dict[str, str | None]) -> dict[str, Any]:
+    return {**_operator_from(raw), **_registration_from(raw)}
+
+
+_GROUP_BUILDERS: dict[str, tuple[str, Callable[[dict[str, str | None]], dict[str, Any]]]] = {
+    "signal": ("signal", _signal_from),
+    "registration": ("network", _registration_from),
+    "operator": ("network", _operator_from),
+}
+
+
+def _info_from(raw: dict[str, str | None]) -> dict[str, Any]:
+    return {
+        "imei": parse_plain(raw.get("AT+GSN"), "AT+GSN"),
+        "firmware": parse_plain(raw.get("AT+QGMR"), "AT+QGMR"),
+        "sim": parse_cpin(raw.get("AT+CPIN?")) or "N/A",
+        "pdp_contexts": parse_cgdcont(raw.get("AT+CGDCONT?")),
+    }
+
+
+def _groups_from(groups: list[str], raw: dict[str, str | None]) -> dict[str, dict[str, Any]]:
+    result: dict[str, dict[str, Any]] = {"signal": {}, "network": {}}
+    for group in groups:
+        section, builder = _GROUP_BUILDERS[group]
+        result[section].update(builder(raw))
+    return result
+
+
+def _apn_command(apn: str) -> str:
+    return f'AT+CGDCONT=1,"IPV4V6","{apn}"'
+
+
+class ModemClient:
+    def __init__(
+        self,
+        port_resolver: Callable[[bool], str | None],
+        name: str = "ec25",
+        lock_file: str | None = AT_LOCK_FILE,
+    ) -> None:
+        self.name = name
+        self.cache = ATResponseCache()
+        self._port_resolver = port_resolver
+        self._lock_file = lock_file
+        self.session: ATSession | AsyncATSession = ATSession(port_resolver)
+        self.scheduler: ATScheduler = ATScheduler(self.session, lock_file=lock_file)
+        self.recorder: TranscriptRecorder | None = None
+
+    @property
+    def port(self) -> str | None:
+        return self.session.port
+
+    def find_at_port(self, force_refresh: bool = False) -> str | None:
+        return self._port_resolver(force_refresh)
+
+    @property
+    def busy(self) -> str | None:
+        return self.scheduler.busy
+
+    def busy_for(self, reason: str) -> ContextManager[None]:
+        return self.scheduler.busy_for(reason)
+
+    def start_async_transport(self) -> None:
+        if isinstance(self.scheduler, AsyncATScheduler) and self.scheduler.running:
+            return
+        self.session.close()
+        self.session = AsyncATSession(self._port_resolver)
+        self.scheduler = AsyncATScheduler(self.session, lock_file=self._lock_file)
+        self.scheduler.start()
+        logger.info("Transporte AT asincrono iniciado (%s)", self.name)
+
+    async def stop_async_transport(self) -> None:
+        if not isinstance(self.scheduler, AsyncATScheduler):
+            return
+        await self.scheduler.stop()
+        self.session = ATSession(self._port_resolver)
+        self.scheduler = ATScheduler(self.session, lock_file=self._lock_file)
+        logger.info("Transporte AT asincrono detenido (%s)", self.name)
+
+    def close(self) -> None:
+        self.session.close()
+        self.cache.clear()
+
+    def send_at(
+        self,
+        cmd: str,
+        timeout: float | None = None,
+        priority: Priority = Priority.NORMAL,
+        cached: bool = True,
+    ) -> str | None:
+        if cached:
+            hit = self.cache.get(cmd)
+            if hit is not None:
+                return hit
+        started = time.monotonic()
+        result = self.scheduler.execute(cmd, priority=priority, timeout=timeout)
+        self.cache.put(cmd, result)
+        if self.recorder is not None:
+            self.recorder.record(cmd, result, time.monotonic() - started)
+        return result
+
+    def submit_at(
+        self,
+        cmd: str,
+        timeout: float | None = None,
+        priority: Priority = Priority.NORMAL,
+    ) -> Future[str | None]:
+        future = self.scheduler.submit(cmd, priority=priority, timeout=timeout)
+        future.add_done_callback(
+            lambda f: self.cache.put(cmd, f.result()) if not f.cancelled() and f.exception() is None else None
+        )
+        return future
+
+    async def send_at_async(
+        self,
+        cmd: str,
+        timeout: float | None = None,
+        priority: Priority = Priority.NORMAL,
+        cached: bool = True,
+    ) -> str | None:
+        if cached:
+            hit = self.cache.get(cmd)
+            if hit is not None:
+                return hit
+        scheduler = self.scheduler
+        started = time.monotonic()
+        if isinstance(scheduler, AsyncATScheduler):
+            result = await scheduler.execute_async(cmd, priority=priority, timeout=timeout)
+        else:
+            try:
+                result = await asyncio.wrap_future(scheduler.submit(cmd, priority=priority, timeout=timeout))
+            except Exception as e:
+                logger.warning("Comando AT %s sin respuesta: %s", cmd, e or type(e).__name__)
+                result = None
+        self.cache.put(cmd, result)
+        if self.recorder is not None:
+            self.recorder.record(cmd, result, time.monotonic() - started)
+        return result
+
+    def _cached_responses(self, cmds: list[str]) -> dict[str, str | None]:
+        hits = {cmd: self.cache.get(cmd) for cmd in cmds}
+        return {cmd: response for cmd, response in hits.items() if response is not None}
+
+    def _cache_split(self, chunk: list[str], cmd: str, split: dict[str, str | None], retry: list[str]) -> None:
+        # Single commands and retries already went through send_at, which stored them.
+        for c in chunk:
+            if c != cmd and c not in retry:
+                self.cache.put(c, split[c])
+
+    def send_at_batch(
+        self,
+        cmds: list[str],
+        priority: Priority = Priority.NORMAL,
+        cached: bool = True,
+    ) -> dict[str, str | None]:
+        # cached=False skips reads only: scheduled polls always reach the modem and refresh the cache.
+        results = self._cached_responses(cmds) if cached else {}
+        for chunk, cmd, timeout in _batch_requests([c for c in cmds if c not in results]):
+            split, retry = _split_batch(chunk, self.send_at(cmd, timeout=timeout, priority=priority, cached=cached))
+            for failed in retry:
+                split[failed] = self.send_at(failed, priority=priority, cached=cached)
+            self._cache_split(chunk, cmd, split, retry)
+            results.update(split)
+        return results
+
+    async def send_at_batch_async(
+        self,
+        cmds: list[str],
+        priority: Priority = Priority.NORMAL,
+        cached: bool = True,
+    ) -> dict[str, str | None]:
+        results = self._cached_responses(cmds) if cached else {}
+        for chunk, cmd, timeout in _batch_requests([c for c in cmds if c not in results]):
+            raw = await self.send_at_async(cmd, timeout=timeout, priority=priority, cached=cached)
+            split, retry = _split_batch(chunk, raw)
+            for failed in retry:
+                split[failed] = await self.send_at_async(failed, priority=priority, cached=cached)
+            self._cache_split(chunk, cmd, split, retry)
+            results.update(split)
+        return results
+
+    def enable_urc(self, handler: Callable[[dict[str, Any]], None]) -> None:
+        def on_line(line: str) -> None:
+            self.cache.invalidate_urc(line)
+            if self.recorder is not None:
+                self.recorder.record_urc(line)
+            event = parse_urc(line)
+            if event is not None:
+                handler(event)
+            else:
+                logger.debug("URC ignorado: %s", line)
+
+        self.session.set_urc_handler(on_line, URC_PREFIXES, URC_ENABLE_COMMANDS)
+        self.scheduler.submit("AT")
+        logger.info("Reportes URC habilitados (%s)", self.name)
+
+    def disable_urc(self) -> None:
+        self.session.set_urc_handler(None)
+
+    def get_signal(self, priority: Priority = Priority.BACKGROUND) -> dict[str, Any]:
+        return _signal_from(self.send_at_batch(SIGNAL_COMMANDS, priority=priority))
+
+    def get_network_info(self, priority: Priority = Priority.BACKGROUND) -> dict[str, Any]:
+        return _network_from(self.send_at_batch(NETWORK_COMMANDS, priority=priority))
+
+    def get_modem_status(
+        self, priority: Priority = Priority.BACKGROUND
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        raw = self.send_at_batch(SIGNAL_COMMANDS + NETWORK_COMMANDS, priority=priority, cached=False)
+        return _signal_from(raw), _network_from(raw)
+
+    async def get_modem_info_async(self, priority: Priority = Priority.INTERACTIVE) -> dict[str, Any]:
+        raw = await self.send_at_batch_async(INFO_COMMANDS, priority=priority)
+        for cmd in PLAIN_INFO_COMMANDS:
+            raw[cmd] = await self.send_at_async(cmd, priority=priority)
+        return _info_from(raw)
+
+    def poll_groups(
+        self,
+        groups: list[str],
+        priority: Priority = Priority.BACKGROUND,
+    ) -> dict[str, dict[str, Any]]:
+        cmds = [cmd for group in groups for cmd in POLL_GROUPS[group]]
+        return _groups_from(groups, self.send_at_batch(cmds, priority=priority, cached=False))
+
+    async def poll_groups_async(
+        self,
+        groups: list[str],
+        priority: Priority = Priority.BACKGROUND,
+    ) -> dict[str, dict[str, Any]]:
+        cmds = [cmd for group in groups for cmd in POLL_GROUPS[group]]
+        return _groups_from(groups, await self.send_at_batch_async(cmds, priority=priority, cached=False))
+
+    async def get_cell_sample_async(self, priority: Priority = Priority.BACKGROUND) -> CellSample | None:
+        return parse_cell_sample(await self.send_at_batch_async(CELL_COMMANDS, priority=priority, cached=False))
+
+    def set_apn(self, apn: str) -> str | None:
+        return self.send_at(_apn_command(apn), priority=Priority.INTERACTIVE)
+
+    async def set_apn_async(self, apn: str) -> str | None:
+        return await self.send_at_async(_apn_command(apn), priority=Priority.INTERACTIVE)
+
+    def reset_modem(self) -> str | None:
+        result = self.send_at("AT+CFUN=1,1", priority=Priority.INTERACTIVE)
+        self.close()
+        return result
+
+    async def reset_modem_async(self) -> str | None:
+        result = await self.send_at_async("AT+CFUN=1,1", priority=Priority.INTERACTIVE)
+        self.close()
+        return result
+
+
+primary = ModemClient(find_at_port)
+presence = ModemPresence()
+
+
+def _on_presence_change(present: bool, port: str | None) -> None:
+    global _cached_port, _cache_time
+    if present:
+        changed = port != _cached_port
+        _cached_port = port
+        _cache_time = time.time()
+        if primary.session.is_open and primary.session.port != port:
+            primary.session.close()
+    else:
+        changed = True
+        _cached_port = None
+        primary.session.close()
+    if changed:
+        primary.cache.clear()
+
+
+presence.add_listener(_on_presence_change)
+
+
+def start_async_transport() -> None:
+    primary.start_async_transport()
+
+
+async def stop_async_transport() -> None:
+    await primary.stop_async_transport()
+
+
+def send_at(
+    cmd: str,
+    timeout: float | None = None,
+    priority: Priority = Priority.NORMAL,
+    cached: bool = True,
+) -> str | None:
+    return primary.send_at(cmd, timeout=timeout, priority=priority, cached=cached)
+
+
+def submit_at(
+    cmd: str,
+    timeout: float | None = None,
+    priority: Priority = Priority.NORMAL,
+) -> Future[str | None]:
+    return primary.submit_at(cmd, timeout=timeout, priority=priority)
+
+
+async def send_at_async(
+    cmd: str,
+    timeout: float | None = None,
+    priority: Priority = Priority.NORMAL,
+    cached: bool = True,
+) -> str | None:
+    return await primary.send_at_async(cmd, timeout=timeout, priority=priority, cached=cached)
+
+
+def send_at_batch(
+    cmds: list[str],
+    priority: Priority = Priority.NORMAL,
+    cached: bool = True,
+) -> dict[str, str | None]:
+    return primary.send_at_batch(cmds, priority=priority, cached=cached)
+
+
+async def send_at_batch_async(
+    cmds: list[str],
+    priority: Priority = Priority.NORMAL,
+    cached: bool = True,
+) -> dict[str, str | None]:
+    return await primary.send_at_batch_async(cmds, priority=priority, cached=cached)
+
+
+def enable_urc(handler: Callable[[dict[str, Any]], None]) -> None:
+    primary.enable_urc(handler)
+
+
+def disable_urc() -> None:
+    primary.disable_urc()
+
+
+def get_at_stats() -> dict[str, Any]:
+    return primary.scheduler.stats()
+
+
+def get_busy_reason() -> str | None:
+    return primary.busy
+
+
+def get_cache_stats() -> dict[str, Any]:
+    return primary.cache.stats()
+
+
+def configure_cache(ttls: dict[str, float | None]) -> None:
+    primary.cache.configure(ttls)
+
+
+def get_signal(priority: Priority = Priority.BACKGROUND) -> dict[str, Any]:
+    return primary.get_signal(priority)
+
+
+def get_network_info(priority: Priority = Priority.BACKGROUND) -> dict[str, Any]:
+    return primary.get_network_info(priority)
+
+
+def get_modem_status(priority: Priority = Priority.BACKGROUND) -> tuple[dict[str, Any], dict[str, Any]]:
+    return primary.get_modem_status(priority)
+
+
+async def get_modem_info_async(priority: Priority = Priority.INTERACTIVE) -> dict[str, Any]:
+    return await primary.get_modem_info_async(priority)
+
+
+def poll_groups(groups: list[str], priority: Priority = Priority.BACKGROUND) -> dict[str, dict[str, Any]]:
+    return primary.poll_groups(groups, priority)
+
+
+async def poll_groups_async(
+    groups: list[str],
+    priority: Priority = Priority.BACKGROUND,
+) -> dict[str, dict[str, Any]]:
+    return await primary.poll_groups_async(groups, priority)
+
+
 def set_apn(apn: str) -> str | None:
-    return send_at(f'AT+CGDCONT=1,"IPV4V6","{apn}"')
+    return primary.set_apn(apn)
+
+
+async def set_apn_async(apn: str) -> str | None:
+    return await primary.set_apn_async(apn)
 
 
 def reset_modem() -> str | None:
-    return send_at("AT+CFUN=1,1")
+    global _cached_port
+    result = primary.reset_modem()
+    _cached_port = None
+    return result
+
+
+async def reset_modem_async() -> str | None:
+    global _cached_port
+    result = await primary.reset_modem_async()
+    _cached_port = None
+    return result
 
 
 def is_ec25_detected() -> bool:
+    if _fixed_port:
+        return os.path.exists(_fixed_port)
+    if presence.running and presence.present:
+        return True
     port = find_at_port()
     return port is not None
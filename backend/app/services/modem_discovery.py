@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import queue
+import socket
+import threading
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+SYSFS_USB_DEVICES = "/sys/bus/usb/devices"
+
+# (idVendor, idProduct) -> interfaces that expose an AT port, in order of preference.
+# EC25/EG25: if00 DM, if01 NMEA, if02 AT, if03 modem (PPP, also answers AT).
+AT_INTERFACES: dict[tuple[str, str], tuple[int, ...]] = {
+    ("2c7c", "0125"): (2, 3),
+}
+
+
+def _read_attr(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read().strip().lower()
+    except OSError:
+        return None
+
+
+def _interface_tty(interface_dir: str) -> str | None:
+    ttys = glob.glob(os.path.join(interface_dir, "ttyUSB*")) or glob.glob(
+        os.path.join(interface_dir, "tty", "ttyUSB*")
+    )
+    if not ttys:
+        return None
+    return "/dev/" + os.path.basename(sorted(ttys)[0])
+
+
+def find_sysfs_modems(root: str = SYSFS_USB_DEVICES) -> dict[str, str]:
+    try:
+        entries = sorted(os.listdir(root))
+    except OSError:
+        return {}
+
+    modems: dict[str, str] = {}
+    for entry in entries:
+        if ":" in entry:
+            continue
+        device_dir = os.path.join(root, entry)
+        vid = _read_attr(os.path.join(device_dir, "idVendor"))
+        pid = _read_attr(os.path.join(device_dir, "idProduct"))
+        wanted = AT_INTERFACES.get((vid or "", pid or ""))
+        if not wanted:
+            continue
+
+        by_number: dict[int, str] = {}
+        for interface_dir in glob.glob(os.path.join(device_dir, f"{entry}:*")):
+            number = _read_attr(os.path.join(interface_dir, "bInterfaceNumber"))
+            if number is not None:
+                by_number[int(number, 16)] = interface_dir
+
+        for number in wanted:
+            interface_dir = by_number.get(number)
+            tty = _interface_tty(interface_dir) if interface_dir else None
+            if tty:
+                logger.debug("Modem %s:%s en %s -> %s", vid, pid, entry, tty)
+                modems[entry] = tty
+                break
+    return modems
+
+
+def tty_usb_device(port: str, sys_class_tty: str = "/sys/class/tty") -> str | None:
+    # /dev/ttyUSB3 -> .../1-1.2/1-1.2:1.3/ttyUSB3 -> "1-1.2", the key find_sysfs_modems uses.
+    # Any tty of the modem maps to the same device, whichever interface it belongs to.
+    path = os.path.realpath(os.path.join(sys_class_tty, os.path.basename(os.path.realpath(port)), "device"))
+    interfaces = [part for part in path.split(os.sep) if ":" in part]
+    return interfaces[-1].split(":")[0] if interfaces else None
+
+
+def find_sysfs_at_ports(root: str = SYSFS_USB_DEVICES) -> list[str]:
+    return list(find_sysfs_modems(root).values())
+
+
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+WATCHED_TTY_PREFIX = "ttyUSB"
+WATCHED_NET_INTERFACES = ("wwan0", "usb0")
+
+
+def parse_uevent(data: bytes) -> dict[str, str]:
+    fields = data.split(b"\0")
+    event: dict[str, str] = {}
+    header = fields[0].decode(errors="ignore")
+    if "@" in header:
+        event["ACTION"], event["DEVPATH"] = header.split("@", 1)
+    for field in fields[1:]:
+        key, sep, value = field.decode(errors="ignore").partition("=")
+        if sep:
+            event[key] = value
+    return event
+
+
+def is_modem_uevent(event: dict[str, str]) -> bool:
+    if event.get("ACTION") not in ("add", "remove"):
+        return False
+    subsystem = event.get("SUBSYSTEM")
+    if subsystem == "tty":
+        return event.get("DEVNAME", "").startswith(WATCHED_TTY_PREFIX)
+    if subsystem == "net":
+        return event.get("INTERFACE") in WATCHED_NET_INTERFACES
+    return False
+
+
+class NetlinkUeventSource:
+    def __init__(self, timeout: float = 1.0) -> None:
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        self._sock.bind((0, UEVENT_KERNEL_GROUP))
+        self._sock.settimeout(timeout)
+
+    def recv(self) -> bytes | None:
+        try:
+            return self._sock.recv(65536)
+        except socket.timeout:
+            return None
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class QueueUeventSource:
+    def __init__(self, timeout: float = 0.1) -> None:
+        self._queue: queue.Queue[bytes] = queue.Queue()
+        self._timeout = timeout
+
+    def emit(self, action: str, devpath: str, **fields: str) -> None:
+        payload = [f"{action}@{devpath}", f"ACTION={action}", f"DEVPATH={devpath}"]
+        payload += [f"{k}={v}" for k, v in fields.items()]
+        self._queue.put("\0".join(payload).encode() + b"\0")
+
+    def recv(self) -> bytes | None:
+        try:
+            return self._queue.get(timeout=self._timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        pass
+
+
+class ModemPresence:
+    def __init__(
+        self,
+        source_factory: Callable[[], Any] = NetlinkUeventSource,
+        resolver: Callable[[], list[str]] = find_sysfs_at_ports,
+    ) -> None:
+        self._source_factory = source_factory
+        self._resolver = resolver
+        self._listeners: list[Callable[[bool, str | None], None]] = []
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._port: str | None = None
+        self._ports: list[str] = []
+        self._events = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def present(self) -> bool:
+        return self._port is not None
+
+    @property
+    def port(self) -> str | None:
+        return self._port
+
+    @property
+    def ports(self) -> list[str]:
+        return list(self._ports)
+
+    def add_listener(self, callback: Callable[[bool, str | None], None]) -> None:
+        self._listeners.append(callback)
+
+    def start(self) -> bool:
+        if self.running:
+            return True
+        try:
+            source = self._source_factory()
+        except (OSError, AttributeError) as e:
+            logger.warning("Sin socket netlink de uevents (%s), usando cache por tiempo", e)
+            return False
+        self._running = True
+        self.rescan()
+        self._thread = threading.Thread(
+            target=self._worker, args=(source,), daemon=True, name="ModemHotplug"
+        )
+        self._thread.start()
+        logger.info("Watcher de hot-plug iniciado (puerto=%s)", self._port)
+        return True
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def rescan(self) -> None:
+        ports = self._resolver()
+        port = ports[0] if ports else None
+        with self._lock:
+            changed = ports != self._ports
+            if port != self._port:
+                logger.info("Modem %s (%s)", "conectado" if port else "desconectado", port or self._port)
+            self._port = port
+            self._ports = list(ports)
+        if changed:
+            for callback in list(self._listeners):
+                try:
+                    callback(port is not None, port)
+                except Exception as e:
+                    logger.error("Error notificando cambio de presencia: %s", e, exc_info=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "present": self.present,
+            "port": self._port,
+            "ports": list(self._ports),
+            "events": self._events,
+        }
+
+    def _worker(self, source: Any) -> None:
+        try:
+            while self._running:
+                data = source.recv()
+                if not data:
+                    continue
+                event = parse_uevent(data)
+                if not is_modem_uevent(event):
+                    continue
+                self._events += 1
+                logger.debug("uevent %s %s", event.get("ACTION"), event.get("DEVPATH"))
+                self.rescan()
+        finally:
+            source.close()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from ..config import settings
+from .ec25_monitor import ModemMonitor, build_intervals, monitor
+from .modem import ModemClient, presence, primary
+from .modem_discovery import find_sysfs_modems, tty_usb_device
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_ID = "primary"
+SECONDARY_LOCK_FILE = "/run/lock/ec25-at-{id}.lock"
+MAX_MODEMS = 4
+
+
+@dataclass
+class ModemEntry:
+    id: str
+    client: ModemClient
+    monitor: ModemMonitor
+    primary: bool = False
+
+    def summary(self) -> dict[str, Any]:
+        data = self.monitor.get_latest_data()
+        return {
+            "id": self.id,
+            "primary": self.primary,
+            "port": self.client.port,
+            "running": self.monitor.running,
+            "enabled": data["enabled"],
+            "detected": data["detected"],
+        }
+
+
+class ModemRegistry:
+    def __init__(
+        self,
+        discover: Callable[[], dict[str, str]] = find_sysfs_modems,
+        max_modems: int = MAX_MODEMS,
+        device_of: Callable[[str], str | None] = tty_usb_device,
+    ) -> None:
+        self._discover = discover
+        self._device_of = device_of
+        self._max_modems = max_modems
+        self._lock = threading.Lock()
+        self._primary = ModemEntry(PRIMARY_ID, primary, monitor, primary=True)
+        self._secondary: dict[str, ModemEntry] = {}
+        self._ports: dict[str, str] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._intervals: dict[str, float] | None = None
+        self._enabled = True
+        self._urc = False
+        self._cache_ttls: dict[str, float | None] = {}
+
+    def get(self, modem_id: str) -> ModemEntry | None:
+        if modem_id == PRIMARY_ID:
+            return self._primary
+        return self._secondary.get(modem_id)
+
+    def entries(self) -> list[ModemEntry]:
+        with self._lock:
+            return [self._primary, *self._secondary.values()]
+
+    def start(
+        self,
+        update_interval: float = 5.0,
+        enabled: bool = True,
+        urc: bool = False,
+        signal_interval: float | None = None,
+        slow_interval: float = 60.0,
+        cell_interval: float | None = None,
+        cache_ttls: dict[str, float | None] | None = None,
+    ) -> None:
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        self._intervals = build_intervals(update_interval, signal_interval, slow_interval, cell_interval)
+        self._enabled = enabled
+        self._urc = urc
+        self._cache_ttls = dict(cache_ttls or {})
+        self.sync()
+
+    async def stop(self) -> None:
+        self._intervals = None
+        with self._lock:
+            entries = list(self._secondary.values())
+            self._secondary.clear()
+            self._ports.clear()
+        for entry in entries:
+            await self._stop_entry(entry)
+
+    def sync(self) -> None:
+        if self._intervals is None:
+            return
+        modems = self._discover()
+        primary_device = self._primary_device(modems)
+        wanted = {mid: port for mid, port in modems.items() if mid != primary_device}
+        wanted = dict(list(wanted.items())[: self._max_modems - 1])
+
+        with self._lock:
+            removed = [self._secondary.pop(mid) for mid in list(self._secondary) if mid not in wanted]
+            moved = [mid for mid, port in wanted.items() if mid in self._ports and self._ports[mid] != port]
+            self._ports = wanted
+            added = []
+            for mid in wanted:
+                if mid not in self._secondary:
+                    self._secondary[mid] = self._create_entry(mid)
+                    added.append(self._secondary[mid])
+
+        for entry in removed:
+            logger.info("Modem %s retirado", entry.id)
+            self._call_on_loop(self._stop_entry, entry)
+        for mid in moved:
+            self._secondary[mid].client.session.close()
+        for entry in added:
+            logger.info("Modem %s detectado en %s", entry.id, wanted[entry.id])
+            self._call_on_loop(self._start_entry, entry)
+
+    def _primary_device(self, modems: dict[str, str]) -> str | None:
+        # Resolved, not read from the session: EC25_AT_PORT may pin another tty of the
+        # same modem, and the session has no port until the first command.
+        port = self._primary.client.find_at_port()
+        if port is None:
+            return next(iter(modems), None)
+        device = self._device_of(port)
+        if device is not None:
+            return device
+        real = os.path.realpath(port)
+        return next((mid for mid, tty in modems.items() if os.path.realpath(tty) == real), None)
+
+    def _create_entry(self, modem_id: str) -> ModemEntry:
+        client = ModemClient(
+            lambda force_refresh, mid=modem_id: self._ports.get(mid),
+            name=modem_id,
+            lock_file=SECONDARY_LOCK_FILE.format(id=modem_id),
+        )
+        client.cache.configure(self._cache_ttls)
+
+        def detector() -> bool:
+            return modem_id in self._ports
+
+        return ModemEntry(modem_id, client, ModemMonitor(client, detector, name=modem_id, cell_history=settings.EC25_CELL_HISTORY))
+
+    def _call_on_loop(self, fn: Callable[[ModemEntry], Any], entry: ModemEntry) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            result = fn(entry)
+            if asyncio.iscoroutine(result):
+                asyncio.run(result)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            result = fn(entry)
+            if asyncio.iscoroutine(result):
+                loop.create_task(result)
+        elif asyncio.iscoroutinefunction(fn):
+            asyncio.run_coroutine_threadsafe(fn(entry), loop)
+        else:
+            loop.call_soon_threadsafe(fn, entry)
+
+    def _start_entry(self, entry: ModemEntry) -> None:
+        assert self._intervals is not None
+        if self._loop is not None:
+            entry.client.start_async_transport()
+        entry.monitor.start(self._intervals, enabled=self._enabled, urc=self._urc)
+
+    async def _stop_entry(self, entry: ModemEntry) -> None:
+        if entry.monitor.running:
+            entry.monitor.stop()
+        await entry.client.stop_async_transport()
+        entry.client.close()
+
+
+registry = ModemRegistry()
+
+
+def _on_presence_change(present: bool, port: str | None) -> None:
+    registry.sync()
+
+
+presence.add_listener(_on_presence_change)
@@ -93,11 +93,23 @@ def get_active_wan() -> dict[str, str | bool]:
     return info
 
 
-def check_connectivity(host: str = "8.8.8.8", timeout: int = 2) -> bool:
-    rc, _, _ = run_command(["ping", "-c", "1", "-W", str(timeout), host])
+def check_connectivity(host: str = "8.8.8.8", timeout: int = 2, interface: str | None = None) -> bool:
+    cmd = ["ping", "-c", "1", "-W", str(timeout)]
+    if interface:
+        cmd += ["-I", interface]
+    rc, _, _ = run_command(cmd + [host])
     return rc == 0
 
 
+def egress_interface(host: str, source: str | None = None) -> str | None:
+    cmd = ["ip", "route", "get", host]
+    if source:
+        cmd += ["from", source]
+    rc, out, _ = run_command(cmd)
+    match = re.search(r"\bdev\s+(\S+)", out) if rc == 0 else None
+    return match.group(1) if match else None
+
+
 def get_ip_address(interface: str | None = None) -> str | None:
     cmd = ["ip", "-4", "addr", "show"]
     if interface:
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any
+
+from ..config import settings
+from .modem import primary
+from .scan_job import ScanJob
+
+logger = logging.getLogger(__name__)
+
+OPERATOR_SCAN_COMMAND = "AT+COPS=?"
+
+OPERATOR_STATUS = {"0": "unknown", "1": "available", "2": "current", "3": "forbidden"}
+ACT_NAMES = {"0": "GSM", "2": "UTRAN", "3": "GSM/EGPRS", "7": "LTE", "8": "LTE Cat-M", "9": "NB-IoT"}
+
+_COPS_ENTRY_RE = re.compile(r'\((\d),"([^"]*)","([^"]*)","([^"]*)",(\d+)\)')
+
+
+def parse_cops_scan(response: str | None) -> list[dict[str, Any]]:
+    if not response:
+        return []
+    return [
+        {
+            "status": OPERATOR_STATUS.get(stat, stat),
+            "long_name": long_name,
+            "short_name": short_name,
+            "numeric": numeric,
+            "act": ACT_NAMES.get(act, act),
+        }
+        for stat, long_name, short_name, numeric, act in _COPS_ENTRY_RE.findall(response)
+    ]
+
+
+class OperatorScanner(ScanJob):
+    kind = "operator_scan"
+    busy_reason = "escaneando operadores"
+    expected_duration = 120.0
+
+    def _empty(self) -> dict[str, Any]:
+        return {**super()._empty(), "operators": []}
+
+    def start(self) -> bool:
+        return self._launch(self._run)
+
+    async def _run(self) -> dict[str, Any]:
+        # Timeout comes from COMMAND_TIMEOUTS (180 s); cached=False so a stale list is never served.
+        response = await self.client.send_at_async(OPERATOR_SCAN_COMMAND, cached=False)
+        if response is None or not response.rstrip().endswith("OK"):
+            raise RuntimeError(f"{OPERATOR_SCAN_COMMAND} sin respuesta valida")
+        operators = parse_cops_scan(response)
+        logger.info("Escaneo de operadores (%s): %d encontrados", self.client.name, len(operators))
+        return {"operators": operators}
+
+
+operator_scanner = OperatorScanner(primary, cache_path=settings.data_dir / "operator_scan.json")
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Literal
+
+from ..config import settings
+from .at_scheduler import Priority
+from .data_call import data_call
+from .ec25_monitor import ModemMonitor, monitor
+from .modem import ModemClient, parse_reg_status, primary
+from .modem_discovery import WATCHED_NET_INTERFACES
+from .network import check_connectivity, get_ip_address
+
+logger = logging.getLogger(__name__)
+
+Failure = Literal["unresponsive", "unregistered", "detached", "no_data"]
+Step = Literal["reattach", "radio_cycle", "data_call", "full_reset"]
+Probe = Callable[[], Awaitable[bool]]
+
+STEPS: tuple[Step, ...] = ("reattach", "radio_cycle", "data_call", "full_reset")
+
+# Cheapest action that can fix each failure first, then escalate.
+LADDERS: dict[Failure, tuple[Step, ...]] = {
+    "detached": ("reattach", "radio_cycle", "data_call", "full_reset"),
+    "unregistered": ("reattach", "radio_cycle", "full_reset"),
+    "no_data": ("data_call", "reattach", "radio_cycle", "full_reset"),
+    "unresponsive": ("full_reset",),
+}
+
+# Upper bound for each step to show results; verification returns as soon as the link is back.
+SETTLE_TIMEOUTS: dict[Step, float] = {
+    "reattach": 15.0,
+    "radio_cycle": 30.0,
+    "data_call": 20.0,
+    "full_reset": 90.0,
+}
+RESET_GRACE = 5.0
+VERIFY_POLL = 1.0
+
+CHECK_INTERVAL = 10.0
+FAILURE_CHECKS = 2
+BACKOFF_BASE = 30.0
+BACKOFF_MAX = 900.0
+LOG_SIZE = 200
+
+# Touched on every check so scripts/watchdog.sh leaves the modem alone while we run.
+# /run/lock is writable by the unprivileged service user, unlike /run itself.
+HEARTBEAT_FILE = "/run/lock/ec25-recovery.heartbeat"
+
+REGISTERED = ("Registrado", "Roaming")
+UNRECOVERABLE_SIM = ("PIN requerido", "PUK requerido", "No insertada")
+
+_CGATT_RE = re.compile(r"\+CGATT:\s*(\d)")
+
+
+def parse_cgatt(response: str | None) -> bool | None:
+    if not response:
+        return None
+    match = _CGATT_RE.search(response)
+    return match.group(1) == "1" if match else None
+
+
+def interface_probe(interfaces: tuple[str, ...] = WATCHED_NET_INTERFACES, host: str = "8.8.8.8") -> Probe:
+    def ping() -> bool:
+        return any(
+            get_ip_address(iface) is not None and check_connectivity(host, timeout=2, interface=iface)
+            for iface in interfaces
+        )
+
+    async def probe() -> bool:
+        return await asyncio.to_thread(ping)
+
+    return probe
+
+
+def _step_stats() -> dict[str, dict[str, Any]]:
+    return {step: {"attempts": 0, "successes": 0, "total_s": 0.0} for step in STEPS}
+
+
+class RecoveryController:
+    def __init__(
+        self,
+        client: ModemClient,
+        monitor: ModemMonitor,
+        connectivity: Probe | None = None,
+        data_call: Callable[[], Awaitable[bool]] | None = None,
+        log_path: Path | None = None,
+        heartbeat_path: str | None = HEARTBEAT_FILE,
+        settle: dict[Step, float] | None = None,
+        check_interval: float = CHECK_INTERVAL,
+        failure_checks: int = FAILURE_CHECKS,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        reset_grace: float = RESET_GRACE,
+    ) -> None:
+        self.client = client
+        self.monitor = monitor
+        self.connectivity = connectivity
+        self.data_call = data_call
+        self._log_path = log_path
+        self._heartbeat_path = heartbeat_path
+        self._heartbeat_failed = False
+        self._settle = {**SETTLE_TIMEOUTS, **(settle or {})}
+        self._check_interval = check_interval
+        self._failure_checks = failure_checks
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._reset_grace = reset_grace
+        self._task: asyncio.Task[None] | None = None
+        self._log: deque[dict[str, Any]] = deque(maxlen=LOG_SIZE)
+        self._suspect = 0
+        self._failed_episodes = 0
+        self._next_attempt = 0.0
+        self.state: Literal["idle", "watching", "recovering", "backoff"] = "idle"
+        self.counters: dict[str, Any] = {
+            "episodes": 0,
+            "recovered": 0,
+            "failed": 0,
+            "steps": _step_stats(),
+        }
+        self.last_episode: dict[str, Any] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.state = "watching"
+        self._task = asyncio.get_running_loop().create_task(self._watch(), name=f"recovery-{self.client.name}")
+        logger.info("Recuperacion automatica iniciada (%s)", self.client.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.state = "idle"
+
+    def status(self) -> dict[str, Any]:
+        backoff = max(0.0, self._next_attempt - time.monotonic())
+        return {
+            "state": self.state,
+            "running": self.running,
+            "backoff_s": round(backoff, 1) if backoff else None,
+            "counters": {**self.counters, "steps": {k: dict(v) for k, v in self.counters["steps"].items()}},
+            "last_episode": self.last_episode,
+        }
+
+    def log(self, limit: int | None = None) -> list[dict[str, Any]]:
+        entries = list(self._log)
+        return entries[-limit:] if limit else entries
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                self._heartbeat()
+                self._suspect = self._suspect + 1 if await self._suspected_failure() else 0
+                if self._suspect >= self._failure_checks and time.monotonic() >= self._next_attempt:
+                    failure = await self.diagnose()
+                    if failure is not None:
+                        await self.recover(failure)
+                    self._suspect = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error en recuperacion (%s): %s", self.client.name, e, exc_info=True)
+            await asyncio.sleep(self._check_interval)
+
+    async def _suspected_failure(self) -> bool:
+        # Cheap check on what the monitor already polls; AT probing only once it looks bad.
+        data = self.monitor.get_latest_data()
+        if not data.get("enabled") or not data.get("detected") or data.get("busy"):
+            return False
+        network = data["network"]
+        if network.get("sim") in UNRECOVERABLE_SIM:
+            return False
+        registration = network.get("registration")
+        if registration != "N/A" and registration not in REGISTERED:
+            return True
+        if self.connectivity is not None:
+            return not await self.connectivity()
+        return False
+
+    async def diagnose(self) -> Failure | None:
+        if await self._send("AT") is None:
+            return "unresponsive"
+        registration = parse_reg_status(await self._send("AT+CEREG?")) or parse_reg_status(
+            await self._send("AT+CREG?")
+        )
+        if registration not in REGISTERED:
+            return "unregistered"
+        if parse_cgatt(await self._send("AT+CGATT?")) is False:
+            return "detached"
+        if self.connectivity is not None and not await self.connectivity():
+            return "no_data"
+        return None
+
+    async def recover(self, failure: Failure) -> bool:
+        self.state = "recovering"
+        started = time.monotonic()
+        episode = {"failure": failure, "started_at": time.time(), "steps": [], "recovered": False, "duration_s": None}
+        self.counters["episodes"] += 1
+        logger.warning("Falla de modem detectada (%s): %s, iniciando recuperacion", self.client.name, failure)
+
+        try:
+            with self.client.busy_for("recuperando modem"):
+                for step in LADDERS[failure]:
+                    ok = await self._run_step(step, failure)
+                    episode["steps"].append(step)
+                    if ok:
+                        episode["recovered"] = True
+                        break
+        finally:
+            episode["duration_s"] = round(time.monotonic() - started, 1)
+            self.last_episode = episode
+            self.monitor.refresh_groups()
+
+        if episode["recovered"]:
+            self.counters["recovered"] += 1
+            self._failed_episodes = 0
+            self._next_attempt = 0.0
+            self.state = "watching"
+            logger.info(
+                "Modem recuperado (%s) con %s en %.1fs", self.client.name, episode["steps"][-1], episode["duration_s"]
+            )
+        else:
+            self.counters["failed"] += 1
+            self._failed_episodes += 1
+            delay = min(self._backoff_base * 2 ** (self._failed_episodes - 1), self._backoff_max)
+            self._next_attempt = time.monotonic() + delay
+            self.state = "backoff"
+            logger.error(
+                "Recuperacion fallida (%s) tras %s, reintento en %.0fs",
+                self.client.name,
+                ",".join(episode["steps"]),
+                delay,
+            )
+        return episode["recovered"]
+
+    async def _run_step(self, step: Step, failure: Failure) -> bool:
+        stats = self.counters["steps"][step]
+        stats["attempts"] += 1
+        started = time.monotonic()
+        detail = None
+        ok = False
+        try:
+            ok = await self._act(step)
+            if not ok:
+                detail = "comando rechazado"
+            else:
+                ok = await self._verify(step)
+                if not ok:
+                    detail = await self.diagnose()
+        except Exception as e:
+            logger.error("Paso de recuperacion %s fallo (%s): %s", step, self.client.name, e)
+            detail = str(e)
+        elapsed = time.monotonic() - started
+        stats["total_s"] = round(stats["total_s"] + elapsed, 1)
+        if ok:
+            stats["successes"] += 1
+        self._record({
+            "t": round(time.time(), 3),
+            "modem": self.client.name,
+            "failure": failure,
+            "step": step,
+            "ok": ok,
+            "duration_s": round(elapsed, 2),
+            "detail": detail,
+        })
+        return ok
+
+    async def _act(self, step: Step) -> bool:
+        if step == "reattach":
+            await self._send("AT+CGATT=0")
+            return _ok(await self._send("AT+CGATT=1"))
+        if step == "radio_cycle":
+            await self._send("AT+CFUN=0")
+            return _ok(await self._send("AT+CFUN=1"))
+        if step == "data_call":
+            if self.data_call is not None:
+                return await self.data_call()
+            await self._send("AT+CGACT=0,1")
+            return _ok(await self._send("AT+CGACT=1,1"))
+        await self.client.reset_modem_async()
+        # The USB device drops and re-enumerates: nothing answers during the first seconds.
+        await asyncio.sleep(self._reset_grace)
+        return True
+
+    async def _verify(self, step: Step) -> bool:
+        deadline = time.monotonic() + self._settle[step]
+        while True:
+            self._heartbeat()
+            if await self.diagnose() is None:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(VERIFY_POLL)
+
+    async def _send(self, cmd: str) -> str | None:
+        return await self.client.send_at_async(cmd, priority=Priority.INTERACTIVE, cached=False)
+
+    def _record(self, entry: dict[str, Any]) -> None:
+        self._log.append(entry)
+        logger.info("Paso de recuperacion (%s): %s", self.client.name, entry)
+        if self._log_path is None:
+            return
+        try:
+            self._log_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._log_path.open("a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning("No se pudo guardar el registro de recuperacion (%s): %s", self._log_path, e)
+
+    def _heartbeat(self) -> None:
+        if self._heartbeat_path is None:
+            return
+        try:
+            with open(self._heartbeat_path, "a"):
+                os.utime(self._heartbeat_path)
+        except OSError as e:
+            # Without the heartbeat watchdog.sh keeps resetting the modem behind our back.
+            if not self._heartbeat_failed:
+                logger.warning("No se pudo escribir el latido de recuperacion (%s): %s", self._heartbeat_path, e)
+                self._heartbeat_failed = True
+        else:
+            self._heartbeat_failed = False
+
+
+def _ok(response: str | None) -> bool:
+    return response is not None and response.rstrip().endswith("OK")
+
+
+recovery = RecoveryController(
+    primary,
+    monitor,
+    connectivity=interface_probe(),
+    heartbeat_path=settings.EC25_RECOVERY_HEARTBEAT,
+    data_call=data_call.restart,
+    log_path=settings.data_dir / "recovery.jsonl",
+)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from .modem import ModemClient
+
+logger = logging.getLogger(__name__)
+
+
+class ScanJob:
+    kind = "scan"
+    busy_reason = "escaneando"
+    expected_duration = 60.0
+
+    def __init__(self, client: ModemClient, cache_path: Path | None = None) -> None:
+        self.client = client
+        self._cache_path = cache_path
+        self._task: asyncio.Task[None] | None = None
+        self._result = self._load()
+        self._expected = self._result.get("elapsed") or self.expected_duration
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def result(self) -> dict[str, Any]:
+        result = dict(self._result)
+        if result["state"] == "running" and result["started_at"] is not None:
+            elapsed = time.time() - result["started_at"]
+            result["elapsed"] = round(elapsed, 1)
+            # No AT progress reporting exists: estimate from the last run's duration.
+            result["progress"] = round(min(0.99, elapsed / self._expected), 3)
+        return result
+
+    async def wait(self) -> dict[str, Any]:
+        if self._task is not None:
+            await asyncio.shield(self._task)
+        return self.result()
+
+    async def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _empty(self) -> dict[str, Any]:
+        return {
+            "state": "idle",
+            "started_at": None,
+            "finished_at": None,
+            "elapsed": None,
+            "progress": None,
+            "error": None,
+        }
+
+    def _launch(self, job: Callable[[], Awaitable[dict[str, Any]]], **fields: Any) -> bool:
+        if self.running:
+            return False
+        if self._result.get("state") == "done" and self._result.get("elapsed"):
+            self._expected = self._result["elapsed"]
+        self._result = {**self._empty(), **fields, "state": "running", "started_at": time.time()}
+        self._task = asyncio.get_running_loop().create_task(
+            self._execute(job()), name=f"{self.kind}-{self.client.name}"
+        )
+        return True
+
+    async def _execute(self, job: Awaitable[dict[str, Any]]) -> None:
+        logger.info("Trabajo %s iniciado (%s)", self.kind, self.client.name)
+        try:
+            with self.client.busy_for(self.busy_reason):
+                self._result.update(await job, state="done")
+            logger.info("Trabajo %s terminado (%s)", self.kind, self.client.name)
+        except asyncio.CancelledError:
+            self._result.update(state="failed", error="cancelado")
+            raise
+        except Exception as e:
+            logger.error("Error en trabajo %s (%s): %s", self.kind, self.client.name, e, exc_info=True)
+            self._result.update(state="failed", error=str(e))
+        finally:
+            self._result["finished_at"] = time.time()
+            self._result["elapsed"] = round(self._result["finished_at"] - self._result["started_at"], 1)
+            self._result["progress"] = 1.0 if self._result["state"] == "done" else None
+            self._save()
+
+    def _load(self) -> dict[str, Any]:
+        if self._cache_path is None or not self._cache_path.exists():
+            return self._empty()
+        try:
+            result = {**self._empty(), **json.loads(self._cache_path.read_text())}
+        except (OSError, ValueError) as e:
+            logger.warning("Cache de %s ilegible (%s): %s", self.kind, self._cache_path, e)
+            return self._empty()
+        if result["state"] == "running":
+            result["state"] = "failed"
+            result["error"] = "interrumpido"
+        return result
+
+    def _save(self) -> None:
+        if self._cache_path is None:
+            return
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._cache_path.write_text(json.dumps(self._result))
+        except OSError as e:
+            logger.warning("No se pudo guardar %s (%s): %s", self.kind, self._cache_path, e)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from ..app.services import modem
+from ..app.services.at_scheduler import Priority
+from ..app.services.ec25_simulator import EC25Simulator
+
+BENCH_COMMANDS = ["AT", "AT+CSQ", "AT+QCSQ", "AT+COPS?", "AT+QNWINFO", "AT+CEREG?", "AT+CPIN?"]
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: list[float]) -> dict[str, Any]:
+    ms = [s * 1000 for s in samples]
+    summary: dict[str, Any] = {f"p{p}_ms": round(percentile(ms, p), 3) for p in PERCENTILES}
+    summary.update(
+        count=len(ms),
+        mean_ms=round(sum(ms) / len(ms), 3) if ms else 0.0,
+        max_ms=round(max(ms), 3) if ms else 0.0,
+    )
+    return summary
+
+
+def _timed(fn: Callable[[], Any], iterations: int) -> tuple[list[float], int]:
+    samples: list[float] = []
+    failures = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+        if not result:
+            failures += 1
+    return samples, failures
+
+
+def bench_commands(iterations: int) -> dict[str, Any]:
+    results = {}
+    for cmd in BENCH_COMMANDS:
+        samples, failures = _timed(lambda: modem.send_at(cmd, cached=False), iterations)
+        results[cmd] = {**summarize(samples), "failures": failures}
+    return results
+
+
+def _cycle() -> bool:
+    signal = modem.get_signal()
+    network = modem.get_network_info()
+    return bool(signal.get("csq")) and bool(network.get("operator"))
+
+
+def bench_cycle(iterations: int) -> dict[str, Any]:
+    samples, failures = _timed(_cycle, iterations)
+    return {**summarize(samples), "failures": failures}
+
+
+def bench_poll_rate(duration: float) -> dict[str, Any]:
+    cycles = 0
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        _cycle()
+        cycles += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "duration_s": round(elapsed, 3),
+        "cycles": cycles,
+        "cycles_per_s": round(cycles / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def bench_concurrency(callers: int, iterations: int) -> dict[str, Any]:
+    per_priority: dict[str, list[float]] = {p.name.lower(): [] for p in Priority}
+    failures = 0
+    lock = threading.Lock()
+    barrier = threading.Barrier(callers)
+
+    def caller(index: int) -> None:
+        nonlocal failures
+        priority = list(Priority)[index % len(Priority)]
+        cmd = BENCH_COMMANDS[index % len(BENCH_COMMANDS)]
+        samples, failed = [], 0
+        barrier.wait()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            if not modem.send_at(cmd, priority=priority, cached=False):
+                failed += 1
+            samples.append(time.perf_counter() - start)
+        with lock:
+            per_priority[priority.name.lower()].extend(samples)
+            failures += failed
+
+    before = modem.get_at_stats()
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    after = modem.get_at_stats()
+
+    total = callers * iterations
+    return {
+        "callers": callers,
+        "commands": total,
+        "failures": failures,
+        "duration_s": round(elapsed, 3),
+        "commands_per_s": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency": {name: summarize(s) for name, s in per_priority.items() if s},
+        "max_queue_depth": after["max_queue_depth"],
+        "rejected": after["rejected"] - before["rejected"],
+        "expired": after["expired"] - before["expired"],
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(
+    iterations: int = 200,
+    duration: float = 5.0,
+    callers: int = 8,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+) -> dict[str, Any]:
+    with EC25Simulator(latency=latency, jitter=jitter, seed=0) as sim:
+        modem.configure_port(sim.port)
+        try:
+            modem.send_at("AT")
+            return {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "params": {
+                    "iterations": iterations,
+                    "duration_s": duration,
+                    "callers": callers,
+                    "latency_s": latency,
+                    "jitter_s": jitter,
+                },
+                "commands": bench_commands(iterations),
+                "cycle": bench_cycle(iterations),
+                "poll_rate": bench_poll_rate(duration),
+                "concurrency": bench_concurrency(callers, max(1, iterations // callers)),
+                "cache": {k: v for k, v in modem.get_cache_stats().items() if k != "entries"},
+            }
+        finally:
+            modem.configure_port(None)
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[str]:
+    regressions = []
+    pairs = [(f"commands.{cmd}", baseline["commands"].get(cmd), stats)
+             for cmd, stats in current["commands"].items()]
+    pairs.append(("cycle", baseline.get("cycle"), current["cycle"]))
+    for name, old, new in pairs:
+        if not old or not old.get("p95_ms"):
+            continue
+        ratio = new["p95_ms"] / old["p95_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: p95 {old['p95_ms']:.3f}ms -> {new['p95_ms']:.3f}ms (x{ratio:.2f})")
+
+    old_rate = baseline.get("poll_rate", {}).get("cycles_per_s")
+    new_rate = current["poll_rate"]["cycles_per_s"]
+    if old_rate and new_rate < old_rate * (1 - threshold):
+        regressions.append(f"poll_rate: {old_rate:.2f}/s -> {new_rate:.2f}/s")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la capa AT contra el simulador EC25")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0, help="segundos para medir la tasa de polling")
+    parser.add_argument("--callers", type=int, default=8, help="hilos concurrentes")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia simulada del modem (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="jitter simulado del modem (s)")
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--baseline", help="JSON previo contra el que comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regresion tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    result = run(args.iterations, args.duration, args.callers, args.latency, args.jitter)
+
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("params") != result["params"]:
+            print("AVISO: parametros distintos a los de la linea base", file=sys.stderr)
+        regressions = compare(baseline, result, args.threshold)
+        for line in regressions:
+            print(f"REGRESION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
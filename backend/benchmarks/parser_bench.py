@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from ..app.services import at_transcript
+from ..app.services.modem import parse_urc
+from .at_bench import _git_commit
+
+DEFAULT_TRANSCRIPT = Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "ec25_lte.jsonl"
+LEGACY_PARSERS = {
+    "AT+CSQ": "parse_csq",
+    "AT+QCSQ": "parse_qcsq",
+    "AT+COPS?": "parse_cops",
+    "AT+QNWINFO": "parse_qnwinfo",
+    "AT+CREG?": "parse_reg_status",
+    "AT+CEREG?": "parse_reg_status",
+    "AT+CPIN?": "parse_cpin",
+    "AT+QCAINFO": "parse_qcainfo",
+}
+
+Parser = Callable[[Any], Any]
+
+
+def load_samples(path: str | Path) -> dict[str, list[str]]:
+    entries = at_transcript.load_transcript(str(path))
+    samples: dict[str, list[str]] = {}
+    for cmd, response in at_transcript.expand_entries(entries):
+        if response:
+            samples.setdefault(cmd, []).append(response)
+    urcs = [e.urc for e in entries if e.urc is not None]
+    if urcs:
+        samples["URC"] = urcs
+    return samples
+
+
+def backend_parsers() -> dict[str, Parser]:
+    return {**at_transcript.PARSERS, "URC": parse_urc}
+
+
+def legacy_parsers() -> dict[str, Parser]:
+    # The Flask tree lives next to backend/; only reachable when run from the repo root.
+    try:
+        legacy = importlib.import_module("app.modem")
+    except ImportError:
+        return {}
+    return {cmd: getattr(legacy, name) for cmd, name in LEGACY_PARSERS.items()}
+
+
+def bench_parser(parser: Parser, samples: list[str], min_time: float) -> dict[str, Any]:
+    calls = 0
+    rounds = 1
+    start = time.perf_counter()
+    while True:
+        for _ in range(rounds):
+            for sample in samples:
+                parser(sample)
+        calls += rounds * len(samples)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        rounds *= 2
+
+    # Second pass under tracemalloc: results are kept alive so their blocks stay counted.
+    kept = []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    for sample in samples:
+        kept.append(parser(sample))
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+
+    return {
+        "samples": len(samples),
+        "calls": calls,
+        "ns_per_call": round(elapsed / calls * 1e9, 1),
+        "calls_per_s": round(calls / elapsed, 1),
+        "blocks_per_call": round(blocks / len(samples), 2),
+        "peak_bytes": peak,
+    }
+
+
+def bench_suite(parsers: dict[str, Parser], samples: dict[str, list[str]], min_time: float) -> dict[str, Any]:
+    return {
+        cmd: bench_parser(parser, samples[cmd], min_time)
+        for cmd, parser in parsers.items()
+        if samples.get(cmd)
+    }
+
+
+def run(transcript: str | Path = DEFAULT_TRANSCRIPT, min_time: float = 0.2) -> dict[str, Any]:
+    samples = load_samples(transcript)
+    suites = {"backend": bench_suite(backend_parsers(), samples, min_time)}
+    legacy = legacy_parsers()
+    if legacy:
+        suites["legacy"] = bench_suite(legacy, samples, min_time)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "params": {"transcript": Path(transcript).name, "min_time_s": min_time},
+        "parsers": suites,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[str]:
+    regressions = []
+    for suite, parsers in current["parsers"].items():
+        for cmd, new in parsers.items():
+            old = baseline.get("parsers", {}).get(suite, {}).get(cmd)
+            if not old:
+                continue
+            name = f"{suite}.{cmd}"
+            if old.get("ns_per_call") and new["ns_per_call"] > old["ns_per_call"] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {old['ns_per_call']:.0f}ns -> {new['ns_per_call']:.0f}ns por llamada"
+                )
+            if new["blocks_per_call"] > old.get("blocks_per_call", 0) * (1 + threshold) + 0.5:
+                regressions.append(
+                    f"{name}: {old.get('blocks_per_call')} -> {new['blocks_per_call']} bloques por llamada"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de los parsers AT sobre una transcripcion grabada")
+    parser.add_argument("--transcript", default=str(DEFAULT_TRANSCRIPT), help="transcripcion JSONL a reproducir")
+    parser.add_argument("--min-time", type=float, default=0.2, help="segundos minimos por parser")
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--baseline", help="JSON previo contra el que comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regresion tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    result = run(args.transcript, args.min_time)
+
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, result, args.threshold)
+        for line in regressions:
+            print(f"REGRESION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
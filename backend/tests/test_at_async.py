@@ -0,0 +1,170 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.app.services import modem
+from backend.app.services.at_async import AsyncATScheduler, AsyncATSession
+from backend.app.services.at_scheduler import Priority
+from backend.app.services.ec25_simulator import EC25Simulator
+
+
+@pytest.fixture
+def simulator():
+    with EC25Simulator() as sim:
+        yield sim
+
+
+def test_session_reads_responses_and_urcs_from_the_event_loop(simulator):
+    async def scenario():
+        urcs: list[str] = []
+        session = AsyncATSession(lambda force_refresh: simulator.port)
+        session.set_urc_handler(urcs.append, ("+CEREG:",))
+        try:
+            response = await session.command("AT+CEREG?")
+            simulator.emit_urc('+CEREG: 1,"1A2B","01A2D101",7')
+            for _ in range(100):
+                if urcs:
+                    break
+                await asyncio.sleep(0.01)
+            return response, urcs
+        finally:
+            session.close()
+
+    response, urcs = asyncio.run(scenario())
+
+    assert response == "AT+CEREG?\r\n+CEREG: 0,1\r\nOK\r\n"
+    assert urcs == ['+CEREG: 1,"1A2B","01A2D101",7']
+
+
+def test_slow_command_does_not_stall_the_event_loop(simulator):
+    simulator.latency = 0.3
+
+    async def scenario():
+        session = AsyncATSession(lambda force_refresh: simulator.port)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            response = await session.command("AT+COPS?")
+        finally:
+            task.cancel()
+            session.close()
+        return response, ticks
+
+    response, ticks = asyncio.run(scenario())
+
+    assert "Movistar" in response
+    assert ticks >= 15
+
+
+def test_scheduler_serves_loop_and_thread_callers_by_priority(simulator):
+    async def scenario():
+        session = AsyncATSession(lambda force_refresh: simulator.port)
+        scheduler = AsyncATScheduler(session, lock_file=None)
+        scheduler.start()
+        try:
+            futures = [
+                scheduler.submit("AT+CSQ", priority=Priority.BACKGROUND),
+                scheduler.submit("AT+COPS?", priority=Priority.BACKGROUND),
+                scheduler.submit("AT+CPIN?", priority=Priority.INTERACTIVE),
+            ]
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+
+            from_thread: list[str | None] = []
+            thread = threading.Thread(target=lambda: from_thread.append(scheduler.execute("AT+QGMR")))
+            thread.start()
+            await asyncio.to_thread(thread.join)
+
+            with pytest.raises(RuntimeError):
+                scheduler.execute("AT")
+            return from_thread, scheduler.stats()
+        finally:
+            await scheduler.stop()
+
+    from_thread, stats = asyncio.run(scenario())
+
+    assert simulator.received[:3] == ["AT+CPIN?", "AT+CSQ", "AT+COPS?"]
+    assert "EC25EFAR06A06M4G" in from_thread[0]
+    assert stats["completed"] == 4
+    assert stats["queue_depth"] == 0
+
+
+def test_async_queue_depth_is_bounded(simulator):
+    async def scenario():
+        session = AsyncATSession(lambda force_refresh: simulator.port)
+        scheduler = AsyncATScheduler(session, max_depth=2, lock_file=None)
+        # Before start(): jobs wait in the backlog and count towards the limit.
+        backlog = [scheduler.submit("AT+CSQ") for _ in range(5)]
+        scheduler.start()
+        try:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in backlog))
+            # Submits from another thread while the loop is blocked: queued in transit, still bounded.
+            from_thread: list = []
+            thread = threading.Thread(target=lambda: from_thread.extend(scheduler.submit("AT") for _ in range(5)))
+            thread.start()
+            thread.join()
+            depth = scheduler.stats()["queue_depth"]
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in from_thread))
+            return [f.result() for f in backlog], depth, scheduler.stats()
+        finally:
+            await scheduler.stop()
+
+    backlog, depth, stats = asyncio.run(scenario())
+
+    assert [r is not None for r in backlog] == [True, True, False, False, False]
+    assert depth == 2
+    assert stats["rejected"] == 6
+    assert stats["max_queue_depth"] == 2
+    assert stats["queue_depth"] == 0
+
+
+def test_modem_layer_polls_through_async_transport(simulator):
+    async def scenario():
+        modem.configure_port(simulator.port)
+        modem.start_async_transport()
+        try:
+            return await modem.poll_groups_async(["signal", "operator"]), await modem.set_apn_async("internet")
+        finally:
+            await modem.stop_async_transport()
+            modem.configure_port(None)
+
+    data, apn = asyncio.run(scenario())
+
+    assert data["signal"]["csq"].startswith("20/31")
+    assert data["signal"]["ca"]["bands"] == ["LTE BAND 2", "LTE BAND 28"]
+    assert data["network"]["operator"].startswith("Movistar")
+    assert apn.rstrip().endswith("OK")
+    assert isinstance(modem.primary.scheduler, modem.ATScheduler)
+
+
+def test_static_queries_are_served_from_cache_until_invalidated(simulator):
+    async def scenario():
+        modem.configure_port(simulator.port)
+        modem.start_async_transport()
+        try:
+            first = await modem.get_modem_info_async()
+            sent = len(simulator.received)
+            second = await modem.get_modem_info_async()
+            cached_sends = len(simulator.received) - sent
+            await modem.set_apn_async("apn.test")
+            await modem.get_modem_info_async()
+            return first, second, cached_sends, simulator.received[-1:], modem.get_cache_stats()
+        finally:
+            await modem.stop_async_transport()
+            modem.configure_port(None)
+
+    first, second, cached_sends, last, stats = asyncio.run(scenario())
+
+    assert first == second
+    assert first["imei"] == "866758041234567"
+    assert first["pdp_contexts"][0]["apn"] == "internet"
+    assert cached_sends == 0
+    assert last == ["AT+CGDCONT?"]
+    assert stats["hits"] >= 4
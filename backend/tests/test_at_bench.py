@@ -0,0 +1,30 @@
+import json
+
+from backend.benchmarks import at_bench
+
+
+def test_percentile_interpolates_between_samples():
+    samples = [float(i) for i in range(1, 101)]
+
+    assert at_bench.percentile(samples, 50) == 50.5
+    assert at_bench.percentile(samples, 99) == 99.01
+    assert at_bench.percentile([], 95) == 0.0
+
+
+def test_benchmark_emits_json_report_and_flags_regressions(tmp_path):
+    output = tmp_path / "bench.json"
+    assert at_bench.main([
+        "--iterations", "8", "--duration", "0.2", "--callers", "4", "--output", str(output),
+    ]) == 0
+
+    report = json.loads(output.read_text())
+    assert set(report["commands"]) == set(at_bench.BENCH_COMMANDS)
+    assert report["commands"]["AT+CSQ"]["failures"] == 0
+    assert {"p50_ms", "p95_ms", "p99_ms"} <= set(report["cycle"])
+    assert report["poll_rate"]["cycles"] > 0
+    assert report["concurrency"]["failures"] == 0
+
+    faster = json.loads(output.read_text())
+    faster["cycle"]["p95_ms"] = report["cycle"]["p95_ms"] / 10
+    assert at_bench.compare(faster, report, threshold=0.2)[0].startswith("cycle:")
+    assert at_bench.compare(report, report, threshold=0.2) == []
@@ -0,0 +1,65 @@
+from backend.app.services.at_cache import ATResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+    cache = ATResponseCache({"AT+COPS?": 30.0, "AT+GSN": None}, clock=clock)
+    cache.put("AT+COPS?", '+COPS: 0,0,"Movistar",7\r\nOK\r\n')
+    cache.put("AT+GSN", "866758041234567\r\nOK\r\n")
+
+    clock.now = 29.0
+    assert cache.get("AT+COPS?").startswith("+COPS:")
+    clock.now = 31.0
+    assert cache.get("AT+COPS?") is None
+    assert cache.get("AT+GSN").startswith("866758")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["entries"] == {"AT+GSN": None}
+
+
+def test_only_successful_and_qualifying_responses_are_stored():
+    cache = ATResponseCache({"AT+CPIN?": None, "AT+COPS?": 30.0})
+    cache.put("AT+CPIN?", "+CPIN: SIM PIN\r\nOK\r\n")
+    cache.put("AT+COPS?", "ERROR\r\n")
+    cache.put("AT+CSQ", "+CSQ: 20,99\r\nOK\r\n")
+
+    assert cache.get("AT+CPIN?") is None
+    assert cache.get("AT+COPS?") is None
+    assert cache.get("AT+CSQ") is None
+    assert cache.stats()["misses"] == 2
+
+    cache.put("AT+CPIN?", "+CPIN: READY\r\nOK\r\n")
+    assert cache.get("AT+CPIN?") == "+CPIN: READY\r\nOK\r\n"
+
+
+def test_urcs_and_set_commands_invalidate_related_queries():
+    cache = ATResponseCache()
+    for cmd, response in {
+        "AT+CPIN?": "+CPIN: READY\r\nOK\r\n",
+        "AT+COPS?": '+COPS: 0,0,"Movistar",7\r\nOK\r\n',
+        "AT+CGDCONT?": '+CGDCONT: 1,"IPV4V6","internet"\r\nOK\r\n',
+        "AT+GSN": "866758041234567\r\nOK\r\n",
+    }.items():
+        cache.put(cmd, response)
+
+    cache.invalidate_urc('+CEREG: 1,"1A2B","01A2D101",7')
+    assert cache.get("AT+COPS?") is None
+    assert cache.get("AT+CPIN?") is not None
+
+    cache.put('AT+CGDCONT=1,"IPV4V6","apn.test"', "ERROR\r\n")
+    assert cache.get("AT+CGDCONT?") is not None
+    cache.put('AT+CGDCONT=1,"IPV4V6","apn.test"', "OK\r\n")
+    assert cache.get("AT+CGDCONT?") is None
+
+    cache.put("AT+CFUN=1,1", "OK\r\n")
+    assert cache.get("AT+GSN") is None
+    assert cache.stats()["entries"] == {}
@@ -0,0 +1,120 @@
+import fcntl
+import os
+import threading
+import time
+
+import pytest
+
+from backend.app.services.at_scheduler import ATScheduler, Priority, _PortLock
+
+
+class RecordingSession:
+    listening = False
+
+    def __init__(self):
+        self.commands: list[str] = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def command(self, cmd: str, timeout: float | None = None) -> str:
+        self.gate.wait(timeout=5)
+        self.commands.append(cmd)
+        return f"{cmd}\r\nOK\r\n"
+
+
+def _wait_for_current(scheduler: ATScheduler, cmd: str) -> None:
+    deadline = time.monotonic() + 2
+    while scheduler.stats()["current_command"] != cmd:
+        assert time.monotonic() < deadline, f"{cmd} never started"
+        time.sleep(0.001)
+
+
+def _blocked_scheduler(**kwargs) -> tuple[ATScheduler, RecordingSession]:
+    session = RecordingSession()
+    session.gate.clear()
+    scheduler = ATScheduler(session, lock_file=None, **kwargs)
+    return scheduler, session
+
+
+def test_interactive_commands_jump_ahead_of_background_polling():
+    scheduler, session = _blocked_scheduler()
+    first = scheduler.submit("AT", priority=Priority.BACKGROUND)
+    _wait_for_current(scheduler, "AT")
+
+    futures = [
+        scheduler.submit("AT+CSQ", priority=Priority.BACKGROUND),
+        scheduler.submit("AT+COPS?", priority=Priority.BACKGROUND),
+        scheduler.submit("AT+CGDCONT?", priority=Priority.INTERACTIVE),
+    ]
+    session.gate.set()
+
+    assert first.result(timeout=2).endswith("OK\r\n")
+    for future in futures:
+        future.result(timeout=2)
+    assert session.commands == ["AT", "AT+CGDCONT?", "AT+CSQ", "AT+COPS?"]
+
+
+def test_queue_depth_is_bounded_and_counted():
+    scheduler, session = _blocked_scheduler(max_depth=2)
+    scheduler.submit("AT")
+    _wait_for_current(scheduler, "AT")
+
+    scheduler.submit("AT+CSQ")
+    scheduler.submit("AT+QCSQ")
+    rejected = scheduler.submit("AT+COPS?")
+
+    assert rejected.result(timeout=1) is None
+    stats = scheduler.stats()
+    assert stats["rejected"] == 1
+    assert stats["queue_depth"] == 2
+    assert stats["max_queue_depth"] == 2
+    session.gate.set()
+
+
+def test_commands_expire_when_they_wait_too_long_in_queue():
+    scheduler, session = _blocked_scheduler(queue_timeout=0.05)
+    scheduler.submit("AT")
+    _wait_for_current(scheduler, "AT")
+
+    late = scheduler.submit("AT+CSQ")
+    threading.Timer(0.2, session.gate.set).start()
+
+    with pytest.raises(TimeoutError):
+        late.result(timeout=2)
+    assert scheduler.stats()["expired"] == 1
+    assert session.commands == ["AT"]
+
+
+def test_busy_port_answers_background_polls_immediately():
+    session = RecordingSession()
+    scheduler = ATScheduler(session, lock_file=None)
+
+    with scheduler.busy_for("escaneando operadores"):
+        assert scheduler.busy == "escaneando operadores"
+        assert scheduler.submit("AT+CSQ", priority=Priority.BACKGROUND).result(timeout=0) is None
+        assert scheduler.execute("AT+COPS=?", priority=Priority.NORMAL) == "AT+COPS=?\r\nOK\r\n"
+
+    assert scheduler.busy is None
+    assert scheduler.execute("AT+CSQ", priority=Priority.BACKGROUND) == "AT+CSQ\r\nOK\r\n"
+    assert session.commands == ["AT+COPS=?", "AT+CSQ"]
+    assert scheduler.stats()["paused"] == 1
+
+
+def test_port_lock_holds_a_read_only_file_created_by_another_user(tmp_path):
+    # watchdog.sh runs as root and may leave the lock file 0644: no write access needed.
+    path = tmp_path / "ec25-at.lock"
+    path.touch(mode=0o444)
+    ours, watchdog = _PortLock(str(path)), os.open(path, os.O_RDONLY)
+    try:
+        assert ours.try_acquire()
+        assert fcntl.fcntl(ours._fd, fcntl.F_GETFL) & os.O_ACCMODE == os.O_RDONLY
+        with pytest.raises(BlockingIOError):
+            fcntl.flock(watchdog, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        ours.release()
+        fcntl.flock(watchdog, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert not ours.try_acquire()
+    finally:
+        os.close(watchdog)
+
+    created = _PortLock(str(tmp_path / "missing.lock"))
+    assert created.try_acquire() and (tmp_path / "missing.lock").exists()
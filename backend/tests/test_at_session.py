@@ -0,0 +1,108 @@
+import serial
+
+from backend.app.services.at_session import ATSession, command_timeout
+
+
+class FakeSerial:
+    def __init__(self, replies: dict[str, bytes], fail_after: int | None = None):
+        self.replies = replies
+        self.fail_after = fail_after
+        self.is_open = True
+        self.written: list[bytes] = []
+        self._rx = b""
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx)
+
+    def reset_input_buffer(self) -> None:
+        self._rx = b""
+
+    def write(self, data: bytes) -> int:
+        if self.fail_after is not None and len(self.written) >= self.fail_after:
+            raise serial.SerialException("device disconnected")
+        self.written.append(data)
+        cmd = data.decode().strip()
+        self._rx += cmd.encode() + b"\r\r\n" + self.replies.get(cmd, b"ERROR\r\n")
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        data, self._rx = self._rx[:size], self._rx[size:]
+        return data
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+def _session(ports: list[FakeSerial]) -> ATSession:
+    opened = iter(ports)
+    return ATSession(lambda force_refresh: "/dev/ttyUSB2", serial_factory=lambda *a, **kw: next(opened))
+
+
+def test_command_returns_on_final_result_code():
+    port = FakeSerial({"AT+CSQ": b"+CSQ: 20,99\r\n\r\nOK\r\n"})
+    session = _session([port])
+
+    response = session.command("AT+CSQ", timeout=0.5)
+
+    assert response == "AT+CSQ\r\n+CSQ: 20,99\r\nOK\r\n"
+    assert port.written == [b"AT+CSQ\r"]
+
+
+def test_command_keeps_port_open_between_commands():
+    port = FakeSerial({"AT": b"OK\r\n", "AT+CPIN?": b"+CPIN: READY\r\n\r\nOK\r\n"})
+    session = _session([port])
+
+    assert "OK" in session.command("AT", timeout=0.5)
+    assert "+CPIN: READY" in session.command("AT+CPIN?", timeout=0.5)
+    assert session.is_open
+    assert len(port.written) == 2
+
+
+def test_command_error_codes_are_final():
+    port = FakeSerial({"AT+CPIN?": b"+CME ERROR: 10\r\n"})
+    session = _session([port])
+
+    assert session.command("AT+CPIN?", timeout=0.5).endswith("+CME ERROR: 10\r\n")
+
+
+def test_command_reconnects_when_device_disappears():
+    broken = FakeSerial({}, fail_after=0)
+    replacement = FakeSerial({"AT": b"OK\r\n"})
+    session = _session([broken, replacement])
+
+    assert "OK" in session.command("AT", timeout=0.5)
+    assert not broken.is_open
+    assert replacement.written == [b"AT\r"]
+
+
+def test_command_timeout_table():
+    assert command_timeout("AT+COPS=?") == 180.0
+    assert command_timeout("AT+CSQ") == 5.0
+
+
+def test_urcs_are_split_out_of_command_responses():
+    port = FakeSerial({"AT+CSQ": b'+CEREG: 1,"1A2B","01A2B3C",7\r\n+CSQ: 20,99\r\n\r\nOK\r\n+QIND: "csq",21,99\r\n'})
+    session = _session([port])
+    urcs: list[str] = []
+    session.set_urc_handler(urcs.append, ("+CEREG:", "+QIND:"))
+
+    response = session.command("AT+CSQ", timeout=0.5)
+
+    assert response == "AT+CSQ\r\n+CSQ: 20,99\r\nOK\r\n"
+    assert urcs == ['+CEREG: 1,"1A2B","01A2B3C",7', '+QIND: "csq",21,99']
+
+
+def test_idle_urcs_are_read_and_init_commands_run_once():
+    port = FakeSerial({"AT+CEREG=2": b"OK\r\n", "AT": b"OK\r\n"})
+    session = _session([port])
+    urcs: list[str] = []
+    session.set_urc_handler(urcs.append, ("+CEREG:",), ["AT+CEREG=2"])
+
+    session.command("AT", timeout=0.5)
+    session.command("AT", timeout=0.5)
+    port._rx += b"+CEREG: 0\r\n"
+
+    assert session.poll_unsolicited() == 1
+    assert urcs == ["+CEREG: 0"]
+    assert port.written == [b"AT+CEREG=2\r", b"AT\r", b"AT\r"]
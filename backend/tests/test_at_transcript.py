@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app import modem as legacy
+from backend.app.services import at_transcript, modem
+from backend.app.services.ec25_simulator import EC25Simulator
+from backend.benchmarks import parser_bench
+
+FIXTURE = Path(__file__).parent / "fixtures" / "ec25_lte.jsonl"
+
+
+def _replayed():
+    results = {}
+    for cmd, response, parsed in at_transcript.replay(at_transcript.load_transcript(str(FIXTURE))):
+        results.setdefault(cmd, []).append(parsed)
+    return results
+
+
+def test_replay_parses_recorded_corpus_including_edge_cases():
+    results = _replayed()
+
+    assert results["AT+CSQ"] == ["20/31 (-73 dBm)", "21/31 (-71 dBm)", "22/31 (-69 dBm)", "99/31", "31/31"]
+    assert results["AT+QCSQ"][3] is None  # "NOSERVICE" carries no measurements
+    assert results["AT+COPS?"] == ["Movistar (LTE)", None]
+    assert results["AT+CREG?"] == ["Registrado", "Buscando"]
+    assert results["AT+CEREG?"] == ["Registrado", "Buscando"]
+    assert results["AT+CPIN?"] == ["Lista", "PIN requerido"]
+    assert results["AT+QCAINFO"][0]["bandwidth_mhz"] == 25.0
+    assert results["AT+QCAINFO"][-1]["active"] is False
+    assert results['AT+QENG="servingcell"'][1].state == "SEARCH"
+    assert len(results['AT+QENG="neighbourcell"'][0]) == 2
+    assert [e["type"] for e in results["URC"]] == ["csq", "registration", "sim", "act", "sim", "registration"]
+
+
+def test_legacy_and_backend_text_parsers_agree_on_corpus():
+    samples = parser_bench.load_samples(FIXTURE)
+    backend = {**at_transcript.PARSERS, "AT+QCSQ": modem.parse_qcsq_text}
+    for cmd, name in parser_bench.LEGACY_PARSERS.items():
+        assert samples.get(cmd), cmd
+        for response in samples[cmd]:
+            assert getattr(legacy, name)(response) == backend[cmd](response), (cmd, response)
+
+
+def test_recorder_round_trip_and_size_cap(tmp_path):
+    path = tmp_path / "transcript.jsonl"
+    recorder = at_transcript.TranscriptRecorder(str(path), modem="ec25", max_bytes=400)
+    recorder.write_meta(firmware="EC25EFAR06A06M4G")
+    recorder.record("AT+CSQ", "+CSQ: 20,99\r\nOK\r\n", 0.0123)
+    recorder.record_urc('+QIND: "csq",18,99')
+    recorder.record("AT+CPIN?", "+CPIN: READY\r\nOK\r\n" * 20, 0.01)
+    recorder.close()
+
+    entries = at_transcript.load_transcript(str(path))
+    assert [(e.cmd, e.urc) for e in entries] == [("AT+CSQ", None), (None, '+QIND: "csq",18,99')]
+    assert entries[0].ms == 12.3
+    assert entries[0].modem == "ec25"
+
+    path.write_text(json.dumps({"v": 99, "cmd": "AT"}) + "\n")
+    with pytest.raises(ValueError):
+        at_transcript.load_transcript(str(path))
+
+
+def test_modem_client_records_sent_commands(tmp_path):
+    path = tmp_path / "live.jsonl"
+    with EC25Simulator() as sim:
+        client = modem.ModemClient(lambda force_refresh: sim.port, name="sim", lock_file=None)
+        client.recorder = at_transcript.TranscriptRecorder(str(path), modem=client.name)
+        try:
+            client.get_signal()
+        finally:
+            client.recorder.close()
+            client.close()
+
+    entries = at_transcript.load_transcript(str(path))
+    replayed = {cmd: parsed for cmd, _, parsed in at_transcript.replay(entries)}
+    assert len(entries) == 1 and ";" in entries[0].cmd
+    assert replayed["AT+CSQ"] == "20/31 (-73 dBm)"
+    assert replayed["AT+QCAINFO"]["active"] is True
+
+
+def test_simulator_responses_from_transcript():
+    responses = at_transcript.simulator_responses(at_transcript.load_transcript(str(FIXTURE)))
+
+    assert responses["AT+CSQ"] == "+CSQ: 31,99"
+    assert responses["AT+CPIN?"] == "+CPIN: SIM PIN"
+    assert responses['AT+QENG="NEIGHBOURCELL"'].count("+QENG:") == 2
+
+
+def test_parser_bench_reports_throughput_and_allocations(tmp_path):
+    output = tmp_path / "parsers.json"
+    assert parser_bench.main(["--min-time", "0.001", "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    csq = report["parsers"]["backend"]["AT+CSQ"]
+    assert csq["samples"] == 5
+    assert csq["ns_per_call"] > 0 and csq["blocks_per_call"] >= 0
+    assert "legacy" in report["parsers"]
+
+    slower = json.loads(output.read_text())
+    slower["parsers"]["backend"]["AT+CSQ"]["ns_per_call"] = csq["ns_per_call"] / 10
+    assert parser_bench.compare(slower, report, threshold=0.2)[0].startswith("backend.AT+CSQ:")
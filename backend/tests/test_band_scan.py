@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+import http.server
+import threading
+
+import pytest
+
+from backend.app.services import band_scan
+from backend.app.services.band_scan import (
+    BandConfig,
+    BandScanner,
+    http_throughput_probe,
+    parse_band_config,
+    parse_qscan,
+    rank_candidates,
+)
+
+QSCAN_REPLY = (
+    '+QSCAN: "LTE",730,2,650,367,-95,-10,-99,20,1A2D001,2B5D,75,2\r\n'
+    '+QSCAN: "LTE",730,2,675,12,-101,-9,-105,22,1A2D002,2B5D,75,2\r\n'
+    '+QSCAN: "LTE",730,2,9610,112,-88,-14,-92,10,1A2D003,2B5E,50,28\r\n'
+    "OK\r\n"
+)
+
+# Band -> (PCI, RSRP, RSRQ, SINR) the fake modem camps on when locked to it
+CELLS = {2: (367, -95, -10, 14), 4: (401, -112, -16, -3), 28: (112, -90, -13, 2)}
+
+
+class FakeModem:
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.lte_mask = 0x800000A  # bands 2, 4 and 28
+        self.commands: list[str] = []
+        self.busy_reasons: list[str] = []
+
+    def busy_for(self, reason):
+        self.busy_reasons.append(reason)
+        return contextlib.nullcontext()
+
+    async def send_at_async(self, cmd, priority=None, cached=True):
+        self.commands.append(cmd)
+        if cmd == 'AT+QCFG="band"':
+            return f'+QCFG: "band",0x260,{hex(self.lte_mask)},0x0\r\nOK\r\n'
+        if cmd.startswith('AT+QCFG="band",'):
+            self.lte_mask = int(cmd.split(",")[2], 0)
+            return "OK\r\n"
+        if cmd == 'AT+QENG="servingcell"':
+            bands = BandConfig("0x0", hex(self.lte_mask)).lte_bands
+            if len(bands) != 1:
+                return '+QENG: "servingcell","SEARCH"\r\nOK\r\n'
+            pci, rsrp, rsrq, sinr = CELLS[bands[0]]
+            return (
+                f'+QENG: "servingcell","NOCONN","LTE","FDD",730,02,1A2D001,{pci},650,{bands[0]},'
+                f"5,5,2B5D,{rsrp},{rsrq},-65,{sinr},-\r\nOK\r\n"
+            )
+        if cmd == "AT+QSCAN=1,1":
+            return QSCAN_REPLY
+        return "OK\r\n"
+
+
+def test_parse_qscan_and_rank_best_cell_per_band():
+    candidates = parse_qscan(QSCAN_REPLY)
+    ranked = rank_candidates(candidates)
+
+    assert len(candidates) == 3
+    # Band 28 is louder but RSRQ -14 costs it the top spot
+    assert [(c.band, c.pci) for c in ranked] == [(2, 367), (28, 112)]
+    assert parse_band_config('+QCFG: "band",0x260,0x42000000000000381a,0x0\r\nOK\r\n').lte_bands == [
+        2, 4, 5, 12, 13, 14, 66, 71,
+    ]
+
+
+def test_sweep_ranks_bands_restores_config_and_caches_result(tmp_path):
+    modem = FakeModem()
+    cache = tmp_path / "scan.json"
+
+    async def scenario():
+        scanner = BandScanner(modem, cache_path=cache, settle_timeout=0)
+        assert scanner.start("sweep")
+        assert not scanner.start("sweep")
+        return await scanner.wait()
+
+    result = asyncio.run(scenario())
+
+    assert result["state"] == "done"
+    assert [c["band"] for c in result["candidates"]] == [2, 28, 4]
+    assert result["best"]["pci"] == 367
+    assert modem.lte_mask == 0x800000A
+    assert modem.busy_reasons == ["escaneando bandas"]
+    assert BandScanner(modem, cache_path=cache).result()["best"]["band"] == 2
+
+
+def test_throughput_probe_reorders_and_lock_survives_restart(tmp_path):
+    modem = FakeModem()
+    cache = tmp_path / "scan.json"
+
+    async def probe():
+        return {2: 12.0, 28: 31.5, 4: 1.0}[BandConfig("0x0", hex(modem.lte_mask)).lte_bands[0]]
+
+    async def scenario():
+        scanner = BandScanner(modem, cache_path=cache, probe=probe, settle_timeout=0)
+        scanner.start("sweep", probe=True, lock=True)
+        result = await scanner.wait()
+        locked_mask = modem.lte_mask
+        restarted = BandScanner(modem, cache_path=cache)
+        return result, locked_mask, await restarted.unlock()
+
+    result, locked_mask, unlocked = asyncio.run(scenario())
+
+    assert result["best"]["band"] == 28
+    assert result["best"]["throughput_mbps"] == 31.5
+    assert result["locked"]["band"] == 28
+    assert locked_mask == 1 << 27
+    assert 'AT+QNWLOCK="common/lte",2,650,112' in modem.commands
+    assert unlocked and modem.lte_mask == 0x800000A
+
+
+@contextlib.contextmanager
+def _http_server():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(1 << 20))
+            self.end_headers()
+            self.wfile.write(b"\0" * (1 << 20))
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/blob"
+    finally:
+        server.shutdown()
+
+
+def test_throughput_probe_only_measures_the_lte_egress():
+    routes = []
+
+    def route(host, source):
+        routes.append((host, source))
+        return "usb0" if len(routes) == 1 else "eth0"
+
+    with _http_server() as url:
+        probe = http_throughput_probe(url, duration=0.2, source=lambda: ("usb0", "127.0.0.1"), route=route)
+        assert asyncio.run(probe()) > 0
+        # Default route over eth0: skipped instead of ranking bands on the wrong link.
+        assert asyncio.run(probe()) is None
+    assert routes[0] == ("127.0.0.1", "127.0.0.1")
+    assert asyncio.run(http_throughput_probe(url, source=lambda: None)()) is None
+
+
+@pytest.mark.anyio
+async def test_band_lock_is_refused_while_a_scan_holds_the_modem(client, monkeypatch):
+    login = await client.post("/api/auth/login", json={"username": "admin", "password": "admin1234"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    async def must_not_run(*args):
+        raise AssertionError("band configuration changed during a scan")
+
+    monkeypatch.setattr(band_scan.scanner, "lock", must_not_run)
+    monkeypatch.setattr(band_scan.scanner, "unlock", must_not_run)
+    monkeypatch.setattr(BandScanner, "running", property(lambda self: True))
+
+    assert (await client.post("/api/lte/scan/lock", json={"band": 28}, headers=headers)).status_code == 409
+    assert (await client.delete("/api/lte/scan/lock", headers=headers)).status_code == 409
+
+    monkeypatch.setattr(BandScanner, "running", property(lambda self: False))
+    with band_scan.scanner.client.busy_for("escaneando operadores"):
+        assert (await client.post("/api/lte/scan/lock", json={"band": 28}, headers=headers)).status_code == 409
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from backend.app.services import ec25_monitor, modem
+from backend.app.services.cell_info import (
+    CellHistory,
+    CellSample,
+    ServingCell,
+    parse_neighbourcells,
+    parse_servingcell,
+)
+from backend.app.services.ec25_simulator import EC25Simulator
+
+
+def test_parse_servingcell_lte_and_idle_states():
+    cell = parse_servingcell(
+        '+QENG: "servingcell","NOCONN","LTE","FDD",730,02,1a2d001,367,650,2,5,5,2b5d,-95,-10,-65,13,-\r\n\r\nOK\r\n'
+    )
+
+    assert cell is not None
+    assert (cell.rat, cell.pci, cell.earfcn, cell.band) == ("LTE", 367, 650, 2)
+    assert (cell.cell_id, cell.tac) == ("1A2D001", "2B5D")
+    assert (cell.rsrp, cell.rsrq, cell.rssi, cell.sinr) == (-95, -10, -65, 13)
+    assert parse_servingcell('+QENG: "servingcell","SEARCH"\r\nOK\r\n') == ServingCell(state="SEARCH")
+    assert parse_servingcell("ERROR") is None
+
+
+def test_parse_neighbourcells_keeps_intra_and_inter_frequency_cells():
+    cells = parse_neighbourcells(
+        '+QENG: "neighbourcell intra","LTE",650,368,-12,-101,-70,8,30,6,-,-,-\r\n'
+        '+QENG: "neighbourcell inter","LTE",9610,112,-14,-108,-77,-,22,4,-,-\r\n'
+        "OK\r\n"
+    )
+
+    assert [(c.kind, c.earfcn, c.pci, c.rsrp) for c in cells] == [("intra", 650, 368, -101), ("inter", 9610, 112, -108)]
+    assert cells[1].sinr is None
+
+
+def test_cell_history_is_bounded_and_filterable():
+    history = CellHistory(maxlen=3)
+    for i in range(5):
+        history.append(CellSample(float(i), ServingCell(state="NOCONN", pci=300 + i % 2)))
+
+    assert len(history) == 3
+    assert [s.timestamp for s in history.query()] == [2.0, 3.0, 4.0]
+    assert [s.timestamp for s in history.query(since=3.0)] == [3.0, 4.0]
+    assert [s.timestamp for s in history.query(pci=300)] == [2.0, 4.0]
+    assert [s.timestamp for s in history.query(limit=1)] == [4.0]
+
+
+def test_monitor_records_cell_samples_after_publishing_the_snapshot(monkeypatch):
+    monkeypatch.setattr(modem.presence, "start", lambda: False)
+    monkeypatch.setattr(modem.presence, "stop", lambda: None)
+    monkeypatch.setattr(ec25_monitor, "is_ec25_detected", lambda: True)
+
+    with EC25Simulator() as simulator:
+
+        async def scenario():
+            modem.configure_port(simulator.port)
+            modem.start_async_transport()
+            ec25_monitor.monitor.cells.clear()
+            ec25_monitor.start_monitor(update_interval=30.0, slow_interval=60.0, cell_interval=0.05)
+            started = time.monotonic()
+            try:
+                while len(ec25_monitor.monitor.cells) < 3:
+                    assert time.monotonic() - started < 3, "no cell samples"
+                    await asyncio.sleep(0.02)
+                return list(simulator.received), ec25_monitor.monitor.cells.latest()
+            finally:
+                ec25_monitor.stop_monitor()
+                await modem.stop_async_transport()
+                modem.configure_port(None)
+
+        received, latest = asyncio.run(scenario())
+
+    first_signal = next(i for i, cmd in enumerate(received) if "CSQ" in cmd)
+    first_cell = next(i for i, cmd in enumerate(received) if "QENG" in cmd)
+    assert first_signal < first_cell
+    assert "QENG" not in received[first_signal]
+    assert latest.serving.pci == 367
+    assert [n.pci for n in latest.neighbours] == [368, 112]
@@ -0,0 +1,113 @@
+import asyncio
+
+from backend.app.services.data_call import DataCallManager, Histogram, parse_cgact
+
+
+# Modem + host: activating the context brings the interface IP up
+class FakeLink:
+    name = "fake"
+    busy = None
+
+    def __init__(self, iface="usb0", lease_on_connect=True):
+        self.iface = iface
+        self.lease_on_connect = lease_on_connect
+        self.pdp = False
+        self.ip = None
+        self.commands: list[str] = []
+        self.dhcp_calls = 0
+
+    async def send_at_async(self, cmd, priority=None, cached=True):
+        self.commands.append(cmd)
+        if cmd == "AT+CGACT?":
+            return f"+CGACT: 1,{int(self.pdp)}\r\n+CGACT: 2,0\r\nOK\r\n"
+        if cmd in ("AT+QNETDEVCTL=1,1,1", "AT+CGACT=1,1"):
+            self.pdp = True
+            if self.lease_on_connect:
+                self.ip = "192.168.225.34"
+        elif cmd in ("AT+QNETDEVCTL=0,1,0", "AT+CGACT=0,1"):
+            self.pdp = False
+        return "OK\r\n"
+
+    async def dhcp(self, iface):
+        self.dhcp_calls += 1
+        self.ip = "10.64.12.7"
+        return True
+
+    def manager(self, **kwargs):
+        return DataCallManager(
+            self,
+            present=lambda iface: iface == self.iface,
+            ip_lookup=lambda iface: self.ip if iface == self.iface else None,
+            **{"dhcp": self.dhcp, **kwargs},
+        )
+
+
+def test_parse_cgact():
+    assert parse_cgact("+CGACT: 1,1\r\n+CGACT: 2,0\r\nOK\r\n") == {1: True, 2: False}
+    assert parse_cgact(None) == {}
+
+
+def test_histogram_buckets_observations():
+    hist = Histogram(buckets=(1.0, 5.0))
+    for value in (0.4, 3.0, 3.5, 12.0):
+        hist.observe(value)
+
+    result = hist.to_dict()
+    assert [b["count"] for b in result["buckets"]] == [1, 2, 1]
+    assert result["buckets"][-1]["le"] is None
+    assert result["count"] == 4 and result["max_s"] == 12.0 and result["last_s"] == 12.0
+
+
+def test_ecm_connect_uses_qnetdevctl_and_records_time_to_connect():
+    link = FakeLink("usb0")
+    manager = link.manager()
+
+    assert asyncio.run(manager.connect()) is True
+    status = manager.status()
+    assert "AT+QNETDEVCTL=1,1,1" in link.commands
+    assert status["state"] == "connected" and status["mode"] == "ecm"
+    assert status["ip"] == "192.168.225.34"
+    assert status["time_to_connect"]["count"] == 1
+    assert status["time_to_recover"]["count"] == 0
+    assert link.dhcp_calls == 0
+
+
+def test_qmi_connect_falls_back_to_dhcp_when_no_lease():
+    link = FakeLink("wwan0", lease_on_connect=False)
+    manager = link.manager(connect_timeout=0.1)
+
+    assert asyncio.run(manager.connect()) is True
+    assert "AT+CGACT=1,1" in link.commands
+    assert link.dhcp_calls == 1
+    assert manager.status()["ip"] == "10.64.12.7"
+
+
+def test_pdp_drop_with_stale_lease_is_detected_and_recovered():
+    link = FakeLink("usb0")
+    manager = link.manager(check_interval=0.01)
+
+    async def scenario():
+        assert await manager.connect()
+        manager.start()
+        link.pdp = False  # ECM lease survives, the context does not
+        for _ in range(200):
+            if manager.counters["drops"] and manager.state == "connected":
+                break
+            await asyncio.sleep(0.01)
+        await manager.stop()
+
+    asyncio.run(scenario())
+    status = manager.status()
+    assert status["drops"] == 1
+    assert status["connects"] == 2
+    assert status["time_to_recover"]["count"] == 1
+    assert link.commands.count("AT+QNETDEVCTL=1,1,1") == 2
+
+
+def test_failed_connect_counts_failure():
+    link = FakeLink("usb0", lease_on_connect=False)
+    manager = link.manager(connect_timeout=0.05, dhcp=None)
+
+    assert asyncio.run(manager.connect()) is False
+    assert manager.status()["state"] == "down"
+    assert manager.status()["failures"] == 1
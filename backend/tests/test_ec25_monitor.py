@@ -0,0 +1,246 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+
+import pytest
+
+from backend.app.services import ec25_monitor, modem
+
+
+@pytest.fixture
+def fake_modem(monkeypatch):
+    polls: list[list[str]] = []
+
+    async def fake_poll_groups(groups, priority=None):
+        polls.append(list(groups))
+        result = {"signal": {}, "network": {}}
+        if "signal" in groups:
+            result["signal"].update(csq="20/31 (-73 dBm)", qcsq="LTE: RSRP -95dBm")
+        if "registration" in groups:
+            result["network"]["registration"] = "Registrado"
+        if "operator" in groups:
+            result["network"].update(operator="Movistar (LTE)", network="FDD LTE", sim="Lista")
+        return result
+
+    monkeypatch.setattr(modem.primary, "poll_groups_async", fake_poll_groups)
+    monkeypatch.setattr(ec25_monitor, "is_ec25_detected", lambda: True)
+    monkeypatch.setattr(ec25_monitor.presence, "start", lambda: False)
+    monkeypatch.setattr(ec25_monitor.presence, "stop", lambda: None)
+    yield polls
+    ec25_monitor.stop_monitor()
+
+
+def test_monitor_polls_each_group_on_its_own_schedule(fake_modem):
+    ec25_monitor.start_monitor(update_interval=0.2, signal_interval=0.05, slow_interval=10.0)
+    time.sleep(0.5)
+
+    data = ec25_monitor.get_latest_data()
+    signal_polls = sum("signal" in p for p in fake_modem)
+    registration_polls = sum("registration" in p for p in fake_modem)
+    operator_polls = sum("operator" in p for p in fake_modem)
+
+    assert fake_modem[0] == ["signal", "registration", "operator"]
+    assert signal_polls > registration_polls > operator_polls == 1
+    assert data["detected"] is True
+    assert data["network"] == {
+        "operator": "Movistar (LTE)",
+        "network": "FDD LTE",
+        "registration": "Registrado",
+        "sim": "Lista",
+    }
+    assert data["age"]["signal"] < data["age"]["operator"]
+
+
+def test_refresh_groups_forces_an_early_poll(fake_modem):
+    ec25_monitor.start_monitor(update_interval=5.0, signal_interval=5.0, slow_interval=60.0)
+    time.sleep(0.1)
+
+    ec25_monitor.refresh_groups("operator")
+    time.sleep(0.1)
+
+    assert fake_modem == [["signal", "registration", "operator"], ["operator"]]
+
+
+def test_alignment_mode_streams_minimal_samples_then_reverts(fake_modem, monkeypatch):
+    sent: list[str] = []
+
+    async def fake_send_at_async(cmd, timeout=None, priority=None, cached=True):
+        sent.append(cmd)
+        return '+QCSQ: "LTE",-65,-95,135,-10\r\nOK\r\n'
+
+    monkeypatch.setattr(modem.primary, "send_at_async", fake_send_at_async)
+    ec25_monitor.start_monitor(update_interval=5.0, signal_interval=5.0, slow_interval=60.0)
+    time.sleep(0.1)
+
+    with ec25_monitor.broadcaster.subscribe() as subscription:
+        status = ec25_monitor.start_alignment(rate=10.0, duration=1.0)
+        time.sleep(0.5)
+        _, sample = subscription.get(timeout=1)
+    time.sleep(0.8)
+
+    assert status["active"] is True and status["rate"] == 10.0
+    assert sample == {"alignment": True, "t": sample["t"], "rsrp": -95, "rsrq": -10, "sinr": 135, "rssi": -65}
+    assert 6 <= len(sent) <= 11
+    assert set(sent) == {"AT+QCSQ"}
+    assert ec25_monitor.get_alignment_status() == {"active": False}
+    assert fake_modem == [["signal", "registration", "operator"]] * 2
+
+
+def test_broadcaster_fans_out_every_update_to_each_subscriber():
+    broadcaster = ec25_monitor.Broadcaster(maxlen=4)
+    first = broadcaster.subscribe()
+    second = broadcaster.subscribe()
+
+    for i in range(3):
+        broadcaster.publish({"n": i})
+
+    assert [first.get(timeout=0)[1]["n"] for _ in range(3)] == [0, 1, 2]
+    assert [second.get(timeout=0)[1]["n"] for _ in range(3)] == [0, 1, 2]
+    assert first.get(timeout=0) is None
+    assert broadcaster.stats()["subscribers"] == 2
+
+
+def test_slow_subscriber_drops_oldest_without_affecting_others():
+    broadcaster = ec25_monitor.Broadcaster(maxlen=2)
+    slow = broadcaster.subscribe()
+    fast = broadcaster.subscribe()
+
+    received = []
+    for i in range(5):
+        broadcaster.publish({"n": i})
+        received.append(fast.get(timeout=0)[0])
+
+    assert received == [1, 2, 3, 4, 5]
+    assert [slow.get(timeout=0)[0] for _ in range(2)] == [4, 5]
+    stats = broadcaster.stats()
+    assert stats["dropped"] == 3
+    assert {s["id"]: s["dropped"] for s in stats["per_subscriber"]} == {slow.id: 3, fast.id: 0}
+
+    slow.close()
+    assert broadcaster.stats()["subscribers"] == 1
+    assert broadcaster.stats()["dropped"] == 3
+
+
+def test_async_subscriber_wakes_on_publish_from_another_thread():
+    broadcaster = ec25_monitor.Broadcaster()
+
+    async def scenario():
+        with broadcaster.subscribe() as subscription:
+            assert await subscription.get_async(timeout=0.01) is None
+            threading.Timer(0.05, broadcaster.publish, args=({"csq": "20/31"},)).start()
+            return await subscription.get_async(timeout=2)
+
+    assert asyncio.run(scenario()) == (1, {"csq": "20/31"})
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def test_merge_patch_sends_only_changes_and_nulls_removed_keys():
+    old = {"signal": {"csq": "20/31", "qcsq": "LTE"}, "network": {"sim": "Lista"}, "timestamp": 1.0}
+    new = {"signal": {"csq": "21/31", "qcsq": "LTE"}, "network": {"sim": "Lista"}, "timestamp": 2.0, "busy": "x"}
+
+    assert ec25_monitor.merge_patch(old, new) == {"signal": {"csq": "21/31"}, "timestamp": 2.0, "busy": "x"}
+    assert ec25_monitor.merge_patch(new, old) == {"signal": {"csq": "20/31"}, "timestamp": 1.0, "busy": None}
+    assert ec25_monitor.merge_patch(old, old) == {}
+
+
+def _parse_sse(event):
+    fields = dict(line.split(": ", 1) for line in event.strip().splitlines())
+    return ec25_monitor.parse_event_id(fields["id"])[1], fields["event"], json.loads(fields["data"])
+
+
+def test_delta_encoder_sends_snapshot_then_patches_and_skips_alignment_base():
+    encoder = ec25_monitor.DeltaEncoder()
+    first = {"signal": {"csq": "20/31"}, "timestamp": 1.0}
+
+    assert _parse_sse(encoder.encode(1, first)) == (1, "snapshot", first)
+    assert _parse_sse(encoder.encode(2, {"alignment": True, "rsrp": -90}))[1] == "alignment"
+    assert _parse_sse(encoder.encode(3, {"signal": {"csq": "21/31"}, "timestamp": 1.0})) == (
+        3,
+        "patch",
+        {"signal": {"csq": "21/31"}},
+    )
+    assert encoder.encode(3, first) is None
+
+
+def test_resume_from_last_event_id_only_sends_missed_changes():
+    broadcaster = ec25_monitor.Broadcaster(history=3)
+    for csq in ("18/31", "19/31", "20/31", "21/31"):
+        broadcaster.publish({"signal": {"csq": csq}})
+    broadcaster.publish({"alignment": True})
+
+    # A client that saw id 3 gets a patch to the latest snapshot, not the whole state.
+    encoder = broadcaster.resume(f"{broadcaster.epoch}-3")
+    assert _parse_sse(encoder.encode(*broadcaster.snapshot_at(broadcaster.seq))) == (
+        4,
+        "patch",
+        {"signal": {"csq": "21/31"}},
+    )
+    # Ids that fell out of the history fall back to a full snapshot.
+    assert broadcaster.snapshot_at(1) is None
+    assert broadcaster.snapshot_at(99) is None
+
+
+def test_alignment_ticks_do_not_evict_the_resume_history():
+    broadcaster = ec25_monitor.Broadcaster(history=2)
+    broadcaster.publish({"signal": {"csq": "20/31"}})
+    for _ in range(100):
+        broadcaster.publish({"alignment": True, "rsrp": -90})
+    broadcaster.publish({"signal": {"csq": "21/31"}})
+
+    # A client that saw an alignment tick resumes from the snapshot before it.
+    encoder = broadcaster.resume(f"{broadcaster.epoch}-50")
+    assert _parse_sse(encoder.encode(*broadcaster.snapshot_at(broadcaster.seq))) == (
+        102,
+        "patch",
+        {"signal": {"csq": "21/31"}},
+    )
+
+
+def test_event_ids_from_a_previous_process_get_a_full_snapshot():
+    before_restart = ec25_monitor.Broadcaster()
+    for csq in ("18/31", "19/31", "20/31"):
+        before_restart.publish({"signal": {"csq": csq}})
+    last_event_id = f"{before_restart.epoch}-2"
+
+    # Seq restarts at 1 in the new process, but the epoch no longer matches.
+    broadcaster = ec25_monitor.Broadcaster()
+    for csq in ("10/31", "11/31", "12/31"):
+        broadcaster.publish({"signal": {"csq": csq}})
+    assert broadcaster.epoch != before_restart.epoch
+
+    for stale in (last_event_id, "2", "garbage"):
+        event = broadcaster.resume(stale).encode(*broadcaster.snapshot_at(broadcaster.seq))
+        assert event.startswith(f"id: {broadcaster.epoch}-3\n")
+        assert _parse_sse(event) == (3, "snapshot", {"signal": {"csq": "12/31"}})
+
+
+def test_published_snapshot_is_serialized_once_and_shared_by_every_reader():
+    broadcaster = ec25_monitor.Broadcaster()
+    with broadcaster.subscribe() as a, broadcaster.subscribe() as b:
+        broadcaster.publish({"signal": {"csq": "20/31"}, "timestamp": 1.0})
+        broadcaster.publish({"signal": {"csq": "21/31"}, "timestamp": 2.0})
+        encoders = [ec25_monitor.DeltaEncoder(), ec25_monitor.DeltaEncoder()]
+        events = [[encoder.encode(*sub.get_nowait()) for _ in range(2)] for encoder, sub in zip(encoders, (a, b))]
+
+    snapshot = broadcaster.current
+    assert json.loads(snapshot.body) == {"signal": {"csq": "21/31"}, "timestamp": 2.0}
+    assert gzip.decompress(snapshot.gzipped) == snapshot.body
+    # Up-to-date clients get the very same pre-encoded patch, not a fresh json.dumps each.
+    assert events[0][1] is events[1][1] is snapshot.patch_event
+    assert snapshot.etag != broadcaster.snapshot_at(1)[1].etag
+    with pytest.raises(TypeError):
+        snapshot["timestamp"] = 3.0
+
+
+def test_latest_data_is_the_published_snapshot_without_copies(fake_modem):
+    ec25_monitor.start_monitor(update_interval=0.2, signal_interval=0.05, slow_interval=10.0)
+    deadline = time.monotonic() + 2
+    while not ec25_monitor.get_latest_data().get("detected") and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    data = ec25_monitor.get_latest_data()
+    assert data is ec25_monitor.broadcaster.current
+    assert data["network"]["operator"] == "Movistar (LTE)"
+    assert set(json.loads(data.body)["age"]) >= {"signal", "registration"}
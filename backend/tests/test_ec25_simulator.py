@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from backend.app.services.at_batch import chain_commands, split_chained_response
+from backend.app.services.at_scheduler import ATScheduler, Priority
+from backend.app.services.at_session import ATSession
+from backend.app.services.ec25_simulator import EC25Simulator
+from backend.app.services.modem import parse_csq
+
+
+@pytest.fixture
+def simulator():
+    with EC25Simulator() as sim:
+        yield sim
+
+
+@pytest.fixture
+def session(simulator):
+    session = ATSession(lambda force_refresh: simulator.port)
+    yield session
+    session.close()
+
+
+def test_session_talks_to_simulated_modem(simulator, session):
+    response = session.command("AT+CSQ")
+
+    assert response == "AT+CSQ\r\n+CSQ: 20,99\r\nOK\r\n"
+    assert parse_csq(response).startswith("20/31")
+    assert session.command("AT+QENG?").rstrip().endswith("ERROR")
+    assert simulator.received == ["AT+CSQ", "AT+QENG?"]
+
+
+def test_chained_commands_are_answered_in_one_response(session):
+    cmds = ["AT+CSQ", "AT+COPS?", "AT+CEREG?"]
+    parts = split_chained_response(cmds, session.command(chain_commands(cmds)))
+
+    assert "+CSQ: 20,99" in parts["AT+CSQ"]
+    assert "Movistar" in parts["AT+COPS?"]
+    assert "+CEREG: 0,1" in parts["AT+CEREG?"]
+
+
+def test_failure_modes(simulator, session):
+    simulator.fail("AT+COPS?", "error")
+    assert session.command("AT+COPS?").rstrip().endswith("ERROR")
+
+    simulator.fail("AT+COPS?", "no_reply")
+    assert session.command("AT+COPS?", timeout=0.3) == "AT+COPS?\r\n"
+
+    simulator.fail("AT+COPS?", "partial")
+    partial = session.command("AT+COPS?", timeout=0.3)
+    assert partial is not None and "OK" not in partial
+
+    simulator.fail("AT+COPS?", None)
+    assert "Movistar" in session.command("AT+COPS?")
+
+
+def test_scheduler_delivers_urcs_between_commands(simulator, session):
+    urcs: list[str] = []
+    session.set_urc_handler(urcs.append, ("+CEREG:",), ["AT+CEREG=2"])
+    scheduler = ATScheduler(session, lock_file=None)
+    scheduler.start()
+
+    assert scheduler.execute("AT", priority=Priority.INTERACTIVE).rstrip().endswith("OK")
+    simulator.emit_urc('+CEREG: 1,"1A2B","01A2D101",7')
+
+    deadline = time.monotonic() + 2
+    while not urcs:
+        assert time.monotonic() < deadline, "URC never delivered"
+        time.sleep(0.01)
+    assert urcs == ['+CEREG: 1,"1A2B","01A2D101",7']
+    assert simulator.received[0] == "AT+CEREG=2"
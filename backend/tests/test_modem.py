@@ -0,0 +1,209 @@
+from backend.app.services import modem
+from backend.app.services.at_batch import chain_commands, chunk_commands, response_prefix, split_chained_response
+from backend.app.services.at_cache import ATResponseCache
+
+
+def test_response_prefix_and_chaining():
+    assert response_prefix("AT+COPS?") == "+COPS:"
+    assert response_prefix('AT+QENG="servingcell"') == "+QENG:"
+    assert chain_commands(["AT+COPS?", "AT+QNWINFO", "AT+CEREG?"]) == "AT+COPS?;+QNWINFO;+CEREG?"
+    assert chunk_commands(["AT+CSQ", 'AT+QENG="servingcell"', 'AT+QENG="neighbourcell"']) == [
+        ["AT+CSQ", 'AT+QENG="servingcell"'],
+        ['AT+QENG="neighbourcell"'],
+    ]
+
+
+def test_split_chained_response_assigns_lines_per_command():
+    cmds = ["AT+COPS?", "AT+QNWINFO", "AT+CEREG?"]
+    raw = (
+        "AT+COPS?;+QNWINFO;+CEREG?\r\n"
+        '+COPS: 0,0,"Movistar",7\r\n'
+        '+QNWINFO: "FDD LTE","73002","LTE BAND 2",650\r\n'
+        "+CEREG: 0,1\r\n"
+        "OK\r\n"
+    )
+
+    split = split_chained_response(cmds, raw)
+
+    assert split["AT+COPS?"] == '+COPS: 0,0,"Movistar",7\r\nOK\r\n'
+    assert modem.parse_qnwinfo(split["AT+QNWINFO"]) == "FDD LTE - LTE BAND 2 @ 650 MHz"
+    assert modem.parse_reg_status(split["AT+CEREG?"]) == "Registrado"
+
+
+def test_split_chained_response_keeps_completed_commands_on_error():
+    cmds = ["AT+CSQ", "AT+CPIN?", "AT+COPS?"]
+    raw = "+CSQ: 20,99\r\n+CME ERROR: 10\r\n"
+
+    split = split_chained_response(cmds, raw)
+
+    assert split["AT+CSQ"] == "+CSQ: 20,99\r\nOK\r\n"
+    assert split["AT+CPIN?"] is None
+    assert split["AT+COPS?"] is None
+
+
+def test_send_at_batch_falls_back_to_individual_commands(monkeypatch):
+    sent: list[str] = []
+    replies = {
+        "AT+CSQ;+CPIN?;+COPS?": "+CSQ: 20,99\r\n+CME ERROR: 10\r\n",
+        "AT+CPIN?": "+CME ERROR: 10\r\n",
+        "AT+COPS?": '+COPS: 0,0,"Movistar",7\r\nOK\r\n',
+    }
+
+    def fake_send_at(cmd, timeout=None, priority=None, cached=True):
+        sent.append(cmd)
+        return replies[cmd]
+
+    monkeypatch.setattr(modem.primary, "send_at", fake_send_at)
+
+    results = modem.send_at_batch(["AT+CSQ", "AT+CPIN?", "AT+COPS?"])
+
+    assert sent == ["AT+CSQ;+CPIN?;+COPS?", "AT+CPIN?", "AT+COPS?"]
+    assert modem.parse_csq(results["AT+CSQ"]) == "20/31 (-73 dBm)"
+    assert modem.parse_cpin(results["AT+CPIN?"]) is None
+    assert modem.parse_cops(results["AT+COPS?"]) == "Movistar (LTE)"
+
+
+def test_send_at_batch_stores_each_response_once():
+    replies = {
+        "AT+CPIN?;+COPS?;+CIMI": "+CPIN: READY\r\n+CME ERROR: 3\r\n",
+        "AT+COPS?": '+COPS: 0,0,"Movistar",7\r\nOK\r\n',
+        "AT+CIMI": "732101234567890\r\nOK\r\n",
+        "AT+QGMR": "EC25EFAR06A06M4G_01.001\r\nOK\r\n",
+    }
+
+    class FakeScheduler:
+        def execute(self, cmd, priority=None, timeout=None):
+            return replies[cmd]
+
+    client = modem.ModemClient(lambda force_refresh: None, name="test")
+    client.scheduler = FakeScheduler()
+
+    results = client.send_at_batch(["AT+CPIN?", "AT+COPS?", "AT+CIMI"])
+    client.send_at_batch(["AT+QGMR"])
+
+    assert results["AT+CIMI"].startswith("732101234567890")
+    # AT+CPIN? from the chain, the two retries and the single AT+QGMR: one store each.
+    assert client.cache.stats()["stores"] == 4
+
+
+def test_scheduled_polls_reach_the_modem_and_refresh_the_cache():
+    sent: list[str] = []
+    now = [0.0]
+    replies = {
+        "AT+CREG?;+CEREG?": "+CREG: 0,1\r\n+CEREG: 0,1\r\nOK\r\n",
+        "AT+CREG?": "+CREG: 0,1\r\nOK\r\n",
+    }
+
+    class FakeScheduler:
+        def execute(self, cmd, priority=None, timeout=None):
+            sent.append(cmd)
+            return replies[cmd]
+
+    client = modem.ModemClient(lambda force_refresh: None, name="test")
+    client.scheduler = FakeScheduler()
+    client.cache = ATResponseCache(clock=lambda: now[0])
+
+    # Two polls one 5 s interval apart, inside the 5 s TTL of AT+CREG?/AT+CEREG?.
+    client.poll_groups(["registration"])
+    now[0] += 4.9
+    client.poll_groups(["registration"])
+    assert sent == ["AT+CREG?;+CEREG?", "AT+CREG?;+CEREG?"]
+
+    # On-demand callers still read what the polls stored.
+    assert client.send_at("AT+CREG?").startswith("+CREG: 0,1")
+    assert len(sent) == 2
+
+
+def test_parse_qcainfo_reports_component_carriers():
+    ca = modem.parse_qcainfo(
+        '+QCAINFO: "pcc",1850,100,"LTE BAND 3",1,230,-82,-10,-53,12\r\n'
+        '+QCAINFO: "scc",3050,50,"LTE BAND 7",1,231\r\n'
+        "OK\r\n"
+    )
+
+    assert ca["active"] is True
+    assert ca["bands"] == ["LTE BAND 3", "LTE BAND 7"]
+    assert ca["bandwidth_mhz"] == 30.0
+    assert ca["carriers"][0]["rsrp"] == -82
+    assert ca["carriers"][1]["rsrp"] is None
+    assert modem.parse_qcainfo('+QCAINFO: "pcc",650,25,"LTE BAND 2",1,367,-95,-10,-65,13\r\nOK\r\n')["active"] is False
+    assert modem.parse_qcainfo("OK\r\n") is None
+
+
+def test_parse_urc_distinguishes_unsolicited_reports():
+    reg = modem.parse_urc('+CEREG: 1,"1A2B","01A2B3C",7')
+    assert reg["type"] == "registration"
+    assert reg["registration"] == "Registrado"
+    assert reg["tac"] == "1A2B"
+
+    assert modem.parse_urc('+QIND: "csq",20,99')["csq"] == "20/31 (-73 dBm)"
+    assert modem.parse_urc("+QSIMSTAT: 1,0")["sim"] == "No insertada"
+    assert modem.parse_urc("+CEREG: 2,1") is None
+
+
+def _fake_usb_device(root, name, vid, pid, interfaces):
+    device = root / name
+    device.mkdir()
+    (device / "idVendor").write_text(f"{vid}\n")
+    (device / "idProduct").write_text(f"{pid}\n")
+    for number, tty in interfaces.items():
+        interface = device / f"{name}:1.{number}"
+        interface.mkdir()
+        (interface / "bInterfaceNumber").write_text(f"{number:02x}\n")
+        if tty:
+            (interface / tty).mkdir()
+
+
+def test_find_sysfs_at_ports_resolves_ec25_at_interface(tmp_path):
+    from backend.app.services.modem_discovery import find_sysfs_at_ports, find_sysfs_modems
+
+    _fake_usb_device(tmp_path, "1-1.2", "0403", "6001", {0: "ttyUSB0"})
+    _fake_usb_device(
+        tmp_path, "1-1.3", "2c7c", "0125",
+        {0: "ttyUSB1", 1: "ttyUSB2", 2: "ttyUSB3", 3: "ttyUSB4", 4: None},
+    )
+
+    assert find_sysfs_at_ports(str(tmp_path)) == ["/dev/ttyUSB3"]
+    assert find_sysfs_modems(str(tmp_path)) == {"1-1.3": "/dev/ttyUSB3"}
+    assert find_sysfs_at_ports(str(tmp_path / "missing")) == []
+
+
+def test_modem_presence_follows_uevents():
+    import threading
+
+    from backend.app.services.modem_discovery import ModemPresence, QueueUeventSource
+
+    source = QueueUeventSource()
+    ports: list[str] = []
+    changes: list[tuple[bool, str | None]] = []
+    changed = threading.Event()
+    presence = ModemPresence(source_factory=lambda: source, resolver=lambda: list(ports))
+
+    def on_change(present, port):
+        changes.append((present, port))
+        changed.set()
+
+    presence.add_listener(on_change)
+    assert presence.start()
+    assert not presence.present
+
+    ports.append("/dev/ttyUSB2")
+    source.emit(
+        "add", "/devices/usb1/1-1/1-1.3/1-1.3:1.2/ttyUSB2/tty/ttyUSB2",
+        SUBSYSTEM="tty", DEVNAME="ttyUSB2",
+    )
+    assert changed.wait(2)
+    assert presence.present and presence.port == "/dev/ttyUSB2"
+
+    changed.clear()
+    ports.clear()
+    source.emit("add", "/devices/virtual/input/input7", SUBSYSTEM="input")
+    source.emit(
+        "remove", "/devices/usb1/1-1/1-1.3/1-1.3:1.4/net/wwan0",
+        SUBSYSTEM="net", INTERFACE="wwan0",
+    )
+    assert changed.wait(2)
+    presence.stop()
+
+    assert changes == [(True, "/dev/ttyUSB2"), (False, None)]
+    assert presence.stats()["events"] == 2
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from backend.app.services import ec25_monitor, modem
+from backend.app.services.ec25_simulator import EC25Simulator
+from backend.app.services.modem_registry import PRIMARY_ID, ModemRegistry
+
+
+def test_each_modem_gets_its_own_worker_and_snapshot(monkeypatch):
+    monkeypatch.setattr(modem.presence, "start", lambda: False)
+    monkeypatch.setattr(modem.presence, "stop", lambda: None)
+
+    with EC25Simulator(latency=0.2) as first, EC25Simulator(latency=0.2) as second:
+        second.set_response("AT+COPS?", '+COPS: 0,0,"Claro",7')
+        discovered = {"1-1.2": first.port, "1-1.3": second.port}
+        registry = ModemRegistry(discover=lambda: dict(discovered), max_modems=2)
+
+        async def scenario():
+            modem.configure_port(first.port)
+            modem.start_async_transport()
+            ec25_monitor.start_monitor(update_interval=30.0, slow_interval=60.0)
+            registry.start(update_interval=30.0, slow_interval=60.0, cache_ttls={"AT+COPS?": 0})
+            started = time.monotonic()
+            try:
+                ids = [entry.id for entry in registry.entries()]
+                while not all(e.monitor.get_latest_data()["detected"] for e in registry.entries()):
+                    assert time.monotonic() - started < 3, "monitors never polled"
+                    await asyncio.sleep(0.02)
+                elapsed = time.monotonic() - started
+                snapshots = {e.id: e.monitor.get_latest_data() for e in registry.entries()}
+
+                discovered.pop("1-1.3")
+                registry.sync()
+                await asyncio.sleep(0.05)
+                return ids, elapsed, snapshots, [entry.id for entry in registry.entries()]
+            finally:
+                await registry.stop()
+                ec25_monitor.stop_monitor()
+                await modem.stop_async_transport()
+                modem.configure_port(None)
+
+        ids, elapsed, snapshots, remaining = asyncio.run(scenario())
+
+    assert ids == [PRIMARY_ID, "1-1.3"]
+    assert snapshots[PRIMARY_ID]["network"]["operator"].startswith("Movistar")
+    assert snapshots["1-1.3"]["network"]["operator"].startswith("Claro")
+    # Both modems poll in parallel: two chained writes each at 0.2 s, not four in series.
+    assert elapsed < 0.7
+    assert remaining == [PRIMARY_ID]
+
+
+def test_pinned_primary_port_is_excluded_by_device(monkeypatch):
+    monkeypatch.setattr(modem.presence, "start", lambda: False)
+    monkeypatch.setattr(modem.presence, "stop", lambda: None)
+    # EC25_AT_PORT pins if03 of the modem that discovery lists second, under its if02 tty.
+    discovered = {"1-1.3": "/dev/ttyUSB6", "1-1.2": "/dev/ttyUSB2"}
+    devices = {"/dev/ttyUSB3": "1-1.2", "/dev/ttyUSB2": "1-1.2", "/dev/ttyUSB6": "1-1.3"}
+    registry = ModemRegistry(discover=lambda: dict(discovered), max_modems=4, device_of=devices.get)
+
+    async def scenario():
+        modem.configure_port("/dev/ttyUSB3")
+        registry.start(update_interval=30.0, enabled=False)
+        try:
+            return [entry.id for entry in registry.entries()]
+        finally:
+            await registry.stop()
+            modem.configure_port(None)
+
+    assert asyncio.run(scenario()) == [PRIMARY_ID, "1-1.3"]
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from backend.app.services import ec25_monitor, modem
+from backend.app.services.ec25_simulator import EC25Simulator
+from backend.app.services.operator_scan import OperatorScanner, parse_cops_scan
+
+COPS_SCAN = (
+    '+COPS: (2,"Movistar","Movistar","73002",7),(1,"ENTEL PCS","ENTEL","73001",7),'
+    '(3,"Claro CHL","Claro","73003",2),,(0,1,2,3,4),(0,1,2)'
+)
+
+
+def test_parse_cops_scan():
+    operators = parse_cops_scan(COPS_SCAN + "\r\nOK\r\n")
+
+    assert [(o["short_name"], o["status"], o["act"]) for o in operators] == [
+        ("Movistar", "current", "LTE"),
+        ("ENTEL", "available", "LTE"),
+        ("Claro", "forbidden", "UTRAN"),
+    ]
+
+
+def test_scan_pauses_background_polling_and_monitor_reports_busy(monkeypatch, tmp_path):
+    monkeypatch.setattr(modem.presence, "start", lambda: False)
+    monkeypatch.setattr(modem.presence, "stop", lambda: None)
+    monkeypatch.setattr(ec25_monitor, "is_ec25_detected", lambda: True)
+
+    with EC25Simulator() as simulator:
+        simulator.set_response("AT+COPS=?", COPS_SCAN)
+        simulator.set_delay("AT+COPS=?", 1.0)
+        scanner = OperatorScanner(modem.primary, cache_path=tmp_path / "operators.json")
+
+        async def scenario():
+            modem.configure_port(simulator.port)
+            modem.start_async_transport()
+            ec25_monitor.start_monitor(update_interval=0.2, signal_interval=0.1, slow_interval=10.0)
+            try:
+                while not ec25_monitor.get_latest_data()["detected"]:
+                    await asyncio.sleep(0.02)
+                assert scanner.start()
+                assert not scanner.start()
+                await asyncio.sleep(0.4)
+                during = ec25_monitor.get_latest_data(), scanner.result(), modem.get_at_stats()
+                result = await scanner.wait()
+                started = time.monotonic()
+                while ec25_monitor.get_latest_data()["busy"] is not None:
+                    assert time.monotonic() - started < 2
+                    await asyncio.sleep(0.02)
+                return during, result
+            finally:
+                ec25_monitor.stop_monitor()
+                await modem.stop_async_transport()
+                modem.configure_port(None)
+
+        (snapshot, progress, stats), result = asyncio.run(scenario())
+
+    assert snapshot["busy"] == "escaneando operadores"
+    assert snapshot["detected"] is True
+    assert progress["state"] == "running" and 0 < progress["progress"] < 1
+    assert stats["busy"] == "escaneando operadores"
+    assert result["state"] == "done" and result["progress"] == 1.0
+    assert [o["numeric"] for o in result["operators"]] == ["73002", "73001", "73003"]
+    assert OperatorScanner(modem.primary, cache_path=tmp_path / "operators.json").result()["operators"][0]["long_name"] == "Movistar"
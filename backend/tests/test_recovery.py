@@ -0,0 +1,178 @@
+import asyncio
+import contextlib
+import json
+import logging
+
+from backend.app.services.recovery import RecoveryController, parse_cgatt
+
+
+# Modem whose link only comes back after `fixed_by` has run `needed` times
+class FakeModem:
+    name = "fake"
+
+    def __init__(self, fixed_by=None, needed=1, registered=True, attached=True, responsive=True):
+        self.fixed_by = fixed_by
+        self.needed = needed
+        self.registered = registered
+        self.attached = attached
+        self.responsive = responsive
+        self.online = False
+        self.commands: list[str] = []
+        self.busy_reasons: list[str] = []
+
+    def busy_for(self, reason):
+        self.busy_reasons.append(reason)
+        return contextlib.nullcontext()
+
+    def _fix(self, action):
+        if action == self.fixed_by:
+            self.needed -= 1
+            if self.needed <= 0:
+                self.registered = self.attached = self.responsive = self.online = True
+
+    async def send_at_async(self, cmd, priority=None, cached=True):
+        self.commands.append(cmd)
+        if not self.responsive:
+            return None
+        if cmd in ("AT+CEREG?", "AT+CREG?"):
+            return f"+{cmd[3:-1]}: 0,{1 if self.registered else 2}\r\nOK\r\n"
+        if cmd == "AT+CGATT?":
+            return f"+CGATT: {1 if self.attached else 0}\r\nOK\r\n"
+        if cmd == "AT+CGATT=1":
+            self._fix("reattach")
+        elif cmd == "AT+CFUN=1":
+            self._fix("radio_cycle")
+        elif cmd == "AT+CGACT=1,1":
+            self._fix("data_call")
+        return "OK\r\n"
+
+    async def reset_modem_async(self):
+        self.commands.append("AT+CFUN=1,1")
+        self.responsive = True
+        self._fix("full_reset")
+        return "OK\r\n"
+
+
+class FakeMonitor:
+    def __init__(self):
+        self.refreshed = 0
+
+    def get_latest_data(self):
+        return {"enabled": True, "detected": True, "busy": None, "network": {"registration": "Registrado", "sim": "Lista"}}
+
+    def refresh_groups(self, *groups):
+        self.refreshed += 1
+
+
+def _controller(fake, tmp_path=None, **kwargs):
+    async def connectivity():
+        return fake.online
+
+    return RecoveryController(
+        fake,
+        FakeMonitor(),
+        connectivity=connectivity,
+        log_path=tmp_path / "recovery.jsonl" if tmp_path else None,
+        heartbeat_path=None,
+        settle=dict.fromkeys(("reattach", "radio_cycle", "data_call", "full_reset"), 0.0),
+        reset_grace=0.0,
+        **kwargs,
+    )
+
+
+def test_parse_cgatt():
+    assert parse_cgatt("+CGATT: 1\r\nOK\r\n") is True
+    assert parse_cgatt("+CGATT: 0\r\nOK\r\n") is False
+    assert parse_cgatt("ERROR") is None
+
+
+def test_no_data_is_fixed_by_cheapest_step_without_reset(tmp_path):
+    fake = FakeModem(fixed_by="data_call")
+    controller = _controller(fake, tmp_path)
+
+    async def scenario():
+        failure = await controller.diagnose()
+        return failure, await controller.recover(failure)
+
+    assert asyncio.run(scenario()) == ("no_data", True)
+    assert "AT+CFUN=1,1" not in fake.commands and "AT+CFUN=0" not in fake.commands
+    assert fake.busy_reasons == ["recuperando modem"]
+    assert controller.last_episode["steps"] == ["data_call"]
+    assert controller.counters["steps"]["data_call"] == {"attempts": 1, "successes": 1, "total_s": 0.0}
+    logged = [json.loads(line) for line in (tmp_path / "recovery.jsonl").read_text().splitlines()]
+    assert [(e["step"], e["ok"]) for e in logged] == [("data_call", True)]
+
+
+def test_escalates_through_ladder_until_reset():
+    fake = FakeModem(fixed_by="full_reset", registered=False)
+    controller = _controller(fake)
+
+    assert asyncio.run(controller.recover("unregistered")) is True
+    assert controller.last_episode["steps"] == ["reattach", "radio_cycle", "full_reset"]
+    assert [e["detail"] for e in controller.log()] == ["unregistered", "unregistered", None]
+    assert controller.counters["recovered"] == 1
+    # AT+CFUN=0 strictly before AT+CFUN=1, and the reset comes last
+    assert fake.commands.index("AT+CFUN=0") < fake.commands.index("AT+CFUN=1") < fake.commands.index("AT+CFUN=1,1")
+
+
+def test_unresponsive_modem_goes_straight_to_reset():
+    fake = FakeModem(fixed_by="full_reset", responsive=False)
+    controller = _controller(fake)
+
+    async def scenario():
+        failure = await controller.diagnose()
+        await controller.recover(failure)
+        return failure
+
+    assert asyncio.run(scenario()) == "unresponsive"
+    assert controller.last_episode["steps"] == ["full_reset"]
+
+
+def test_failed_episodes_back_off_exponentially():
+    fake = FakeModem(fixed_by=None, attached=False)
+    controller = _controller(fake, backoff_base=10.0, backoff_max=25.0)
+
+    async def scenario():
+        backoffs = []
+        for _ in range(3):
+            assert await controller.recover("detached") is False
+            backoffs.append(controller.status()["backoff_s"])
+        return backoffs
+
+    backoffs = asyncio.run(scenario())
+    assert [round(b) for b in backoffs] == [10, 20, 25]
+    status = controller.status()
+    assert status["state"] == "backoff"
+    assert status["counters"]["failed"] == 3
+    assert status["counters"]["steps"]["full_reset"]["attempts"] == 3
+
+
+def test_watch_loop_acts_only_after_repeated_failures():
+    fake = FakeModem(fixed_by="data_call")
+    controller = _controller(fake, check_interval=0.01, failure_checks=3)
+
+    async def scenario():
+        controller.start()
+        for _ in range(200):
+            if controller.last_episode is not None:
+                break
+            await asyncio.sleep(0.01)
+        await controller.stop()
+
+    asyncio.run(scenario())
+    assert controller.last_episode["recovered"] is True
+    assert controller.counters["episodes"] == 1
+    assert controller.state == "idle"
+
+
+def test_unwritable_heartbeat_warns_once(tmp_path, caplog):
+    controller = RecoveryController(FakeModem(), FakeMonitor(), heartbeat_path=str(tmp_path / "missing" / "hb"))
+
+    with caplog.at_level(logging.WARNING):
+        controller._heartbeat()
+        controller._heartbeat()
+    assert len([r for r in caplog.records if "latido" in r.getMessage()]) == 1
+
+    controller._heartbeat_path = str(tmp_path / "hb")
+    controller._heartbeat()
+    assert (tmp_path / "hb").exists()
@@ -0,0 +1,72 @@
+import json
+import multiprocessing
+import time
+
+import pytest
+
+from app import ec25_monitor as legacy_monitor
+from app.shared_snapshot import SharedSnapshot
+
+
+def _writer(path, count):
+    shared = SharedSnapshot.open(path)
+    for seq in range(1, count + 1):
+        # Bodies of varying length so a torn read would not parse or match its seq.
+        shared.write(seq, json.dumps({"seq": seq, "pad": "x" * (seq % 500)}).encode())
+
+
+def test_reader_never_sees_a_torn_snapshot_from_another_process(tmp_path):
+    path = str(tmp_path / "ec25-monitor")
+    reader = SharedSnapshot.create(path, capacity=4096)
+    assert reader.read() is None
+
+    writer = multiprocessing.get_context("fork").Process(target=_writer, args=(path, 5000))
+    writer.start()
+    last_seq, seen = None, 0
+    while writer.is_alive() or reader.seq != last_seq:
+        item = reader.read(last_seq)
+        if item is None:
+            continue
+        seq, body = item
+        assert json.loads(body)["seq"] == seq
+        assert last_seq is None or seq > last_seq
+        last_seq, seen = seq, seen + 1
+    writer.join()
+
+    assert last_seq == 5000 and seen > 1
+    assert reader.read(last_seq) is None
+
+
+def test_enabled_flag_and_capacity_are_shared(tmp_path):
+    path = str(tmp_path / "ec25-monitor")
+    monitor = SharedSnapshot.create(path, capacity=64)
+    worker = SharedSnapshot.open(path)
+
+    worker.enabled = True
+    assert monitor.enabled is True
+    assert worker.capacity == 64
+    with pytest.raises(ValueError):
+        monitor.write(1, b"x" * 65)
+    assert SharedSnapshot.open(str(tmp_path / "missing")) is None
+
+
+def test_mirror_republishes_with_the_writer_sequence(tmp_path):
+    path = str(tmp_path / "ec25-monitor")
+    shared = SharedSnapshot.create(path)
+    body = json.dumps({"signal": {"csq": "20/31"}, "enabled": True, "detected": True}).encode()
+    shared.write(7, body)
+
+    legacy_monitor.start_mirror(path, poll_interval=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while legacy_monitor.broadcaster.seq != 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        data = legacy_monitor.get_latest_data()
+        # Same bytes the monitor process serialized, same id for Last-Event-ID across workers.
+        assert data.seq == 7 and data.body == body
+        assert data.event.startswith(f"id: {legacy_monitor.new_epoch(shared.epoch)}-7\n")
+        assert data["signal"]["csq"] == "20/31"
+        legacy_monitor.set_monitor_enabled(True)
+        assert shared.enabled is True
+    finally:
+        legacy_monitor.stop_monitor()
@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+from app import modem as legacy_modem
+from app import signal_history
+from app.signal_history import SignalHistory
+
+
+def _filled(capacity=100, samples=250):
+    history = SignalHistory(capacity=capacity)
+    for i in range(samples):
+        history.append(1000.0 + i, {"rsrp": -80 - i % 10, "csq": None if i % 5 == 0 else 20})
+    return history
+
+
+def test_ring_keeps_the_newest_samples_in_fixed_memory():
+    history = _filled()
+
+    assert len(history) == 100 and history.count == 250
+    assert signal_history.buffer_size(signal_history.DEFAULT_CAPACITY) < 3 * 1024 * 1024
+    series = history.query("rsrp", 1000, 1300, step=50)
+    # The slot next to the head may be mid-write, so a reader skips it.
+    assert series["t"] == [1150.0, 1200.0]
+    assert sum(series["count"]) == 99
+    assert series["min"] == [-89.0, -89.0] and series["max"] == [-80.0, -80.0]
+
+
+def test_missing_measurements_are_skipped_not_averaged():
+    series = _filled(capacity=1000, samples=100).query("csq", 1000, 1100, step=10)
+
+    assert series["count"] == [8] * 10
+    assert series["avg"] == [20.0] * 10
+    assert _filled().query("sinr", 1000, 1300, step=10)["t"] == []
+
+
+def test_step_is_widened_to_cap_the_number_of_points():
+    series = _filled(capacity=5000, samples=5000).query("rsrp", 1000, 6000, step=1)
+
+    assert series["step"] == 5000 / signal_history.MAX_POINTS
+    assert len(series["t"]) <= signal_history.MAX_POINTS + 1
+    with pytest.raises(ValueError):
+        _filled().query("rssi")
+
+
+def test_numpy_and_pure_python_downsampling_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    history = _filled(capacity=1000, samples=1500)
+    vectorized = history.query("rsrp", 1000, 2500, step=7)
+    monkeypatch.setattr(signal_history, "np", None)
+    assert history.query("rsrp", 1000, 2500, step=7) == vectorized
+
+
+def test_shared_history_is_readable_from_another_mapping(tmp_path):
+    path = str(tmp_path / "ec25-monitor-history")
+    writer = SignalHistory.create(path, capacity=10)
+    writer.append(1000.0, legacy_modem.parse_signal_metrics(
+        "+CSQ: 20,99\r\nOK", '+QCSQ: "LTE",-65,-95,140,-11\r\nOK'
+    ))
+    writer.append(1001.0, legacy_modem.parse_signal_metrics("+CSQ: 99,99\r\nOK", '+QCSQ: "NOSERVICE"\r\nOK'))
+
+    reader = SignalHistory.open(path)
+    assert reader.capacity == 10 and len(reader) == 2
+    assert reader.query("sinr", 1000, 1002)["avg"] == [140.0]
+    assert reader.query("csq", 1000, 1002)["count"] == [1]
+    assert SignalHistory.open(str(tmp_path / "missing")) is None
+    assert math.isnan(reader._columns["rsrp"][1])
@@ -0,0 +1,71 @@
+"""
+Configuración de gunicorn para el panel EC25.
+
+El monitor del módem corre una sola vez, en un proceso dedicado que el
+master crea antes de los workers, y publica cada snapshot en un buffer
+compartido (app/shared_snapshot.py), junto al historial de señal
+(app/signal_history.py). Los workers solo leen esos buffers:
+el tráfico serie no crece con la cantidad de workers y todos sirven los
+mismos datos.
+"""
+import os
+import signal
+import time
+
+from app.shared_snapshot import SharedSnapshot, default_path
+from app.signal_history import SignalHistory
+
+bind = "0.0.0.0:5000"
+workers = 2
+timeout = 60
+
+# Heredado por los workers: create_app() arranca el espejo en vez del monitor
+os.environ.setdefault("EC25_SHARED_SNAPSHOT", default_path())
+
+
+def _run_monitor(server, shared, history):
+    """Proceso dedicado: el único que abre el puerto serie"""
+    # Los handlers de señales del master no aplican aquí
+    for sig in server.SIGNALS:
+        signal.signal(sig, signal.SIG_DFL)
+
+    from app.ec25_monitor import start_monitor
+    from app.logging_config import setup_logging
+    from app.web import get_ec25_enabled
+
+    try:
+        setup_logging()
+    except Exception:
+        pass
+
+    master = os.getppid()
+    start_monitor(update_interval=5.0, enabled=get_ec25_enabled(), shared=shared, history=history)
+    # Terminar junto con el master
+    while os.getppid() == master:
+        time.sleep(5)
+
+
+def when_ready(server):
+    """Crea los buffers y el proceso del monitor antes de lanzar los workers"""
+    from app.ec25_monitor import history_path
+
+    path = os.environ["EC25_SHARED_SNAPSHOT"]
+    shared = SharedSnapshot.create(path)
+    history = SignalHistory.create(history_path(path))
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_monitor(server, shared, history)
+        finally:
+            os._exit(0)
+    server.ec25_monitor_pid = pid
+    server.log.info("Monitor EC25 en proceso dedicado (pid %s, buffer %s)", pid, shared.path)
+
+
+def on_exit(server):
+    pid = getattr(server, "ec25_monitor_pid", None)
+    if pid:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
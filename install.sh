@@ -89,7 +89,7 @@ for service in wan-manager watchdog ec25-router wan-failover; do
       sed -i "s/User=benjamin/User=$CURRENT_USER/" "$TEMP_FILE"
       sed -i "s|WorkingDirectory=.*|WorkingDirectory=$INSTALL_DIR|" "$TEMP_FILE"
       sed -i "s|Environment=\"PATH=/opt/ec25-router/venv/bin.*\"|Environment=\"PATH=$INSTALL_DIR/venv/bin:/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin\"|" "$TEMP_FILE"
-      sed -i "s|ExecStart=/opt/ec25-router.*|ExecStart=$INSTALL_DIR/venv/bin/gunicorn -w 2 -b 0.0.0.0:5000 run:app|" "$TEMP_FILE"
+      sed -i "s|ExecStart=/opt/ec25-router.*|ExecStart=$INSTALL_DIR/venv/bin/gunicorn -c gunicorn.conf.py run:app|" "$TEMP_FILE"
     fi
     
     sudo cp "$TEMP_FILE" "/etc/systemd/system/${service}.service"
@@ -4,9 +4,19 @@ set -e
 
 ETH=eth0
 LTE=usb0
+# Lock compartido con el planificador AT de Python (app/at_scheduler.py)
+AT_LOCK=/run/lock/ec25-at.lock
+# Latido del controlador de recuperación de Python (backend/app/services/recovery.py)
+# (en /run/lock porque el servicio no corre como root; mismo valor que EC25_RECOVERY_HEARTBEAT)
+RECOVERY_HEARTBEAT=${RECOVERY_HEARTBEAT:-/run/lock/ec25-recovery.heartbeat}
+RECOVERY_STALE=60
 
 ok_ping() { ping -c 1 -W 1 "$1" >/dev/null 2>&1; }
 iface_ping() { ping -I "$1" -c 1 -W 1 8.8.8.8 >/dev/null 2>&1; }
+recovery_active() {
+  [ -f "$RECOVERY_HEARTBEAT" ] || return 1
+  [ $(( $(date +%s) - $(stat -c %Y "$RECOVERY_HEARTBEAT") )) -lt "$RECOVERY_STALE" ]
+}
 
 while true; do
   # Si hay internet por eth0, todo OK
@@ -21,6 +31,12 @@ while true; do
     continue
   fi
 
+  # El backend escala por su cuenta (CGATT -> CFUN 0/1 -> llamada de datos -> reset)
+  if recovery_active; then
+    sleep 10
+    continue
+  fi
+
   # Nada tiene internet: intenta recuperar LTE primero
   echo "$(date): No internet detected, trying to recover LTE..." | logger -t watchdog
   dhclient -r "$LTE" >/dev/null 2>&1 || true
@@ -37,14 +53,22 @@ while true; do
 
   # Último recurso: reiniciar modem (AT+CFUN=1,1)
   echo "$(date): DHCP failed, resetting modem..." | logger -t watchdog
-  # Encuentra puerto AT y manda comando
-  for p in /dev/ttyUSB*; do
-    [ -c "$p" ] || continue
-    echo -e "AT\r" > "$p" 2>/dev/null || true
-    sleep 1
-    echo -e "AT+CFUN=1,1\r" > "$p" 2>/dev/null || true
-    break
-  done
+  # Encuentra puerto AT y manda comando (con el lock tomado para no
+  # intercalar escrituras con los comandos del panel)
+  # Crear el lock con modo 0666 y abrirlo en solo lectura (flock no necesita escribir):
+  # el servicio sin root debe poder abrirlo, y en /run/lock (sticky, con
+  # fs.protected_regular) ni root puede abrir con O_CREAT un archivo de otro usuario
+  [ -e "$AT_LOCK" ] || (umask 000; : >>"$AT_LOCK") || true
+  (
+    flock -w 10 9 || echo "$(date): AT lock busy, sending reset anyway" | logger -t watchdog
+    for p in /dev/ttyUSB*; do
+      [ -c "$p" ] || continue
+      echo -e "AT\r" > "$p" 2>/dev/null || true
+      sleep 1
+      echo -e "AT+CFUN=1,1\r" > "$p" 2>/dev/null || true
+      break
+    done
+  ) 9<"$AT_LOCK" || true
 
   echo "$(date): Modem reset sent, waiting 30s..." | logger -t watchdog
   sleep 30
@@ -7,6 +7,36 @@ let reconnectAttempts = 0;
 const MAX_RECONNECT_ATTEMPTS = 5;
 const RECONNECT_DELAY = 3000; // 3 segundos
 
+// Estado armado desde el snapshot inicial + parches, e id del último evento recibido
+let ec25State = null;
+let ec25LastEventId = null;
+
+/**
+ * Aplica un JSON merge patch (RFC 7386): null elimina la clave, objetos se mezclan recursivamente
+ */
+function applyMergePatch(target, patch) {
+  const result = (target && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+  for (const [key, value] of Object.entries(patch)) {
+    if (value === null) {
+      delete result[key];
+    } else if (typeof value === 'object' && !Array.isArray(value)) {
+      result[key] = applyMergePatch(result[key], value);
+    } else {
+      result[key] = value;
+    }
+  }
+  return result;
+}
+
+/**
+ * Recuerda el id del evento para retomar el stream sin pedir un snapshot completo
+ */
+function trackEventId(event) {
+  if (event.lastEventId) {
+    ec25LastEventId = event.lastEventId;
+  }
+}
+
 /**
  * Inicializa el EventSource para SSE
  */
@@ -17,21 +47,44 @@ function initEC25Stream() {
   }
 
   try {
-    ec25EventSource = new EventSource('/api/ec25/stream');
+    // Al reconectar, el servidor envía solo lo que cambió desde el último id
+    const url = ec25LastEventId
+      ? `/api/ec25/stream?last_event_id=${encodeURIComponent(ec25LastEventId)}`
+      : '/api/ec25/stream';
+    ec25EventSource = new EventSource(url);
     
     ec25EventSource.onopen = () => {
       console.log('✅ EC25 stream conectado');
       reconnectAttempts = 0;
     };
     
-    ec25EventSource.onmessage = (event) => {
+    // Snapshot completo: reemplaza el estado
+    ec25EventSource.addEventListener('snapshot', (event) => {
       try {
-        const data = JSON.parse(event.data);
-        updateEC25UI(data);
+        ec25State = JSON.parse(event.data);
+        trackEventId(event);
+        updateEC25UI(ec25State);
       } catch (e) {
         console.error('Error parseando datos EC25:', e);
       }
-    };
+    });
+    
+    // Parche: solo los campos que cambiaron desde el evento anterior
+    ec25EventSource.addEventListener('patch', (event) => {
+      if (!ec25State) {
+        // Sin base no se puede aplicar: pedir snapshot de nuevo
+        ec25LastEventId = null;
+        initEC25Stream();
+        return;
+      }
+      try {
+        ec25State = applyMergePatch(ec25State, JSON.parse(event.data));
+        trackEventId(event);
+        updateEC25UI(ec25State);
+      } catch (e) {
+        console.error('Error aplicando parche EC25:', e);
+      }
+    });
     
     ec25EventSource.onerror = (error) => {
       console.error('❌ Error en EC25 stream:', error);
@@ -96,7 +96,7 @@ if [ $SERVICES_CHANGED -eq 1 ]; then
           sed -i "s/User=benjamin/User=$CURRENT_USER/" "$TEMP_FILE"
           sed -i "s|WorkingDirectory=.*|WorkingDirectory=$INSTALL_DIR|" "$TEMP_FILE"
           sed -i "s|Environment=\"PATH=/opt/ec25-router/venv/bin.*\"|Environment=\"PATH=$INSTALL_DIR/venv/bin:/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin\"|" "$TEMP_FILE"
-          sed -i "s|ExecStart=/opt/ec25-router.*|ExecStart=$INSTALL_DIR/venv/bin/gunicorn -w 2 --timeout 60 -b 0.0.0.0:5000 run:app|" "$TEMP_FILE"
+          sed -i "s|ExecStart=/opt/ec25-router.*|ExecStart=$INSTALL_DIR/venv/bin/gunicorn -c gunicorn.conf.py run:app|" "$TEMP_FILE"
         else
           cp "systemd/${service}.service" "$TEMP_FILE"
         fi
@@ -131,6 +131,7 @@ sudo cp -rv app "$INSTALL_DIR/"
 sudo cp -rv templates "$INSTALL_DIR/"
 sudo cp -rv static "$INSTALL_DIR/"
 sudo cp -v run.py "$INSTALL_DIR/"
+sudo cp -v gunicorn.conf.py "$INSTALL_DIR/"
 
 # Verificar si hay cambios en requirements.txt
 if [ -f "requirements.txt" ]; then